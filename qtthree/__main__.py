@@ -1,13 +1,23 @@
 import argparse
 import sys
 
-from qtthree.app import create_application
+from qtthree.storage import convert
 
 parser = argparse.ArgumentParser(description="QtThree")
-parser.add_argument("--data-file", type=str, default="data.json", help="Persistent data storage")
+parser.add_argument("--data-file", type=str, default="data.json", help="Persistent data storage (.json, .npz, or .db/.sqlite for SQLite)")
+parser.add_argument("--convert-to", type=str, default=None, help="Convert the data file to another format and exit")
+parser.add_argument("--journal", action="store_true", help="Append edits to a log instead of rewriting the data file")
+parser.add_argument("--max-fps", type=float, default=None, help="Highest frame rate of the 3D view (defaults to the display's refresh rate)")
 
 
 if __name__ == '__main__':
     args = parser.parse_args()
-    app = create_application(args.data_file)
+    if args.convert_to is not None:
+        count = convert(args.data_file, args.convert_to)
+        print(f"{count} shapes converted")
+        sys.exit(0)
+
+    # Importing the app creates the QApplication, which conversion doesn't need
+    from qtthree.app import create_application
+    app = create_application(args.data_file, args.journal, args.max_fps)
     sys.exit(app.exec_())
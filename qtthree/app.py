@@ -1,3 +1,5 @@
+from typing import Optional
+
 import pyqtgraph as pg
 from PySide2.QtWidgets import QApplication
 
@@ -7,7 +9,7 @@ from qtthree.views.main_window import MainWindow
 app = pg.mkQApp(__name__)
 
 
-def create_application(data_file: str) -> QApplication:
+def create_application(data_file: str, journaled: bool = False, max_fps: Optional[float] = None) -> QApplication:
     """
     Creates an instance of the Qt app.
 
@@ -15,12 +17,18 @@ def create_application(data_file: str) -> QApplication:
     ----------
     data_file: str
         The path to the data file.
+    journaled: bool
+        Whether to store edits in an append-only journal.
+    max_fps: Optional[float]
+        The highest frame rate of the 3D view, or None for the display's refresh rate.
     """
-    serializer = Serializer(data_file)
+    serializer = Serializer(data_file, journaled)
     main_window = MainWindow(serializer)
+    main_window.graphics.setMaxFps(max_fps)
     main_window.show()
 
     app = pg.mkQApp(__name__)
+    app.aboutToQuit.connect(serializer.close)
 
     # Prevents views from being garbage collected
     setattr(app, "main_window", main_window)
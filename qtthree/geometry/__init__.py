@@ -0,0 +1,17 @@
+from qtthree.geometry.decimate import decimate_mesh
+from qtthree.geometry.lod import cluster_vertices, select_lod_level
+from qtthree.geometry.mesh_cache import MeshCache
+from qtthree.geometry.primitives import acquire_unit_box, acquire_unit_sphere
+from qtthree.geometry.ray import RayHit, ray_box_intersection, ray_triangle_intersections
+from qtthree.geometry.registry import Geometry, GeometryRegistry, geometry_registry
+from qtthree.geometry.scene_bvh import SceneBVH
+from qtthree.geometry.stl_loader import load_stl, load_stl_decimated, load_stl_lod, mesh_cache, stl_summary
+from qtthree.geometry.triangle_bvh import TriangleBVH
+from qtthree.geometry.weld import weld_vertices
+
+__all__ = [
+    "Geometry", "GeometryRegistry", "MeshCache", "RayHit", "SceneBVH", "TriangleBVH", "acquire_unit_box",
+    "acquire_unit_sphere", "cluster_vertices", "decimate_mesh", "geometry_registry", "load_stl", "load_stl_decimated",
+    "load_stl_lod", "mesh_cache", "ray_box_intersection", "ray_triangle_intersections", "select_lod_level",
+    "stl_summary", "weld_vertices"
+]
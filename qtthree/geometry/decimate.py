@@ -0,0 +1,436 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Weight of the planes keeping open boundaries in place, relative to the surface's own planes
+BOUNDARY_WEIGHT = 1000.0
+
+
+def decimate_mesh(
+    vertexes: np.ndarray,
+    faces: np.ndarray,
+    target_faces: Optional[int] = None,
+    max_error: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simplify an indexed mesh by quadric error edge collapses.
+
+    Every vertex carries the quadric of the planes of its triangles (Garland and
+    Heckbert). Collapsing an edge moves both of its ends to the point minimizing
+    the sum of their quadrics, and the value at that point is the collapse's error.
+
+    Rather than collapsing one edge at a time, every pass collapses a batch of
+    cheap edges sharing no vertex, so a pass is a handful of vectorized
+    operations over the whole mesh. Collapses that would flip a
+    triangle are rejected. Passes repeat until the target triangle count is
+    reached, or no collapse stays under the error bound (or can be made without
+    flipping a triangle, so very low targets may not be reached).
+
+    Parameters
+    ----------
+    vertexes : np.ndarray
+        The (V, 3) vertex array.
+    faces : np.ndarray
+        The (M, 3) face array.
+    target_faces : Optional[int]
+        The number of triangles to simplify down to.
+    max_error : Optional[float]
+        The largest error allowed for a collapse, roughly the distance a collapse
+        may move the surface, in model units.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The simplified (V', 3) float32 vertex array and (M', 3) uint32 face array.
+    """
+    if target_faces is None and max_error is None:
+        raise ValueError("Decimation needs a target triangle count or an error bound.")
+
+    positions = np.array(vertexes, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+
+    target = max(int(target_faces), 1) if target_faces is not None else 1
+    max_cost = max_error ** 2 if max_error is not None else np.inf
+
+    quadrics = _vertex_quadrics(positions, faces)
+
+    while len(faces) > target:
+        edges, _ = _unique_edges(faces, len(positions))
+        if not len(edges):
+            break
+
+        merged = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+        targets, costs = _collapse_targets(merged, positions[edges[:, 0]], positions[edges[:, 1]])
+
+        lengths = np.linalg.norm(positions[edges[:, 0]] - positions[edges[:, 1]], axis=1)
+        candidates = np.flatnonzero(costs <= max_cost)
+        selected = candidates[_independent_edges(edges[candidates], costs[candidates], lengths[candidates], len(positions))]
+
+        selected = _without_flips(positions, faces, edges, targets, selected)
+
+        # Each collapse removes about two triangles, don't overshoot the target
+        budget = max((len(faces) - target + 1) // 2, 1)
+        if len(selected) > budget:
+            selected = _without_flips(positions, faces, edges, targets, selected[np.argsort(costs[selected], kind="stable")[:budget]])
+
+        if not len(selected):
+            break
+
+        kept, removed = edges[selected, 0], edges[selected, 1]
+        positions[kept] = targets[selected]
+        quadrics[kept] += quadrics[removed]
+
+        remap = np.arange(len(positions))
+        remap[removed] = kept
+        faces = _clean_faces(remap[faces])
+
+    used, compact = np.unique(faces, return_inverse=True)
+    return positions[used].astype(np.float32), compact.reshape(-1, 3).astype(np.uint32)
+
+
+def _scatter_add(indices: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Sum rows of values into the rows of a new array, by index.
+
+    Parameters
+    ----------
+    indices : np.ndarray
+        The (N,) destination row of each value.
+    values : np.ndarray
+        The (N, K) values.
+    size : int
+        The number of rows of the result.
+
+    Returns
+    -------
+    np.ndarray
+        The (size, K) sums.
+    """
+    return np.stack([np.bincount(indices, weights=values[:, k], minlength=size) for k in range(values.shape[1])], axis=1)
+
+
+def _face_normals(corners: np.ndarray) -> np.ndarray:
+    """
+    Compute the unnormalized normals of triangles.
+
+    Parameters
+    ----------
+    corners : np.ndarray
+        The (M, 3, 3) triangle corners.
+
+    Returns
+    -------
+    np.ndarray
+        The (M, 3) normals, with a length of twice the triangle's area.
+    """
+    return np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+
+
+def _plane_quadrics(normals: np.ndarray, points: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Build the flattened quadrics of planes.
+
+    Parameters
+    ----------
+    normals : np.ndarray
+        The (N, 3) unit normals of the planes.
+    points : np.ndarray
+        The (N, 3) points on the planes.
+    weights : np.ndarray
+        The (N,) weight of each plane.
+
+    Returns
+    -------
+    np.ndarray
+        The (N, 16) quadrics.
+    """
+    planes = np.concatenate([normals, -np.sum(normals * points, axis=1, keepdims=True)], axis=1)
+    return (planes[:, :, None] * planes[:, None, :] * weights[:, None, None]).reshape(-1, 16)
+
+
+def _vertex_quadrics(positions: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Sum the quadrics of the planes around every vertex.
+
+    Open boundaries get an extra, heavily weighted plane through each boundary
+    edge, perpendicular to its triangle, so they don't shrink.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        The (V, 3) vertex positions.
+    faces : np.ndarray
+        The (M, 3) face array.
+
+    Returns
+    -------
+    np.ndarray
+        The (V, 4, 4) quadrics.
+    """
+    normals = _face_normals(positions[faces])
+    lengths = np.linalg.norm(normals, axis=1)
+    valid = lengths > 0.0
+    faces, normals = faces[valid], normals[valid] / lengths[valid, None]
+
+    face_quadrics = _plane_quadrics(normals, positions[faces[:, 0]], np.ones(len(faces)))
+    quadrics = _scatter_add(faces.ravel(), np.repeat(face_quadrics, 3, axis=0), len(positions))
+
+    edges, boundary_faces = _unique_edges(faces, len(positions))
+    boundary = boundary_faces >= 0
+    if np.any(boundary):
+        edges = edges[boundary]
+        starts, ends = positions[edges[:, 0]], positions[edges[:, 1]]
+        perpendicular = np.cross(ends - starts, normals[boundary_faces[boundary]])
+        lengths = np.linalg.norm(perpendicular, axis=1)
+        valid = lengths > 0.0
+
+        edge_quadrics = _plane_quadrics(perpendicular[valid] / lengths[valid, None], starts[valid], np.full(np.count_nonzero(valid), BOUNDARY_WEIGHT))
+        quadrics += _scatter_add(edges[valid].ravel(), np.repeat(edge_quadrics, 2, axis=0), len(positions))
+
+    return quadrics.reshape(-1, 4, 4)
+
+
+def _unique_edges(faces: np.ndarray, vertex_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    List the edges of a mesh.
+
+    Parameters
+    ----------
+    faces : np.ndarray
+        The (M, 3) face array.
+    vertex_count : int
+        The number of vertices.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The (E, 2) edges, with their lowest vertex first, and for each edge,
+        the triangle it borders if it is a boundary edge, or -1.
+    """
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    edges.sort(axis=1)
+
+    _, first, counts = np.unique(edges[:, 0] * vertex_count + edges[:, 1], return_index=True, return_counts=True)
+    boundary_faces = np.where(counts == 1, first % max(len(faces), 1), -1)
+    return edges[first], boundary_faces
+
+
+def _quadric_costs(quadrics: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Evaluate quadrics at points.
+
+    Parameters
+    ----------
+    quadrics : np.ndarray
+        The (N, 4, 4) quadrics.
+    points : np.ndarray
+        The (N, 3) points.
+
+    Returns
+    -------
+    np.ndarray
+        The (N,) costs.
+    """
+    homogeneous = np.concatenate([points, np.ones((len(points), 1))], axis=1)
+    return np.maximum(np.einsum("ni,nij,nj->n", homogeneous, quadrics, homogeneous), 0.0)
+
+
+def _collapse_targets(quadrics: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find where each edge should collapse to, and the cost of collapsing it there.
+
+    The optimal point is used when the quadric is well conditioned and the point
+    stays close to the edge. Otherwise, the cheapest of the ends and the midpoint is used.
+
+    Parameters
+    ----------
+    quadrics : np.ndarray
+        The (E, 4, 4) summed quadrics of the edges' ends.
+    starts : np.ndarray
+        The (E, 3) first end of each edge.
+    ends : np.ndarray
+        The (E, 3) second end of each edge.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The (E, 3) collapse points and (E,) collapse costs.
+    """
+    midpoints = (starts + ends) / 2.0
+    candidates = [starts, ends, midpoints]
+
+    system = quadrics[:, :3, :3]
+    scale = np.maximum(np.abs(system).max(axis=(1, 2)), np.finfo(float).tiny)
+    solvable = np.abs(np.linalg.det(system / scale[:, None, None])) > 1e-9
+
+    optimal = midpoints.copy()
+    if np.any(solvable):
+        optimal[solvable] = np.linalg.solve(system[solvable], -quadrics[solvable, :3, 3:])[:, :, 0]
+
+    # A nearly singular quadric can put the optimum far away from the surface
+    reach = np.linalg.norm(ends - starts, axis=1)
+    solvable &= np.linalg.norm(optimal - midpoints, axis=1) <= reach
+    candidates.append(optimal)
+
+    points = np.stack(candidates, axis=1)
+    costs = np.stack([_quadric_costs(quadrics, candidate) for candidate in candidates], axis=1)
+    costs[~solvable, 3] = np.inf
+
+    best = np.argmin(costs, axis=1)
+    rows = np.arange(len(points))
+    return points[rows, best], costs[rows, best]
+
+
+def _independent_edges(edges: np.ndarray, costs: np.ndarray, lengths: np.ndarray, vertex_count: int, rounds: int = 8) -> np.ndarray:
+    """
+    Select edges sharing no vertex, favoring the cheapest ones.
+
+    Every round selects the edges that are the cheapest edge of both of their ends,
+    among the edges whose ends are both still free. Ties, as on flat regions where
+    every collapse is free, are broken by picking the shortest edges first.
+
+    Parameters
+    ----------
+    edges : np.ndarray
+        The (E, 2) edges.
+    costs : np.ndarray
+        The (E,) collapse costs.
+    lengths : np.ndarray
+        The (E,) edge lengths.
+    vertex_count : int
+        The number of vertices.
+    rounds : int
+        The number of selection rounds.
+
+    Returns
+    -------
+    np.ndarray
+        The indices of the selected edges.
+    """
+    order = np.lexsort((lengths, costs))
+    taken = np.zeros(vertex_count, dtype=bool)
+    selected = []
+
+    for _ in range(rounds):
+        order = order[~(taken[edges[order, 0]] | taken[edges[order, 1]])]
+        if not len(order):
+            break
+
+        ranks = np.arange(len(order))
+        sorted_edges = edges[order]
+
+        cheapest = np.full(vertex_count, len(order))
+        np.minimum.at(cheapest, sorted_edges[:, 0], ranks)
+        np.minimum.at(cheapest, sorted_edges[:, 1], ranks)
+
+        independent = (cheapest[sorted_edges[:, 0]] == ranks) & (cheapest[sorted_edges[:, 1]] == ranks)
+        taken[sorted_edges[independent].ravel()] = True
+        selected.append(order[independent])
+
+    return np.concatenate(selected) if selected else np.empty(0, dtype=np.int64)
+
+
+def _without_flips(positions: np.ndarray, faces: np.ndarray, edges: np.ndarray, targets: np.ndarray, selected: np.ndarray) -> np.ndarray:
+    """
+    Drop the selected collapses that would flip a triangle.
+
+    Dropping a collapse changes how its neighbors' triangles move, so
+    the remaining collapses are checked again until none is dropped.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        The (V, 3) vertex positions.
+    faces : np.ndarray
+        The (M, 3) face array.
+    edges : np.ndarray
+        The (E, 2) edges.
+    targets : np.ndarray
+        The (E, 3) collapse points.
+    selected : np.ndarray
+        The indices of the selected edges, sharing no vertex.
+
+    Returns
+    -------
+    np.ndarray
+        The indices of the collapses that can be applied together.
+    """
+    while len(selected):
+        keep = _preserves_orientation(positions, faces, edges[selected], targets[selected])
+        if np.all(keep):
+            break
+
+        selected = selected[keep]
+
+    return selected
+
+
+def _preserves_orientation(positions: np.ndarray, faces: np.ndarray, edges: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Check which collapses keep every surviving triangle facing the same way.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        The (V, 3) vertex positions.
+    faces : np.ndarray
+        The (M, 3) face array.
+    edges : np.ndarray
+        The (C, 2) edges to collapse, sharing no vertex.
+    targets : np.ndarray
+        The (C, 3) collapse points.
+
+    Returns
+    -------
+    np.ndarray
+        The (C,) mask of collapses that can be applied.
+    """
+    collapse_of = np.full(len(positions), -1)
+    collapse_of[edges[:, 0]] = np.arange(len(edges))
+    collapse_of[edges[:, 1]] = np.arange(len(edges))
+
+    moved = positions.copy()
+    moved[edges[:, 0]] = targets
+    moved[edges[:, 1]] = targets
+
+    collapses = collapse_of[faces]
+    touched = np.any(collapses >= 0, axis=1)
+    affected, collapses = faces[touched], collapses[touched]
+
+    # Triangles containing a whole collapsed edge disappear, so they can't flip
+    vanishing = np.zeros(len(affected), dtype=bool)
+    for first, second in ((0, 1), (1, 2), (0, 2)):
+        vanishing |= (collapses[:, first] >= 0) & (collapses[:, first] == collapses[:, second])
+    affected, collapses = affected[~vanishing], collapses[~vanishing]
+
+    before = _face_normals(positions[affected])
+    after = _face_normals(moved[affected])
+    flipped = np.sum(before * after, axis=1) < 0.0
+
+    rejected = np.zeros(len(edges), dtype=bool)
+    culprits = collapses[flipped].ravel()
+    rejected[culprits[culprits >= 0]] = True
+    return ~rejected
+
+
+def _clean_faces(faces: np.ndarray) -> np.ndarray:
+    """
+    Drop the triangles that collapsed, and all but the first copy of duplicated triangles.
+
+    Parameters
+    ----------
+    faces : np.ndarray
+        The (M, 3) face array.
+
+    Returns
+    -------
+    np.ndarray
+        The cleaned face array.
+    """
+    degenerate = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 0] == faces[:, 2])
+    faces = faces[~degenerate]
+
+    corners = np.sort(faces, axis=1)
+    rows = np.ascontiguousarray(corners).view(np.dtype((np.void, corners.dtype.itemsize * 3))).ravel()
+    _, first = np.unique(rows, return_index=True)
+    return faces[np.sort(first)]
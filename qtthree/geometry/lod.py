@@ -0,0 +1,96 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+def select_lod_level(thresholds: Sequence[float], size: float, current: int, hysteresis: float = 0.15) -> int:
+    """
+    Select the level of detail for a projected size.
+
+    Level 0 is the most detailed. Level i is used while the size is at least
+    thresholds[i], and the coarsest level once it is below every threshold.
+    A level is only left once the size is past its threshold by the hysteresis
+    margin, so a shape sitting on a threshold does not pop between levels.
+
+    Parameters
+    ----------
+    thresholds : Sequence[float]
+        The size below which each coarser level is used, in decreasing order.
+    size : float
+        The projected size of the shape.
+    current : int
+        The level currently in use.
+    hysteresis : float
+        The margin around each threshold, relative to the threshold.
+
+    Returns
+    -------
+    int
+        The level to use.
+    """
+    level = min(max(current, 0), len(thresholds))
+
+    while level > 0 and size > thresholds[level - 1] * (1.0 + hysteresis):
+        level -= 1
+
+    while level < len(thresholds) and size < thresholds[level] * (1.0 - hysteresis):
+        level += 1
+
+    return level
+
+
+def cluster_vertices(vertexes: np.ndarray, faces: np.ndarray, resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simplify an indexed mesh by vertex clustering.
+
+    The mesh's bounding box is split into a grid with the given number of cells
+    along its longest axis. Vertices sharing a cell are merged into their
+    average, and triangles that collapse or become duplicates are dropped.
+    The result is coarse, but it is computed in a few vectorized passes.
+
+    Parameters
+    ----------
+    vertexes : np.ndarray
+        The (V, 3) vertex array.
+    faces : np.ndarray
+        The (M, 3) face array.
+    resolution : int
+        The number of grid cells along the longest axis of the mesh.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The simplified (V', 3) float32 vertex array and (M', 3) uint32 face array.
+    """
+    points = np.asarray(vertexes, dtype=np.float32)
+    if not len(points) or not len(faces):
+        return points.copy(), np.asarray(faces, dtype=np.uint32).copy()
+
+    lower = points.min(axis=0)
+    extent = float(np.max(points.max(axis=0) - lower))
+    if extent <= 0.0:
+        return points.copy(), np.asarray(faces, dtype=np.uint32).copy()
+
+    cells = np.floor((points - lower) * (resolution / extent)).astype(np.int64)
+    np.clip(cells, 0, resolution - 1, out=cells)
+    cell_ids = (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+
+    _, inverse = np.unique(cell_ids, return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse)
+    clustered = np.stack([np.bincount(inverse, weights=points[:, axis]) for axis in range(3)], axis=1) / counts[:, None]
+
+    remapped = inverse[np.asarray(faces, dtype=np.int64)]
+    degenerate = (remapped[:, 0] == remapped[:, 1]) | (remapped[:, 1] == remapped[:, 2]) | (remapped[:, 0] == remapped[:, 2])
+    remapped = remapped[~degenerate]
+
+    # Clusters often turn several triangles into the same one, keep the first of each
+    corners = np.sort(remapped, axis=1)
+    rows = np.ascontiguousarray(corners).view(np.dtype((np.void, corners.dtype.itemsize * 3))).ravel()
+    _, first = np.unique(rows, return_index=True)
+    remapped = remapped[np.sort(first)]
+
+    # Drop clusters that are no longer referenced by any triangle
+    used, compact = np.unique(remapped, return_inverse=True)
+
+    return clustered[used].astype(np.float32), compact.reshape(-1, 3).astype(np.uint32)
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+def default_cache_dir() -> str:
+    """
+    Get the default directory for the mesh cache.
+
+    Can be overridden with the QTTHREE_CACHE_DIR environment variable.
+
+    Returns
+    -------
+    str
+        The cache directory.
+    """
+    override = os.environ.get("QTTHREE_CACHE_DIR")
+    if override:
+        return override
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "qtthree", "meshes")
+
+
+class MeshCache:
+    """
+    Persistent cache of preprocessed mesh arrays.
+
+    Each entry is a directory of .npy files, one per named array,
+    which are memory-mapped when loaded. Entries are keyed by the
+    source file's path, size and modification time, so an edited file
+    is never served stale data. The total size of the cache is bounded,
+    and the least recently used entries are evicted first.
+    """
+    directory: str
+    max_bytes: int
+
+    # Bump whenever the arrays stored for an entry change meaning
+    VERSION = 1
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key_for_file(self, file_path: str, *params) -> Optional[str]:
+        """
+        Get the cache key for a source file.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the source file.
+        *params
+            Any processing parameters that affect the cached arrays.
+
+        Returns
+        -------
+        Optional[str]
+            The cache key, or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        identity = repr((self.VERSION, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, params))
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        """
+        Get the directory of a cache entry.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+
+        Returns
+        -------
+        str
+            The entry's directory.
+        """
+        return os.path.join(self.directory, key)
+
+    def load(self, key: str, names: Sequence[str]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Load a cache entry as read-only memory-mapped arrays.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        names : Sequence[str]
+            The names of the arrays to load.
+
+        Returns
+        -------
+        Optional[Dict[str, np.ndarray]]
+            The arrays, or None on a cache miss.
+        """
+        path = self.entry_path(key)
+        try:
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+        except (OSError, ValueError):
+            return None
+
+        # The entry's modification time doubles as its last access time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return arrays
+
+    def store(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Store arrays as a cache entry, evicting old entries if the cache is full.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        arrays : Dict[str, np.ndarray]
+            The arrays to store, by name.
+        """
+        path = self.entry_path(key)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(temp_path)
+            for name, array in arrays.items():
+                np.save(os.path.join(temp_path, f"{name}.npy"), np.ascontiguousarray(array))
+
+            # Entries are published atomically. If another thread won the race, keep theirs.
+            os.rename(temp_path, path)
+        except OSError:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in max_bytes.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+
+            for name in names:
+                path = os.path.join(self.directory, name)
+                if name.endswith(".tmp") or not os.path.isdir(path):
+                    continue
+
+                try:
+                    size = sum(entry.stat().st_size for entry in os.scandir(path))
+                    entries.append((os.stat(path).st_mtime, size, path))
+                except OSError:
+                    continue
+                total += size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,108 @@
+import numpy as np
+import pyqtgraph.opengl as gl
+
+from qtthree.geometry.registry import Geometry, geometry_registry
+
+UNIT_BOX_KEY = ("box",)
+
+
+def build_unit_box() -> Geometry:
+    """
+    Build the geometry for a unit box, spanning (0, 0, 0) to (1, 1, 1).
+
+    Returns
+    -------
+    Geometry
+        The unit box geometry.
+    """
+    vertices = np.array([
+        [1, 0, 0],
+        [0, 0, 0],
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 1, 0],
+        [1, 1, 1],
+        [0, 1, 1],
+        [1, 0, 1]
+    ], dtype=np.float32)
+
+    faces = np.array([
+        [1, 0, 7], [1, 3, 7],
+        [1, 2, 4], [1, 0, 4],
+        [1, 2, 6], [1, 3, 6],
+        [0, 4, 5], [0, 7, 5],
+        [2, 4, 5], [2, 6, 5],
+        [3, 6, 5], [3, 7, 5]
+    ], dtype=np.uint32)
+
+    return Geometry(UNIT_BOX_KEY, vertices, faces)
+
+
+def build_unit_sphere(rows: int, cols: int) -> Geometry:
+    """
+    Build the geometry for a unit sphere, centered on the origin.
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows of the tessellation.
+    cols : int
+        The number of columns of the tessellation.
+
+    Returns
+    -------
+    Geometry
+        The unit sphere geometry.
+    """
+    meshdata = gl.MeshData.sphere(rows=rows, cols=cols, radius=1.0)
+    return Geometry(unit_sphere_key(rows, cols), meshdata.vertexes().astype(np.float32), meshdata.faces().astype(np.uint32))
+
+
+def unit_sphere_key(rows: int, cols: int) -> tuple:
+    """
+    Get the geometry key of a unit sphere tessellation.
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows of the tessellation.
+    cols : int
+        The number of columns of the tessellation.
+
+    Returns
+    -------
+    tuple
+        The geometry key.
+    """
+    return ("sphere", rows, cols)
+
+
+def acquire_unit_box() -> Geometry:
+    """
+    Acquire the shared unit box geometry.
+
+    Returns
+    -------
+    Geometry
+        The unit box geometry, which must be released by the caller.
+    """
+    return geometry_registry.acquire(UNIT_BOX_KEY, build_unit_box)
+
+
+def acquire_unit_sphere(rows: int = 20, cols: int = 20) -> Geometry:
+    """
+    Acquire the shared unit sphere geometry for a tessellation.
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows of the tessellation.
+    cols : int
+        The number of columns of the tessellation.
+
+    Returns
+    -------
+    Geometry
+        The unit sphere geometry, which must be released by the caller.
+    """
+    return geometry_registry.acquire(unit_sphere_key(rows, cols), lambda: build_unit_sphere(rows, cols))
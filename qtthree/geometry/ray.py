@@ -0,0 +1,103 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def ray_box_intersection(origin: np.ndarray, inverse_direction: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> Tuple[float, float]:
+    """
+    Intersect a ray with an axis-aligned box, with the slab method.
+
+    Parameters
+    ----------
+    origin : np.ndarray
+        The origin of the ray.
+    inverse_direction : np.ndarray
+        The reciprocal of each component of the ray's direction.
+    lower : np.ndarray
+        The lower corner of the box.
+    upper : np.ndarray
+        The upper corner of the box.
+
+    Returns
+    -------
+    Tuple[float, float]
+        The distances along the ray where it enters and leaves the box.
+        The ray misses the box when the first one is greater than the second.
+    """
+    with np.errstate(invalid="ignore"):
+        first = (lower - origin) * inverse_direction
+        second = (upper - origin) * inverse_direction
+
+    # fmin and fmax skip the NaNs of rays running exactly along a slab's face
+    near = float(np.fmax.reduce(np.fmin(first, second)))
+    far = float(np.fmin.reduce(np.fmax(first, second)))
+    return near, far
+
+
+def ray_triangle_intersections(
+    origin: np.ndarray,
+    direction: np.ndarray,
+    first: np.ndarray,
+    second: np.ndarray,
+    third: np.ndarray
+) -> np.ndarray:
+    """
+    Intersect a ray with triangles, with the Möller-Trumbore algorithm.
+
+    Triangles are hit from either side.
+
+    Parameters
+    ----------
+    origin : np.ndarray
+        The origin of the ray.
+    direction : np.ndarray
+        The direction of the ray, which doesn't need to be normalized.
+    first : np.ndarray
+        The (M, 3) first corner of each triangle.
+    second : np.ndarray
+        The (M, 3) second corner of each triangle.
+    third : np.ndarray
+        The (M, 3) third corner of each triangle.
+
+    Returns
+    -------
+    np.ndarray
+        The (M,) distance along the ray, in units of the direction's length,
+        at which each triangle is hit, or infinity if it is missed.
+    """
+    edge1 = second - first
+    edge2 = third - first
+
+    p = np.cross(direction, edge2)
+    determinant = np.einsum("ij,ij->i", edge1, p)
+    valid = np.abs(determinant) > 1e-12
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse = np.where(valid, 1.0 / determinant, 0.0)
+
+    offset = origin - first
+    u = np.einsum("ij,ij->i", offset, p) * inverse
+
+    q = np.cross(offset, edge1)
+    v = (q @ direction) * inverse
+    t = np.einsum("ij,ij->i", q, edge2) * inverse
+
+    hit = valid & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t >= 0.0)
+    return np.where(hit, t, np.inf)
+
+
+class RayHit:
+    """
+    Where a ray hits a triangle mesh.
+    """
+    distance: float
+    point: np.ndarray
+    normal: np.ndarray
+    # Index of the triangle hit, in the order of the geometry's faces
+    triangle: int
+
+    def __init__(self, distance: float, point: np.ndarray, normal: np.ndarray, triangle: int) -> None:
+        self.distance = distance
+        self.point = point
+        self.normal = normal
+        self.triangle = triangle
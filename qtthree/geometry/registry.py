@@ -0,0 +1,254 @@
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pyqtgraph.opengl as gl
+
+from qtthree.geometry.triangle_bvh import TriangleBVH
+
+
+class Geometry:
+    """
+    Base geometry shared by every shape that references it.
+
+    The arrays are read-only, so a single instance (and the MeshData built
+    from it) can back any number of shapes. A shape that needs different
+    geometry acquires another instance from the registry instead.
+    """
+    key: Hashable
+    vertexes: np.ndarray
+    faces: Optional[np.ndarray]
+    meshdata: gl.MeshData
+
+    # Bounding box and sphere of the vertices, in the geometry's own coordinates
+    lower: np.ndarray
+    upper: np.ndarray
+    center: np.ndarray
+    radius: float
+
+    # Triangle BVH for ray queries, built the first time one is made
+    _triangle_bvh: Optional[TriangleBVH] = None
+
+    def __init__(self, key: Hashable, vertexes: np.ndarray, faces: Optional[np.ndarray] = None) -> None:
+        self.key = key
+        self.vertexes = self._freeze(vertexes)
+        self.faces = self._freeze(faces) if faces is not None else None
+
+        if self.faces is None:
+            self.meshdata = gl.MeshData(vertexes=self.vertexes)
+        else:
+            self.meshdata = gl.MeshData(vertexes=self.vertexes, faces=self.faces)
+
+        self.lower, self.upper, self.center, self.radius = self._bounds(self.vertexes)
+
+    def triangles(self) -> np.ndarray:
+        """
+        Get the corners of every triangle of the geometry.
+
+        Returns
+        -------
+        np.ndarray
+            The (M, 3, 3) corners of each triangle.
+        """
+        vertexes = np.asarray(self.vertexes, dtype=np.float64)
+        if self.faces is None:
+            return vertexes.reshape(-1, 3, 3)
+
+        return vertexes[self.faces]
+
+    def triangle_bvh(self) -> TriangleBVH:
+        """
+        Get the triangle BVH of the geometry, building it on first use.
+
+        The BVH is cached with the geometry, so it is shared by every shape using it,
+        and freed with it once the last of them releases it.
+
+        Returns
+        -------
+        TriangleBVH
+            The triangle BVH.
+        """
+        if self._triangle_bvh is None:
+            self._triangle_bvh = TriangleBVH(self.triangles())
+
+        return self._triangle_bvh
+
+    @staticmethod
+    def _bounds(vertexes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """
+        Compute the bounding box of the vertices, and a bounding sphere centered on it.
+
+        Parameters
+        ----------
+        vertexes : np.ndarray
+            The vertex array.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray, float]
+            The lower and upper corners of the box, and the center and radius of the sphere.
+        """
+        points = np.asarray(vertexes, dtype=np.float64).reshape(-1, 3)
+        if not len(points):
+            return np.zeros(3), np.zeros(3), np.zeros(3), 0.0
+
+        lower, upper = points.min(axis=0), points.max(axis=0)
+        center = (lower + upper) / 2.0
+        radius = float(np.sqrt(np.max(np.sum((points - center) ** 2, axis=1))))
+        return lower, upper, center, radius
+
+    @staticmethod
+    def _freeze(array: np.ndarray) -> np.ndarray:
+        """
+        Mark an array as read-only.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            The array to freeze.
+
+        Returns
+        -------
+        np.ndarray
+            The same array, now read-only.
+        """
+        array.flags.writeable = False
+        return array
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory used by the geometry's arrays, and its triangle BVH once built.
+
+        Returns
+        -------
+        int
+            The size of the arrays, in bytes.
+        """
+        nbytes = self.vertexes.nbytes + (self.faces.nbytes if self.faces is not None else 0)
+        if self._triangle_bvh is not None:
+            nbytes += self._triangle_bvh.nbytes
+
+        return nbytes
+
+
+class GeometryRegistry:
+    """
+    Reference-counted registry of shared geometry.
+
+    Geometry is built once per key, and freed once the last shape
+    referencing it releases it. Building runs outside of the registry lock,
+    so worker threads can build different geometries in parallel, while
+    concurrent requests for the same key wait for a single build.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Geometry] = {}
+        self._refcounts: Dict[Hashable, int] = {}
+        self._building: Dict[Hashable, threading.Event] = {}
+
+    def acquire(self, key: Hashable, factory: Callable[[], Geometry]) -> Geometry:
+        """
+        Get a reference to the geometry for a key, building it if needed.
+
+        Every call must be balanced by a call to release.
+
+        Parameters
+        ----------
+        key : Hashable
+            The geometry key.
+        factory : Callable[[], Geometry]
+            Builds the geometry if it is not registered yet.
+
+        Returns
+        -------
+        Geometry
+            The shared geometry.
+        """
+        while True:
+            with self._lock:
+                geometry = self._entries.get(key)
+                if geometry is not None:
+                    self._refcounts[key] += 1
+                    return geometry
+
+                building = self._building.get(key)
+                if building is None:
+                    building = threading.Event()
+                    self._building[key] = building
+                    break
+
+            # Another thread is building this geometry, wait for it and try again
+            building.wait()
+
+        try:
+            geometry = factory()
+        except BaseException:
+            with self._lock:
+                del self._building[key]
+            building.set()
+            raise
+
+        with self._lock:
+            self._entries[key] = geometry
+            self._refcounts[key] = 1
+            del self._building[key]
+        building.set()
+
+        return geometry
+
+    def release(self, geometry: Geometry) -> None:
+        """
+        Drop a reference to a geometry, freeing it if it was the last one.
+
+        Parameters
+        ----------
+        geometry : Geometry
+            The geometry to release.
+        """
+        with self._lock:
+            key = geometry.key
+            if self._entries.get(key) is not geometry:
+                return
+
+            self._refcounts[key] -= 1
+            if self._refcounts[key] <= 0:
+                del self._entries[key]
+                del self._refcounts[key]
+
+    def refcount(self, key: Hashable) -> int:
+        """
+        Get the number of references to the geometry for a key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The geometry key.
+
+        Returns
+        -------
+        int
+            The number of references.
+        """
+        with self._lock:
+            return self._refcounts.get(key, 0)
+
+    def geometries(self) -> List[Geometry]:
+        """
+        Get every registered geometry.
+
+        Returns
+        -------
+        List[Geometry]
+            The registered geometries.
+        """
+        with self._lock:
+            return list(self._entries.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+geometry_registry = GeometryRegistry()
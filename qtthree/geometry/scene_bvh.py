@@ -0,0 +1,341 @@
+import heapq
+import itertools
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from qtthree.geometry.ray import ray_box_intersection
+
+Bounds = Tuple[np.ndarray, np.ndarray]
+
+
+class BVHNode:
+    """
+    A node of a SceneBVH. Leaves hold item keys, other nodes hold two children.
+    """
+    __slots__ = ("lower", "upper", "parent", "children", "keys", "height")
+
+    def __init__(self, parent: Optional["BVHNode"] = None) -> None:
+        self.lower = np.full(3, np.inf)
+        self.upper = np.full(3, -np.inf)
+        self.parent = parent
+        self.children: Optional[List["BVHNode"]] = None
+        self.keys: Optional[List[Hashable]] = []
+        # Length of the longest path down to a leaf
+        self.height = 0
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.children is None
+
+
+class SceneBVH:
+    """
+    Bounding volume hierarchy over the axis-aligned bounds of the items of a scene.
+
+    Items are inserted by walking down to the leaf they enlarge the least, and
+    leaves are split once they are full. Inserting items in spatial order, e.g. a row
+    of shapes, keeps splitting the same side of the tree, so nodes whose children's
+    heights differ by more than one are rotated, as in a dynamic AABB tree. The tree
+    stays balanced, and insertions, removals and queries are logarithmic.
+    Items that move are only marked stale; their leaves and ancestors are refit
+    before the next query, without changing the tree's structure.
+    """
+    LEAF_SIZE = 4
+
+    bounds_of: Callable[[Hashable], Bounds]
+    root: Optional[BVHNode]
+    # Incremented whenever an item is added, removed or moved
+    version: int = 0
+
+    def __init__(self, bounds_of: Callable[[Hashable], Bounds]) -> None:
+        self.bounds_of = bounds_of
+        self.root = None
+        self.leaves: Dict[Hashable, BVHNode] = {}
+        self.bounds: Dict[Hashable, Bounds] = {}
+        self.stale: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.leaves
+
+    def clear(self) -> None:
+        """
+        Remove every item.
+        """
+        self.root = None
+        self.leaves.clear()
+        self.bounds.clear()
+        self.stale.clear()
+        self.version += 1
+
+    def insert(self, key: Hashable) -> None:
+        """
+        Add an item.
+
+        Parameters
+        ----------
+        key : Hashable
+            The item's key, passed to bounds_of.
+        """
+        if key in self.leaves:
+            self.invalidate(key)
+            return
+
+        self.version += 1
+        lower, upper = self.bounds[key] = self._fetch_bounds(key)
+        if self.root is None:
+            self.root = BVHNode()
+
+        node = self.root
+        while not node.is_leaf:
+            self._grow(node, lower, upper)
+            node = min(node.children, key=lambda child: self._enlargement(child, lower, upper))
+
+        node.keys.append(key)
+        self.leaves[key] = node
+        self._grow(node, lower, upper)
+
+        if len(node.keys) > self.LEAF_SIZE:
+            self._split(node)
+            self._rebalance(node)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove an item.
+
+        Parameters
+        ----------
+        key : Hashable
+            The item's key.
+        """
+        leaf = self.leaves.pop(key, None)
+        if leaf is None:
+            return
+
+        self.version += 1
+        del self.bounds[key]
+        self.stale.discard(key)
+        leaf.keys.remove(key)
+
+        if leaf.keys or leaf.parent is None:
+            self._refit(leaf)
+            return
+
+        # Replace the leaf's parent with the leaf's sibling
+        parent = leaf.parent
+        sibling = parent.children[0] if parent.children[1] is leaf else parent.children[1]
+        grandparent = parent.parent
+        sibling.parent = grandparent
+
+        if grandparent is None:
+            self.root = sibling
+            return
+
+        grandparent.children[grandparent.children.index(parent)] = sibling
+        self._rebalance(grandparent)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Mark an item as moved. Its bounds are fetched again before the next query.
+
+        Parameters
+        ----------
+        key : Hashable
+            The item's key.
+        """
+        if key in self.leaves:
+            self.stale.add(key)
+            self.version += 1
+
+    def refit(self) -> None:
+        """
+        Fetch the bounds of the moved items, and refit the nodes above them.
+        """
+        stale, self.stale = self.stale, set()
+        for key in stale:
+            self.bounds[key] = self._fetch_bounds(key)
+            self._refit(self.leaves[key])
+
+    def cast(
+        self,
+        origin: np.ndarray,
+        direction: np.ndarray,
+        hit_test: Callable[[Hashable], Optional[float]],
+        max_distance: float = np.inf
+    ) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the nearest item hit by a ray.
+
+        Nodes are visited nearest first, and the search stops once the nearest
+        remaining node is further away than the nearest hit found so far,
+        so only the items around the ray are tested.
+
+        Parameters
+        ----------
+        origin : np.ndarray
+            The origin of the ray.
+        direction : np.ndarray
+            The normalized direction of the ray.
+        hit_test : Callable[[Hashable], Optional[float]]
+            Exact test of an item whose bounds are hit, returning the distance
+            along the ray at which the item is hit, or None if it is missed.
+        max_distance : float
+            Hits further away than this are ignored.
+
+        Returns
+        -------
+        Optional[Tuple[Hashable, float]]
+            The key of the nearest item hit and its distance, or None if nothing is hit.
+        """
+        self.refit()
+        if self.root is None:
+            return None
+
+        with np.errstate(divide="ignore"):
+            inverse_direction = 1.0 / np.asarray(direction, dtype=float)
+
+        nearest: Optional[Tuple[Hashable, float]] = None
+        best = max_distance
+
+        # The counter keeps the heap from comparing nodes at equal distances
+        counter = itertools.count()
+        queue = [(0.0, next(counter), self.root)]
+        while queue:
+            entry, _, node = heapq.heappop(queue)
+            if entry >= best:
+                break
+
+            if node.is_leaf:
+                for key in node.keys:
+                    near, far = ray_box_intersection(origin, inverse_direction, *self.bounds[key])
+                    if near > far or far < 0.0 or near >= best:
+                        continue
+
+                    distance = hit_test(key)
+                    if distance is not None and distance < best:
+                        nearest, best = (key, distance), distance
+                continue
+
+            for child in node.children:
+                near, far = ray_box_intersection(origin, inverse_direction, child.lower, child.upper)
+                if near <= far and far >= 0.0 and near < best:
+                    heapq.heappush(queue, (max(near, 0.0), next(counter), child))
+
+        return nearest
+
+    def _fetch_bounds(self, key: Hashable) -> Bounds:
+        lower, upper = self.bounds_of(key)
+        return np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+
+    @staticmethod
+    def _grow(node: BVHNode, lower: np.ndarray, upper: np.ndarray) -> None:
+        np.minimum(node.lower, lower, out=node.lower)
+        np.maximum(node.upper, upper, out=node.upper)
+
+    @staticmethod
+    def _surface(lower: np.ndarray, upper: np.ndarray) -> float:
+        size = np.maximum(upper - lower, 0.0)
+        return float(size[0] * size[1] + size[1] * size[2] + size[2] * size[0])
+
+    def _enlargement(self, node: BVHNode, lower: np.ndarray, upper: np.ndarray) -> float:
+        """
+        How much a node's surface area grows if it has to contain some bounds.
+        """
+        grown = self._surface(np.minimum(node.lower, lower), np.maximum(node.upper, upper))
+        return grown - self._surface(node.lower, node.upper)
+
+    def _split(self, leaf: BVHNode) -> None:
+        """
+        Turn a full leaf into a node with two leaves, split at the median along its longest axis.
+        """
+        keys = leaf.keys
+        centers = np.array([(self.bounds[key][0] + self.bounds[key][1]) / 2.0 for key in keys])
+        axis = int(np.argmax(centers.max(axis=0) - centers.min(axis=0)))
+        order = np.argsort(centers[:, axis], kind="stable")
+        half = len(keys) // 2
+
+        leaf.keys = None
+        leaf.children = [BVHNode(leaf), BVHNode(leaf)]
+        for child, indices in zip(leaf.children, (order[:half], order[half:])):
+            child.keys = [keys[i] for i in indices]
+            for key in child.keys:
+                self.leaves[key] = child
+                self._grow(child, *self.bounds[key])
+
+    @staticmethod
+    def _update(node: BVHNode) -> None:
+        """
+        Recompute the bounds and height of a node from its children.
+        """
+        first, second = node.children
+        node.lower = np.minimum(first.lower, second.lower)
+        node.upper = np.maximum(first.upper, second.upper)
+        node.height = 1 + max(first.height, second.height)
+
+    def _rebalance(self, node: Optional[BVHNode]) -> None:
+        """
+        Update a node and its ancestors after the tree's structure changed below it, rotating the unbalanced ones.
+        """
+        while node is not None:
+            if not node.is_leaf:
+                self._update(node)
+                node = self._rotate(node)
+            node = node.parent
+
+    def _rotate(self, node: BVHNode) -> BVHNode:
+        """
+        If the heights of a node's children differ by more than one, promote the taller child into its place.
+
+        The promoted child keeps its taller child, and hands the other one over to the node.
+
+        Returns
+        -------
+        BVHNode
+            The node now in the place of the given one.
+        """
+        first, second = node.children
+        if abs(first.height - second.height) <= 1:
+            return node
+
+        short, tall = (first, second) if second.height > first.height else (second, first)
+        left, right = tall.children
+        kept, given = (left, right) if left.height > right.height else (right, left)
+
+        parent = tall.parent = node.parent
+        if parent is None:
+            self.root = tall
+        else:
+            parent.children[parent.children.index(node)] = tall
+
+        node.children = [short, given]
+        given.parent = node
+        tall.children = [node, kept]
+        node.parent = tall
+
+        self._update(node)
+        self._update(tall)
+        return tall
+
+    def _refit(self, node: Optional[BVHNode]) -> None:
+        """
+        Recompute the bounds of a node and its ancestors, stopping once they don't change.
+        """
+        while node is not None:
+            lower, upper = np.full(3, np.inf), np.full(3, -np.inf)
+            if node.is_leaf:
+                for key in node.keys:
+                    np.minimum(lower, self.bounds[key][0], out=lower)
+                    np.maximum(upper, self.bounds[key][1], out=upper)
+            else:
+                for child in node.children:
+                    np.minimum(lower, child.lower, out=lower)
+                    np.maximum(upper, child.upper, out=upper)
+
+            if np.array_equal(lower, node.lower) and np.array_equal(upper, node.upper):
+                return
+
+            node.lower, node.upper = lower, upper
+            node = node.parent
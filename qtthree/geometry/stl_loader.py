@@ -0,0 +1,185 @@
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from stl import mesh as stl_mesh
+
+from qtthree.geometry.decimate import decimate_mesh
+from qtthree.geometry.lod import cluster_vertices
+from qtthree.geometry.mesh_cache import MeshCache
+from qtthree.geometry.weld import weld_vertices
+
+mesh_cache = MeshCache()
+
+# A triangle of a binary STL file: its normal, its three corners and an attribute count
+STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vectors", "<f4", (3, 3)), ("attributes", "<u2")])
+
+
+def load_stl(file_path: str, cache: MeshCache = mesh_cache) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load an STL file as an indexed mesh.
+
+    The triangle soup stored in the file is welded into shared vertices.
+    Warm loads are served from the mesh cache as memory-mapped arrays,
+    skipping STL parsing and welding entirely. Safe to call from worker threads.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the STL file.
+    cache : MeshCache
+        The cache to use.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The read-only (V, 3) vertex array and (M, 3) face array.
+    """
+    key = cache.key_for_file(file_path, "welded")
+    if key is not None:
+        cached = cache.load(key, ("vertexes", "faces"))
+        if cached is not None:
+            return cached["vertexes"], cached["faces"]
+
+    vertexes, faces = weld_vertices(stl_mesh.Mesh.from_file(file_path).vectors)
+    vertexes.flags.writeable = False
+    faces.flags.writeable = False
+
+    if key is not None:
+        cache.store(key, {"vertexes": vertexes, "faces": faces})
+
+    return vertexes, faces
+
+
+def stl_summary(file_path: str, cache: MeshCache = mesh_cache) -> Tuple[int, float]:
+    """
+    Get the number of triangles of an STL file, and the size of its bounding box, without welding it.
+
+    Binary files give their triangle count in their header, and their corners are
+    read straight from a memory map. ASCII files have no count, so they are loaded
+    (and cached) with load_stl. Safe to call from worker threads.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the STL file.
+    cache : MeshCache
+        The cache to use for ASCII files.
+
+    Returns
+    -------
+    Tuple[int, float]
+        The number of triangles, and the length of the longest side of the bounding box.
+    """
+    with open(file_path, "rb") as file:
+        header = file.read(84)
+
+    count = int(np.frombuffer(header, dtype="<u4", count=1, offset=80)[0]) if len(header) == 84 else -1
+    if count >= 0 and os.path.getsize(file_path) == 84 + count * STL_RECORD.itemsize:
+        if count == 0:
+            return 0, 0.0
+
+        corners = np.memmap(file_path, dtype=STL_RECORD, mode="r", offset=84, shape=(count,))["vectors"].reshape(-1, 3)
+    else:
+        corners, faces = load_stl(file_path, cache)
+        count = len(faces)
+        if not len(corners):
+            return count, 0.0
+
+    return count, float(np.max(corners.max(axis=0) - corners.min(axis=0)))
+
+
+def load_stl_lod(
+    file_path: str,
+    resolution: int,
+    decimation: Optional[Dict[str, float]] = None,
+    cache: MeshCache = mesh_cache
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load a simplified level of detail of an STL file.
+
+    The level is built by vertex clustering from the welded mesh, or from the decimated
+    one if the file was simplified on import, and kept in the mesh cache alongside it.
+    Safe to call from worker threads.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the STL file.
+    resolution : int
+        The clustering grid resolution, see cluster_vertices.
+    decimation : Optional[Dict[str, float]]
+        The decimation settings of the base mesh (target_faces and/or max_error), or None for the full mesh.
+    cache : MeshCache
+        The cache to use.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The read-only (V, 3) vertex array and (M, 3) face array.
+    """
+    target_faces = max_error = None
+    if decimation:
+        target_faces, max_error = decimation.get("target_faces"), decimation.get("max_error")
+        key = cache.key_for_file(file_path, "clustered", resolution, "decimated", target_faces, max_error)
+    else:
+        key = cache.key_for_file(file_path, "clustered", resolution)
+
+    if key is not None:
+        cached = cache.load(key, ("vertexes", "faces"))
+        if cached is not None:
+            return cached["vertexes"], cached["faces"]
+
+    base = load_stl_decimated(file_path, target_faces, max_error, cache) if decimation else load_stl(file_path, cache)
+    vertexes, faces = cluster_vertices(*base, resolution)
+    vertexes.flags.writeable = False
+    faces.flags.writeable = False
+
+    if key is not None:
+        cache.store(key, {"vertexes": vertexes, "faces": faces})
+
+    return vertexes, faces
+
+
+def load_stl_decimated(
+    file_path: str,
+    target_faces: Optional[int] = None,
+    max_error: Optional[float] = None,
+    cache: MeshCache = mesh_cache
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load an STL file, simplified with quadric error decimation.
+
+    The decimated mesh is kept in the mesh cache, keyed by the file and the
+    decimation settings, so it is only computed once. Safe to call from worker threads.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the STL file.
+    target_faces : Optional[int]
+        The number of triangles to simplify down to.
+    max_error : Optional[float]
+        The largest error allowed for a collapse, see decimate_mesh.
+    cache : MeshCache
+        The cache to use.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The read-only (V, 3) vertex array and (M, 3) face array.
+    """
+    key = cache.key_for_file(file_path, "decimated", target_faces, max_error)
+    if key is not None:
+        cached = cache.load(key, ("vertexes", "faces"))
+        if cached is not None:
+            return cached["vertexes"], cached["faces"]
+
+    vertexes, faces = decimate_mesh(*load_stl(file_path, cache), target_faces=target_faces, max_error=max_error)
+    vertexes.flags.writeable = False
+    faces.flags.writeable = False
+
+    if key is not None:
+        cache.store(key, {"vertexes": vertexes, "faces": faces})
+
+    return vertexes, faces
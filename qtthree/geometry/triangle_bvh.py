@@ -0,0 +1,197 @@
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from qtthree.geometry.ray import RayHit, ray_triangle_intersections
+
+
+def morton_codes(points: np.ndarray) -> np.ndarray:
+    """
+    Get the Morton code of points, which orders them along a Z-order curve through their bounding box.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        The (N, 3) points.
+
+    Returns
+    -------
+    np.ndarray
+        The (N,) codes, with 21 bits per axis.
+    """
+    lower = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lower, 1e-12)
+    cells = ((points - lower) / extent * 0x1fffff).astype(np.uint64)
+
+    codes = np.zeros(len(points), dtype=np.uint64)
+    for axis in range(3):
+        # Spread the 21 bits of the coordinate two bits apart
+        x = cells[:, axis] & np.uint64(0x1fffff)
+        x = (x | (x << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+        x = (x | (x << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+        x = (x | (x << np.uint64(8))) & np.uint64(0x100f00f00f00f00f)
+        x = (x | (x << np.uint64(4))) & np.uint64(0x10c30c30c30c30c3)
+        x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+        codes |= x << np.uint64(2 - axis)
+
+    return codes
+
+
+class TriangleBVH:
+    """
+    Bounding volume hierarchy over the triangles of a mesh.
+
+    Triangles are sorted along a Z-order curve, grouped into leaves of LEAF_SIZE
+    neighbouring triangles, and paired up level by level into a balanced binary tree.
+    Building and traversal are vectorized over whole levels of the tree, so even
+    million-triangle meshes are built in a fraction of a second, and rays only test
+    the triangles of the few leaves whose boxes they cross.
+    """
+    LEAF_SIZE = 8
+    # Traversal starts at the first level with at least this many nodes, as testing
+    # a few hundred boxes at once costs about as much as testing a single one
+    START_NODES = 256
+
+    # Triangles sorted into leaf order, and their index in the original order
+    triangles: np.ndarray
+    order: np.ndarray
+
+    # Bounds of the nodes of each level, from the root down to the leaves.
+    # The children of node i are nodes 2i and 2i + 1 of the next level.
+    lowers: List[np.ndarray]
+    uppers: List[np.ndarray]
+
+    def __init__(self, triangles: np.ndarray) -> None:
+        triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 3)
+        self.lowers, self.uppers = [], []
+
+        if not len(triangles):
+            self.triangles, self.order = triangles, np.zeros(0, dtype=np.int64)
+            return
+
+        lowers, uppers = triangles.min(axis=1), triangles.max(axis=1)
+        self.order = np.argsort(morton_codes((lowers + uppers) / 2.0), kind="stable")
+        self.triangles = triangles[self.order]
+
+        starts = np.arange(0, len(triangles), self.LEAF_SIZE)
+        lower = np.minimum.reduceat(lowers[self.order], starts)
+        upper = np.maximum.reduceat(uppers[self.order], starts)
+        depth = math.ceil(math.log2(len(starts))) if len(starts) > 1 else 0
+
+        levels = [(lower, upper)]
+        for _ in range(depth):
+            if len(lower) % 2:
+                # The last node of an odd level has a single child
+                lower = np.vstack([lower, lower[-1:]])
+                upper = np.vstack([upper, upper[-1:]])
+
+            lower = np.minimum(lower[0::2], lower[1::2])
+            upper = np.maximum(upper[0::2], upper[1::2])
+            levels.append((lower, upper))
+
+        levels.reverse()
+        self.lowers = [lower for lower, _ in levels]
+        self.uppers = [upper for _, upper in levels]
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory used by the hierarchy, including its copy of the triangles.
+
+        Returns
+        -------
+        int
+            The size of the arrays, in bytes.
+        """
+        return self.triangles.nbytes + self.order.nbytes + sum(array.nbytes for array in self.lowers + self.uppers)
+
+    @staticmethod
+    def _crossed(lower: np.ndarray, upper: np.ndarray, origin: np.ndarray, inverse_direction: np.ndarray, max_distance: float) -> np.ndarray:
+        """
+        Test which boxes a ray crosses, with the slab method.
+
+        Must be called with invalid floating point operations ignored.
+
+        Parameters
+        ----------
+        lower : np.ndarray
+            The (N, 3) lower corners of the boxes.
+        upper : np.ndarray
+            The (N, 3) upper corners of the boxes.
+        origin : np.ndarray
+            The origin of the ray.
+        inverse_direction : np.ndarray
+            The reciprocal of each component of the ray's direction.
+        max_distance : float
+            Boxes further away than this are not crossed.
+
+        Returns
+        -------
+        np.ndarray
+            The (N,) mask of the boxes crossed.
+        """
+        first = (lower - origin) * inverse_direction
+        second = (upper - origin) * inverse_direction
+        near = np.fmax.reduce(np.fmin(first, second), axis=1)
+        far = np.fmin.reduce(np.fmax(first, second), axis=1)
+        return (near <= far) & (far >= 0.0) & (near <= max_distance)
+
+    def intersect(self, origin: np.ndarray, direction: np.ndarray, max_distance: float = np.inf) -> Optional[RayHit]:
+        """
+        Find where a ray first hits the mesh.
+
+        Parameters
+        ----------
+        origin : np.ndarray
+            The origin of the ray.
+        direction : np.ndarray
+            The direction of the ray, which doesn't need to be normalized.
+        max_distance : float
+            Hits further away than this, in units of the direction's length, are ignored.
+
+        Returns
+        -------
+        Optional[RayHit]
+            The nearest hit, with the normal given by the triangle's winding, or None if the mesh is missed.
+        """
+        if not self.lowers:
+            return None
+
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+
+        start = next((level for level, lower in enumerate(self.lowers) if len(lower) >= self.START_NODES), len(self.lowers) - 1)
+        nodes = np.arange(len(self.lowers[start]))
+
+        # Walk down the tree one level at a time, keeping every node the ray crosses
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse_direction = 1.0 / direction
+            for level in range(start, len(self.lowers)):
+                lower, upper = self.lowers[level], self.uppers[level]
+                if level > start:
+                    nodes = (nodes[:, None] * 2 + np.arange(2)).ravel()
+                    nodes = nodes[nodes < len(lower)]
+
+                nodes = nodes[self._crossed(lower[nodes], upper[nodes], origin, inverse_direction, max_distance)]
+                if not len(nodes):
+                    return None
+
+        indices = (nodes[:, None] * self.LEAF_SIZE + np.arange(self.LEAF_SIZE)).ravel()
+        indices = indices[indices < len(self.triangles)]
+
+        triangles = self.triangles[indices]
+        distances = ray_triangle_intersections(origin, direction, triangles[:, 0], triangles[:, 1], triangles[:, 2])
+        nearest = int(np.argmin(distances))
+        distance = float(distances[nearest])
+        if not np.isfinite(distance) or distance > max_distance:
+            return None
+
+        first, second, third = triangles[nearest]
+        normal = np.cross(second - first, third - first)
+        normal /= np.linalg.norm(normal)
+
+        return RayHit(distance, origin + distance * direction, normal, int(self.order[indices[nearest]]))
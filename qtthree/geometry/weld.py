@@ -0,0 +1,56 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Default welding tolerance, relative to the largest extent of the mesh
+RELATIVE_TOLERANCE = 1e-6
+
+
+def weld_vertices(vectors: np.ndarray, tolerance: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weld the vertices of a triangle soup into an indexed mesh.
+
+    STL files store three private vertices per triangle. Vertices that fall
+    within the tolerance of each other are merged into one, by snapping them
+    to a grid and deduplicating the grid cells. Triangles that collapse
+    because two of their corners were merged are dropped.
+
+    Parameters
+    ----------
+    vectors : np.ndarray
+        The (N, 3, 3) array of triangle vertices.
+    tolerance : Optional[float]
+        The distance under which vertices are merged. Defaults to a small
+        fraction of the mesh's largest extent.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The (V, 3) float32 vertex array and the (M, 3) uint32 face array.
+    """
+    points = np.asarray(vectors, dtype=np.float32).reshape(-1, 3)
+    if not len(points):
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.uint32)
+
+    if tolerance is None:
+        extent = float(np.max(points.max(axis=0) - points.min(axis=0)))
+        tolerance = max(extent * RELATIVE_TOLERANCE, np.finfo(np.float32).tiny)
+
+    cells = np.floor(points / tolerance + 0.5).astype(np.int64)
+
+    # Deduplicating rows is much faster on an opaque view of each row than with np.unique(axis=0)
+    rows = np.ascontiguousarray(cells).view(np.dtype((np.void, cells.dtype.itemsize * 3))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+
+    # Keep vertices in the order they are first referenced, for better cache locality
+    order = np.argsort(first, kind="stable")
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+
+    vertices = points[first[order]]
+    faces = remap[inverse.ravel()].reshape(-1, 3)
+
+    degenerate = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 0] == faces[:, 2])
+    faces = faces[~degenerate]
+
+    return vertices, faces.astype(np.uint32)
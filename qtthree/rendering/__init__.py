@@ -0,0 +1,7 @@
+from qtthree.rendering.frame_scheduler import FrameScheduler
+from qtthree.rendering.id_buffer import IdBuffer
+from qtthree.rendering.instanced_renderer import InstancedRenderer, InstanceGroup
+from qtthree.rendering.mesh_buffers import MeshBufferCache, MeshBuffers, mesh_buffers
+from qtthree.rendering.shape_mesh_item import ShapeMeshItem
+
+__all__ = ["FrameScheduler", "IdBuffer", "InstanceGroup", "InstancedRenderer", "MeshBufferCache", "MeshBuffers", "ShapeMeshItem", "mesh_buffers"]
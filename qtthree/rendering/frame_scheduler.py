@@ -0,0 +1,147 @@
+import time
+from typing import Callable, Dict, Optional
+
+from PySide2 import QtCore
+from PySide2.QtGui import QGuiApplication
+
+
+class FrameScheduler(QtCore.QObject):
+    """
+    Coalesces repaint requests into at most one frame per interval, and no frames while idle.
+
+    Every request made while a frame is already scheduled is folded into it. A frame
+    is scheduled no sooner than one interval after the previous frame started, so
+    a burst of requests costs a single repaint. Nothing runs while nothing is requested.
+    """
+    present: Callable[[], None]
+    timer: QtCore.QTimer
+    max_fps: float
+    pending: bool = False
+    last_frame: float = 0.0
+
+    # Repaints requested, frames scheduled for them, and frames actually painted
+    requested: int = 0
+    scheduled: int = 0
+    painted: int = 0
+
+    DEFAULT_FPS = 60.0
+
+    # Emitted as a frame starts, before anything is drawn, for state to be brought up to date for it
+    frameStarted = QtCore.Signal()
+
+    def __init__(self, present: Callable[[], None], max_fps: Optional[float] = None, parent=None) -> None:
+        super().__init__(parent)
+        self.present = present
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self.schedule_frame)
+
+        self.set_max_fps(max_fps)
+
+    @classmethod
+    def display_refresh_rate(cls) -> float:
+        """
+        Get the refresh rate of the primary screen.
+
+        Returns
+        -------
+        float
+            The refresh rate, in Hz, or DEFAULT_FPS if it is unknown.
+        """
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0.0
+        return rate if rate > 0.0 else cls.DEFAULT_FPS
+
+    def set_max_fps(self, max_fps: Optional[float]) -> None:
+        """
+        Set the highest frame rate.
+
+        Parameters
+        ----------
+        max_fps : Optional[float]
+            The frame rate, or None for the display's refresh rate.
+        """
+        self.max_fps = max_fps if max_fps is not None and max_fps > 0.0 else self.display_refresh_rate()
+
+    @property
+    def interval(self) -> float:
+        """
+        The shortest time between the start of two frames.
+
+        Returns
+        -------
+        float
+            The interval, in seconds.
+        """
+        return 1.0 / self.max_fps
+
+    def request(self) -> None:
+        """
+        Request a repaint, scheduling a frame unless one is already scheduled.
+        """
+        self.requested += 1
+        if self.pending:
+            return
+
+        self.pending = True
+        delay = self.interval - (time.perf_counter() - self.last_frame)
+        if delay <= 0.0:
+            self.schedule_frame()
+        else:
+            self.timer.start(int(delay * 1000))
+
+    def schedule_frame(self) -> None:
+        """
+        Ask the widget for the scheduled frame.
+        """
+        self.scheduled += 1
+        self.present()
+
+    def frame_started(self) -> None:
+        """
+        Called by the widget as it starts painting a frame, scheduled or not (e.g. after a resize).
+        """
+        self.timer.stop()
+
+        # Requests made by the frame start hooks are drawn by this frame
+        self.pending = True
+        self.frameStarted.emit()
+        self.pending = False
+        self.painted += 1
+        self.last_frame = time.perf_counter()
+
+    @property
+    def coalesced(self) -> int:
+        """
+        The number of requests folded into an already scheduled frame.
+
+        Returns
+        -------
+        int
+            The number of repaints avoided.
+        """
+        return self.requested - self.scheduled
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the frame counters.
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of repaints requested, frames scheduled, frames painted, and requests coalesced.
+        """
+        return {
+            "requested": self.requested,
+            "scheduled": self.scheduled,
+            "painted": self.painted,
+            "coalesced": self.coalesced,
+        }
+
+    def reset_stats(self) -> None:
+        """
+        Reset the frame counters.
+        """
+        self.requested = self.scheduled = self.painted = 0
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Hashable, List, Optional
+
+import numpy as np
+from OpenGL import GL
+from PySide2.QtGui import QOpenGLFramebufferObject
+
+if TYPE_CHECKING:
+    from qtthree.shapes.abstract_shape import AbstractShape
+
+
+class IdBuffer:
+    """
+    Offscreen buffer with every shape drawn in a flat color encoding its index.
+
+    The buffer is only rendered again once the key it was rendered for changes
+    (e.g. the camera or the scene), so finding the shape under a pixel is a
+    single one-pixel read back, whatever the number of shapes.
+
+    All methods must be called with the context current.
+    """
+    framebuffer: Optional[QOpenGLFramebufferObject] = None
+    shapes: List[AbstractShape]
+    key: Optional[Hashable] = None
+
+    def __init__(self) -> None:
+        self.shapes = []
+
+    @staticmethod
+    def encode(index: int) -> tuple:
+        """
+        Get the color encoding a shape's index. Index 0 is encoded as 1, as 0 is the background.
+
+        Parameters
+        ----------
+        index : int
+            The index of the shape.
+
+        Returns
+        -------
+        tuple
+            The RGBA color, as floats.
+        """
+        value = index + 1
+        return ((value & 0xff) / 255.0, ((value >> 8) & 0xff) / 255.0, ((value >> 16) & 0xff) / 255.0, 1.0)
+
+    @staticmethod
+    def decode(pixel: np.ndarray) -> int:
+        """
+        Get the index of the shape encoded by a pixel.
+
+        Parameters
+        ----------
+        pixel : np.ndarray
+            The RGBA bytes of the pixel.
+
+        Returns
+        -------
+        int
+            The index of the shape, or -1 for the background.
+        """
+        return (int(pixel[0]) | int(pixel[1]) << 8 | int(pixel[2]) << 16) - 1
+
+    def is_current(self, key: Hashable) -> bool:
+        """
+        Check whether the buffer was rendered for a key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key, e.g. the camera matrices and the scene version.
+
+        Returns
+        -------
+        bool
+            True if the buffer doesn't need to be rendered again.
+        """
+        return self.framebuffer is not None and self.key == key
+
+    def render(self, key: Hashable, width: int, height: int, shapes: List[AbstractShape], setup_matrices: Callable[[], None]) -> None:
+        """
+        Draw the shapes into the buffer.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key the buffer is rendered for.
+        width : int
+            The width of the buffer, in device pixels.
+        height : int
+            The height of the buffer, in device pixels.
+        shapes : List[AbstractShape]
+            The shapes to draw.
+        setup_matrices : Callable[[], None]
+            Loads the projection and view matrices of the camera.
+        """
+        framebuffer = self.framebuffer
+        if framebuffer is None or framebuffer.width() != width or framebuffer.height() != height:
+            framebuffer = self.framebuffer = QOpenGLFramebufferObject(width, height, QOpenGLFramebufferObject.CombinedDepthStencil)
+
+        framebuffer.bind()
+        GL.glPushAttrib(GL.GL_ENABLE_BIT | GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT | GL.GL_VIEWPORT_BIT)
+        try:
+            GL.glViewport(0, 0, width, height)
+            GL.glClearColor(0.0, 0.0, 0.0, 0.0)
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+            # Anything blending or interpolating colors would corrupt the encoded indices
+            for capability in (GL.GL_BLEND, GL.GL_DITHER, GL.GL_MULTISAMPLE, GL.GL_LIGHTING, GL.GL_TEXTURE_2D, GL.GL_CULL_FACE):
+                GL.glDisable(capability)
+            GL.glEnable(GL.GL_DEPTH_TEST)
+            GL.glDepthFunc(GL.GL_LESS)
+
+            setup_matrices()
+            GL.glMatrixMode(GL.GL_MODELVIEW)
+            for index, shape in enumerate(shapes):
+                model = np.array(shape.mesh_item.transform().copyDataTo(), dtype=np.float32).reshape(4, 4)
+                GL.glPushMatrix()
+                try:
+                    GL.glMultMatrixf(model.transpose())
+                    shape.mesh_item.paintFaces(self.encode(index))
+                finally:
+                    GL.glPopMatrix()
+        finally:
+            GL.glPopAttrib()
+            framebuffer.release()
+
+        self.key = key
+        self.shapes = shapes
+
+    def shape_at(self, x: int, y: int) -> Optional[AbstractShape]:
+        """
+        Get the shape drawn at a pixel of the buffer.
+
+        Parameters
+        ----------
+        x : int
+            The x coordinate of the pixel, in device pixels from the left.
+        y : int
+            The y coordinate of the pixel, in device pixels from the top.
+
+        Returns
+        -------
+        Optional[AbstractShape]
+            The shape, or None if the pixel is empty or outside of the buffer.
+        """
+        framebuffer = self.framebuffer
+        if framebuffer is None or not (0 <= x < framebuffer.width() and 0 <= y < framebuffer.height()):
+            return None
+
+        framebuffer.bind()
+        try:
+            pixel = GL.glReadPixels(x, framebuffer.height() - 1 - y, 1, 1, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+        finally:
+            framebuffer.release()
+
+        index = self.decode(np.frombuffer(pixel, dtype=np.uint8))
+        return self.shapes[index] if 0 <= index < len(self.shapes) else None
+
+    def clear(self) -> None:
+        """
+        Forget the rendered shapes, e.g. once the scene is cleared.
+        """
+        self.key = None
+        self.shapes = []
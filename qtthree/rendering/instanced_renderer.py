@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+import ctypes
+import traceback
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+from OpenGL import GL
+from OpenGL.GL import shaders
+import pyqtgraph.opengl as gl
+from pyqtgraph.opengl.GLGraphicsItem import GLGraphicsItem
+
+from qtthree.geometry import Geometry
+
+if TYPE_CHECKING:
+    from qtthree.shapes.abstract_shape import AbstractShape
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute mat4 model;
+attribute vec4 instance_color;
+varying vec4 color;
+
+void main() {
+    gl_Position = gl_ModelViewProjectionMatrix * model * vec4(position, 1.0);
+    color = instance_color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+uniform vec4 edge_color;
+uniform float edge_mix;
+varying vec4 color;
+
+void main() {
+    gl_FragColor = mix(color, edge_color, edge_mix);
+}
+"""
+
+# Floats per instance: the column-major model matrix, then the RGBA color
+INSTANCE_FLOATS = 20
+INSTANCE_STRIDE = INSTANCE_FLOATS * 4
+
+
+class InstanceGroup:
+    """
+    Shapes drawn with the same geometry, in a single instanced draw call.
+
+    The model matrix and color of every shape are packed in one array, mirrored
+    in a GPU buffer. Removing a shape moves the last instance into its slot, so
+    the array stays contiguous, and only the range of rows changed since the
+    last frame is uploaded.
+
+    When some of the shapes are culled, the visible instances are copied to a
+    second buffer, which is only uploaded again once the visible set or the
+    instances change.
+    """
+    key: Hashable
+    meshdata: gl.MeshData
+    vertexes: np.ndarray
+    faces: np.ndarray
+    # Only extracted once the wireframe is drawn
+    edges: Optional[np.ndarray] = None
+
+    shapes: List[AbstractShape]
+    slots: Dict[str, int]
+    instances: np.ndarray
+
+    # Slots copied to the visible instance buffer, and whether the instances changed since
+    visible_slots: Optional[np.ndarray] = None
+    visible_stale: bool = True
+
+    def __init__(self, geometry: Geometry) -> None:
+        self.key = geometry.key
+        self.vertexes = np.ascontiguousarray(geometry.meshdata.vertexes(), dtype=np.float32)
+        self.faces = np.ascontiguousarray(geometry.meshdata.faces(), dtype=np.uint32)
+        self.meshdata = geometry.meshdata
+
+        self.shapes = []
+        self.slots = {}
+        self.instances = np.zeros((16, INSTANCE_FLOATS), dtype=np.float32)
+
+        # GPU buffers are created on the first paint, once a context is current
+        self.buffers: Dict[str, int] = {}
+        self.buffer_capacity = 0
+        self.dirty_start = 0
+        self.dirty_end = 0
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+    def add(self, shape: AbstractShape) -> None:
+        """
+        Add a shape to the group.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape to add.
+        """
+        slot = len(self.shapes)
+        if slot == len(self.instances):
+            self.instances = np.concatenate([self.instances, np.zeros_like(self.instances)])
+
+        self.shapes.append(shape)
+        self.slots[shape.uuid] = slot
+        self.write(slot)
+
+    def remove(self, shape: AbstractShape) -> None:
+        """
+        Remove a shape from the group, filling its slot with the last instance.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape to remove.
+        """
+        slot = self.slots.pop(shape.uuid)
+        last = self.shapes.pop()
+        if last is shape:
+            return
+
+        self.shapes[slot] = last
+        self.slots[last.uuid] = slot
+        self.instances[slot] = self.instances[len(self.shapes)]
+        self.mark_dirty(slot)
+
+    def update(self, shape: AbstractShape) -> None:
+        """
+        Refresh the instance data of a shape after it moved or changed color.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape to refresh.
+        """
+        self.write(self.slots[shape.uuid])
+
+    def write(self, slot: int) -> None:
+        """
+        Write the model matrix and color of the shape in a slot.
+
+        Parameters
+        ----------
+        slot : int
+            The slot to write.
+        """
+        shape = self.shapes[slot]
+        row = self.instances[slot]
+        row[:16] = shape.mesh_item.transform().matrix().T.ravel()
+        row[16:] = shape.color.getRgbF()
+        self.mark_dirty(slot)
+
+    def mark_dirty(self, slot: int) -> None:
+        """
+        Mark a slot to be uploaded on the next paint.
+
+        Parameters
+        ----------
+        slot : int
+            The slot that changed.
+        """
+        self.visible_stale = True
+        if self.dirty_start >= self.dirty_end:
+            self.dirty_start, self.dirty_end = slot, slot + 1
+        else:
+            self.dirty_start = min(self.dirty_start, slot)
+            self.dirty_end = max(self.dirty_end, slot + 1)
+
+    def upload(self) -> None:
+        """
+        Create the GPU buffers if needed, and upload the changed instances.
+
+        Must be called with the view's context current.
+        """
+        if not self.buffers:
+            names = ("vertex", "face", "instance")
+            self.buffers = dict(zip(names, np.atleast_1d(GL.glGenBuffers(len(names))).tolist()))
+
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.buffers["vertex"])
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self.vertexes.nbytes, self.vertexes, GL.GL_STATIC_DRAW)
+            GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.buffers["face"])
+            GL.glBufferData(GL.GL_ELEMENT_ARRAY_BUFFER, self.faces.nbytes, self.faces, GL.GL_STATIC_DRAW)
+            GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.buffers["instance"])
+        if self.buffer_capacity < len(self.instances):
+            # The instance array grew, reallocate the buffer and upload everything
+            self.buffer_capacity = len(self.instances)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self.instances.nbytes, self.instances, GL.GL_DYNAMIC_DRAW)
+        elif self.dirty_start < self.dirty_end:
+            changed = self.instances[self.dirty_start:self.dirty_end]
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER, self.dirty_start * INSTANCE_STRIDE, changed.nbytes, changed)
+
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.dirty_start = self.dirty_end = 0
+
+    def upload_edges(self) -> None:
+        """
+        Extract the edges of the geometry and upload them, the first time the wireframe is drawn.
+
+        Must be called with the view's context current.
+        """
+        if "edge" in self.buffers:
+            return
+
+        self.edges = np.ascontiguousarray(self.meshdata.edges(), dtype=np.uint32)
+        self.buffers["edge"] = int(GL.glGenBuffers(1))
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.buffers["edge"])
+        GL.glBufferData(GL.GL_ELEMENT_ARRAY_BUFFER, self.edges.nbytes, self.edges, GL.GL_STATIC_DRAW)
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def visible_instances(self, culled: Set[str]) -> Tuple[int, int]:
+        """
+        Get the buffer holding the instances to draw, leaving out the culled shapes.
+
+        Must be called with the view's context current.
+
+        Parameters
+        ----------
+        culled : Set[str]
+            The UUIDs of the culled shapes.
+
+        Returns
+        -------
+        Tuple[int, int]
+            The instance buffer, and the number of instances in it.
+        """
+        count = len(self.shapes)
+        if not culled:
+            return self.buffers["instance"], count
+
+        visible = np.fromiter((shape.uuid not in culled for shape in self.shapes), dtype=bool, count=count)
+        if visible.all():
+            return self.buffers["instance"], count
+
+        slots = np.flatnonzero(visible)
+        if not len(slots):
+            return self.buffers["instance"], 0
+
+        if self.visible_stale or self.visible_slots is None or not np.array_equal(slots, self.visible_slots):
+            if "visible" not in self.buffers:
+                self.buffers["visible"] = int(GL.glGenBuffers(1))
+
+            data = np.ascontiguousarray(self.instances[slots])
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.buffers["visible"])
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, data.nbytes, data, GL.GL_STREAM_DRAW)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+            self.visible_slots = slots
+            self.visible_stale = False
+
+        return self.buffers["visible"], len(slots)
+
+    def draw(self, locations: Dict[str, int], edge_mix: int, draw_edges: bool, culled: Set[str]) -> None:
+        """
+        Draw every visible instance of the group.
+
+        Must be called with the renderer's program in use.
+
+        Parameters
+        ----------
+        locations : Dict[str, int]
+            The attribute locations of the program.
+        edge_mix : int
+            The location of the uniform switching between instance and edge colors.
+        draw_edges : bool
+            Whether to draw the edges on top of the faces.
+        culled : Set[str]
+            The UUIDs of the culled shapes.
+        """
+        instance_buffer, count = self.visible_instances(culled)
+        if not count:
+            return
+
+        position, model, color = locations["position"], locations["model"], locations["instance_color"]
+        instanced = [model, model + 1, model + 2, model + 3, color]
+
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.buffers["vertex"])
+        GL.glEnableVertexAttribArray(position)
+        GL.glVertexAttribPointer(position, 3, GL.GL_FLOAT, GL.GL_FALSE, 0, None)
+
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, instance_buffer)
+        for i, location in enumerate(instanced):
+            GL.glEnableVertexAttribArray(location)
+            GL.glVertexAttribPointer(location, 4, GL.GL_FLOAT, GL.GL_FALSE, INSTANCE_STRIDE, ctypes.c_void_p(i * 16))
+            GL.glVertexAttribDivisor(location, 1)
+
+        try:
+            GL.glUniform1f(edge_mix, 0.0)
+            GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.buffers["face"])
+            GL.glDrawElementsInstanced(GL.GL_TRIANGLES, self.faces.size, GL.GL_UNSIGNED_INT, None, count)
+
+            if draw_edges:
+                GL.glUniform1f(edge_mix, 1.0)
+                GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.buffers["edge"])
+                GL.glDrawElementsInstanced(GL.GL_LINES, self.edges.size, GL.GL_UNSIGNED_INT, None, count)
+        finally:
+            # Divisors are global state, and would break the next non-instanced draw
+            for location in instanced:
+                GL.glVertexAttribDivisor(location, 0)
+                GL.glDisableVertexAttribArray(location)
+
+            GL.glDisableVertexAttribArray(position)
+            GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+
+class InstancedRenderer(GLGraphicsItem):
+    """
+    Draws shapes that share geometry with one instanced draw call per geometry.
+
+    Shapes are grouped by the geometry they are currently drawn with (which
+    follows their level of detail). The view skips the mesh items of
+    instanced shapes while drawing, but still uses them for picking.
+    Shapes notify the renderer when they move, change color or switch geometry.
+    """
+    enabled: bool = True
+    draw_edges: bool = False
+    edge_color = (0.0, 0.0, 0.0, 1.0)
+
+    # UUIDs of the shapes the view culled this frame
+    culled: Set[str]
+
+    groups: Dict[Hashable, InstanceGroup]
+    shape_groups: Dict[str, InstanceGroup]
+    mesh_items: Set[int]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setGLOptions("opaque")
+
+        self.groups = {}
+        self.shape_groups = {}
+        self.mesh_items = set()
+        self.culled = set()
+
+        self.program: Optional[int] = None
+        self.locations: Dict[str, int] = {}
+        self.uniforms: Dict[str, int] = {}
+        self._garbage: List[int] = []
+
+    def draws(self, item: GLGraphicsItem) -> bool:
+        """
+        Whether an item is drawn by the renderer, rather than by itself.
+
+        Parameters
+        ----------
+        item : GLGraphicsItem
+            The item.
+
+        Returns
+        -------
+        bool
+            True if the item belongs to an instanced shape.
+        """
+        return self.enabled and id(item) in self.mesh_items
+
+    def add_shape(self, shape: AbstractShape) -> None:
+        """
+        Start drawing a shape with the group of its current geometry.
+
+        Shapes without indexed faces are left to draw themselves.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        """
+        geometry = shape.lod_geometry(shape.lod_level)
+        if geometry is None or geometry.faces is None:
+            return
+
+        group = self.groups.get(geometry.key)
+        if group is None:
+            group = self.groups[geometry.key] = InstanceGroup(geometry)
+
+        group.add(shape)
+        self.shape_groups[shape.uuid] = group
+        self.mesh_items.add(id(shape.mesh_item))
+        shape.renderer = self
+
+    def remove_shape(self, shape: AbstractShape) -> None:
+        """
+        Stop drawing a shape.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        """
+        group = self.shape_groups.pop(shape.uuid, None)
+        if group is None:
+            return
+
+        group.remove(shape)
+        if not len(group):
+            # Buffers can only be deleted with the context current, so it is left to the next paint
+            del self.groups[group.key]
+            self._garbage.extend(group.buffers.values())
+
+        self.mesh_items.discard(id(shape.mesh_item))
+        shape.renderer = None
+
+    def update_shape(self, shape: AbstractShape) -> None:
+        """
+        Refresh a shape's instance after it moved or changed color.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        """
+        group = self.shape_groups.get(shape.uuid)
+        if group is not None:
+            group.update(shape)
+
+    def regroup(self, shape: AbstractShape) -> None:
+        """
+        Move a shape to the group of its current geometry, after it switched geometry.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        """
+        group = self.shape_groups.get(shape.uuid)
+        geometry = shape.lod_geometry(shape.lod_level)
+        if group is not None and geometry is not None and group.key == geometry.key:
+            return
+
+        self.remove_shape(shape)
+        self.add_shape(shape)
+
+    def clear(self) -> None:
+        """
+        Stop drawing every shape.
+        """
+        for group in self.groups.values():
+            for shape in group.shapes:
+                shape.renderer = None
+            self._garbage.extend(group.buffers.values())
+
+        self.groups.clear()
+        self.shape_groups.clear()
+        self.mesh_items.clear()
+
+    def initialize_program(self) -> bool:
+        """
+        Compile the instancing program, if the context supports instancing.
+
+        Returns
+        -------
+        bool
+            True if the program is ready.
+        """
+        if not (bool(GL.glDrawElementsInstanced) and bool(GL.glVertexAttribDivisor)):
+            return False
+
+        try:
+            self.program = shaders.compileProgram(
+                shaders.compileShader(VERTEX_SHADER, GL.GL_VERTEX_SHADER),
+                shaders.compileShader(FRAGMENT_SHADER, GL.GL_FRAGMENT_SHADER)
+            )
+        except Exception:
+            traceback.print_exc()
+            return False
+
+        self.locations = {name: GL.glGetAttribLocation(self.program, name) for name in ("position", "model", "instance_color")}
+        self.uniforms = {name: GL.glGetUniformLocation(self.program, name) for name in ("edge_color", "edge_mix")}
+        return True
+
+    def paint(self) -> None:
+        if self._garbage:
+            GL.glDeleteBuffers(len(self._garbage), self._garbage)
+            self._garbage = []
+
+        if not self.enabled or not self.groups:
+            return
+
+        if self.program is None and not self.initialize_program():
+            # Fall back to drawing every mesh item on its own, starting with the next frame
+            self.enabled = False
+            self.update()
+            return
+
+        self.setupGLState()
+
+        GL.glUseProgram(self.program)
+        try:
+            GL.glUniform4f(self.uniforms["edge_color"], *self.edge_color)
+            for group in self.groups.values():
+                group.upload()
+                if self.draw_edges:
+                    group.upload_edges()
+                group.draw(self.locations, self.uniforms["edge_mix"], self.draw_edges, self.culled)
+        finally:
+            GL.glUseProgram(0)
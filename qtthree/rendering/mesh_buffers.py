@@ -0,0 +1,175 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyqtgraph.opengl as gl
+from OpenGL import GL
+
+
+class MeshBuffers:
+    """
+    GPU copies of a MeshData's vertices, faces and edges.
+
+    Vertices and faces are uploaded once, when the buffers are created.
+    Edges are only extracted and uploaded the first time the wireframe is drawn.
+    """
+    meshdata: gl.MeshData
+    indexed: bool
+    vertex_buffer: int
+    face_buffer: Optional[int] = None
+    edge_buffer: Optional[int] = None
+    vertex_count: int
+    face_count: int = 0
+    edge_count: int = 0
+
+    def __init__(self, meshdata: gl.MeshData) -> None:
+        self.meshdata = meshdata
+
+        faces = meshdata.faces()
+        self.indexed = faces is not None
+        if self.indexed:
+            vertexes = meshdata.vertexes()
+        else:
+            vertexes = meshdata.vertexes(indexed="faces")
+
+        vertexes = np.ascontiguousarray(vertexes, dtype=np.float32).reshape(-1, 3)
+        self.vertex_count = len(vertexes)
+        self.vertex_buffer = self._upload(GL.GL_ARRAY_BUFFER, vertexes)
+
+        if self.indexed:
+            faces = np.ascontiguousarray(faces, dtype=np.uint32)
+            self.face_count = faces.size
+            self.face_buffer = self._upload(GL.GL_ELEMENT_ARRAY_BUFFER, faces)
+
+    @staticmethod
+    def _upload(target: int, data: np.ndarray) -> int:
+        """
+        Upload an array to a new buffer.
+
+        Parameters
+        ----------
+        target : int
+            The buffer target.
+        data : np.ndarray
+            The array to upload.
+
+        Returns
+        -------
+        int
+            The buffer.
+        """
+        buffer = int(GL.glGenBuffers(1))
+        GL.glBindBuffer(target, buffer)
+        GL.glBufferData(target, data.nbytes, data, GL.GL_STATIC_DRAW)
+        GL.glBindBuffer(target, 0)
+        return buffer
+
+    def buffers(self) -> List[int]:
+        """
+        Get every buffer created so far.
+
+        Returns
+        -------
+        List[int]
+            The buffers.
+        """
+        return [buffer for buffer in (self.vertex_buffer, self.face_buffer, self.edge_buffer) if buffer is not None]
+
+    def draw_faces(self) -> None:
+        """
+        Draw the triangles, with the vertex buffer already bound as the vertex array.
+        """
+        if not self.indexed:
+            GL.glDrawArrays(GL.GL_TRIANGLES, 0, self.vertex_count)
+            return
+
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.face_buffer)
+        GL.glDrawElements(GL.GL_TRIANGLES, self.face_count, GL.GL_UNSIGNED_INT, None)
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def draw_edges(self) -> None:
+        """
+        Draw the edges, with the vertex buffer already bound as the vertex array.
+        """
+        if self.edge_buffer is None:
+            edges = np.ascontiguousarray(self.meshdata.edges(), dtype=np.uint32)
+            self.edge_count = edges.size
+            self.edge_buffer = self._upload(GL.GL_ELEMENT_ARRAY_BUFFER, edges)
+
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.edge_buffer)
+        GL.glDrawElements(GL.GL_LINES, self.edge_count, GL.GL_UNSIGNED_INT, None)
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+
+class MeshBufferCache:
+    """
+    Reference-counted GPU buffers, shared by every item drawing the same MeshData.
+
+    Buffers can be released at any time, but are only deleted on the next
+    call to collect, which the view makes at the start of every frame, with the context current.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, MeshBuffers] = {}
+        self._refcounts: Dict[int, int] = {}
+        self._garbage: List[int] = []
+
+    def acquire(self, meshdata: gl.MeshData) -> MeshBuffers:
+        """
+        Get a reference to the buffers of a MeshData, uploading it if needed.
+
+        Must be called with the context current.
+
+        Parameters
+        ----------
+        meshdata : gl.MeshData
+            The mesh data.
+
+        Returns
+        -------
+        MeshBuffers
+            The shared buffers.
+        """
+        # Entries keep their MeshData alive, so its id can't be reused while it is registered
+        key = id(meshdata)
+        buffers = self._entries.get(key)
+        if buffers is None:
+            buffers = self._entries[key] = MeshBuffers(meshdata)
+            self._refcounts[key] = 0
+
+        self._refcounts[key] += 1
+        return buffers
+
+    def release(self, buffers: MeshBuffers) -> None:
+        """
+        Drop a reference to buffers, scheduling them for deletion if it was the last one.
+
+        Parameters
+        ----------
+        buffers : MeshBuffers
+            The buffers to release.
+        """
+        key = id(buffers.meshdata)
+        if self._entries.get(key) is not buffers:
+            return
+
+        self._refcounts[key] -= 1
+        if self._refcounts[key] <= 0:
+            del self._entries[key]
+            del self._refcounts[key]
+            self._garbage.extend(buffers.buffers())
+
+    def collect(self) -> None:
+        """
+        Delete the buffers released since the last call.
+
+        Must be called with the context current.
+        """
+        if self._garbage:
+            GL.glDeleteBuffers(len(self._garbage), self._garbage)
+            self._garbage = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+mesh_buffers = MeshBufferCache()
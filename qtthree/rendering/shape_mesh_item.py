@@ -0,0 +1,140 @@
+from typing import Optional
+
+import pyqtgraph.opengl as gl
+from OpenGL import GL
+from PySide2.QtGui import QColor
+
+from qtthree.rendering.mesh_buffers import MeshBuffers, mesh_buffers
+
+
+class ShapeMeshItem(gl.GLMeshItem):
+    """
+    Mesh item drawing its geometry from GPU buffers.
+
+    The stock GLMeshItem hands its client-side arrays to OpenGL on every paint.
+    This item uploads its mesh data once, shares the buffers with every item
+    drawing the same mesh data, and only uploads again once the mesh data changes.
+    Transform and color changes only change the matrix and color state of the draw.
+
+    Shapes are drawn with a flat color, so normals, per-vertex colors and shaders are not used.
+    """
+    buffers: Optional[MeshBuffers] = None
+
+    def meshDataChanged(self) -> None:
+        """
+        Override meshDataChanged to drop the buffers of the previous mesh data.
+
+        The buffers of the new mesh data are acquired on the next paint.
+        """
+        super().meshDataChanged()
+        self.releaseBuffers()
+
+    def releaseBuffers(self) -> None:
+        """
+        Release the item's reference to its buffers, e.g. when it is removed from the scene.
+        """
+        if self.buffers is not None:
+            mesh_buffers.release(self.buffers)
+            self.buffers = None
+
+    @staticmethod
+    def _color(color) -> tuple:
+        """
+        Convert a color option to an RGBA tuple.
+
+        Parameters
+        ----------
+        color : Union[QColor, tuple]
+            The color option.
+
+        Returns
+        -------
+        tuple
+            The RGBA color, as floats.
+        """
+        if isinstance(color, QColor):
+            return color.getRgbF()
+
+        return tuple(color)
+
+    def acquireBuffers(self) -> Optional[MeshBuffers]:
+        """
+        Get the buffers of the item's current mesh data, acquiring them if needed.
+
+        Must be called with the context current.
+
+        Returns
+        -------
+        Optional[MeshBuffers]
+            The buffers, or None if the item has no mesh data.
+        """
+        meshdata = self.opts["meshdata"]
+        if meshdata is None:
+            return None
+
+        # The mesh data can be swapped without meshDataChanged (see AbstractShape.set_lod_level)
+        if self.buffers is None or self.buffers.meshdata is not meshdata:
+            self.releaseBuffers()
+            self.buffers = mesh_buffers.acquire(meshdata)
+
+        return self.buffers
+
+    def paintFaces(self, color: tuple) -> None:
+        """
+        Draw the item's triangles with a flat color, using the current GL state and matrices.
+
+        Parameters
+        ----------
+        color : tuple
+            The RGBA color, as floats.
+        """
+        self._draw(color, None)
+
+    def paintEdges(self, color: tuple) -> None:
+        """
+        Draw the item's edges with a flat color, using the current GL state and matrices.
+
+        Parameters
+        ----------
+        color : tuple
+            The RGBA color, as floats.
+        """
+        self._draw(None, color)
+
+    def _draw(self, face_color: Optional[tuple], edge_color: Optional[tuple]) -> None:
+        """
+        Draw the item's faces and/or edges from its buffers.
+
+        Parameters
+        ----------
+        face_color : Optional[tuple]
+            The RGBA color of the faces, or None to skip them.
+        edge_color : Optional[tuple]
+            The RGBA color of the edges, or None to skip them.
+        """
+        buffers = self.acquireBuffers()
+        if buffers is None:
+            return
+
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        try:
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, buffers.vertex_buffer)
+            GL.glVertexPointer(3, GL.GL_FLOAT, 0, None)
+
+            if face_color is not None:
+                GL.glColor4f(*face_color)
+                buffers.draw_faces()
+
+            if edge_color is not None:
+                GL.glColor4f(*edge_color)
+                buffers.draw_edges()
+        finally:
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+            GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+
+    def paint(self) -> None:
+        self.setupGLState()
+
+        face_color = self._color(self.opts["color"]) if self.opts["drawFaces"] else None
+        edge_color = self._color(self.opts["edgeColor"]) if self.opts["drawEdges"] else None
+        self._draw(face_color, edge_color)
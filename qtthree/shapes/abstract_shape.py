@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import uuid
-from typing import Any, List, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-import pyqtgraph.opengl as gl
+from pyqtgraph import Transform3D
 from PySide2 import QtCore
 from PySide2.QtGui import QColor
 from PySide2.QtWidgets import QLabel, QLineEdit, QWidget
 
+from qtthree.geometry import Geometry, geometry_registry
+from qtthree.geometry.ray import RayHit
 from qtthree.utils.color import hex_to_rgba
 from qtthree.widgets import ColorPicker, RotationDialGroup, SpinboxGroup
 
+if TYPE_CHECKING:
+    from qtthree.geometry.scene_bvh import SceneBVH
+    from qtthree.rendering import InstancedRenderer, ShapeMeshItem
+
 
 class AbstractShape:
     uuid: str
@@ -22,10 +28,33 @@ class AbstractShape:
     translation: np.ndarray
     rotation: np.ndarray
 
+    # Position and orientation of the shape. Any scale is applied on top of it, see model_transform.
     transformation_matrix: np.ndarray
-    mesh_item: gl.GLMeshItem
+    mesh_item: ShapeMeshItem
+
+    # Shared base geometry, resolved through the geometry registry
+    geometry: Optional[Geometry] = None
+
+    # Projected radii, in pixels, below which each coarser level of detail is used.
+    # Shapes without thresholds are always drawn with their base geometry (level 0).
+    LOD_THRESHOLDS: Tuple[float, ...] = ()
+    lod_level: int = 0
+    lod_geometries: Dict[int, Geometry]
+
+    # World-space bounds, cached until the model transform or the base geometry changes
+    _bounds: Optional[Tuple[np.ndarray, float, np.ndarray, np.ndarray]] = None
+
+    # Instanced renderer drawing the shape, notified when its transform, color or geometry changes
+    renderer: Optional[InstancedRenderer] = None
+
+    # Scene BVH indexing the shape for picking, told when its bounds change
+    scene_index: Optional[SceneBVH] = None
+    # Determinant below which a model transform is flat, and can't be inverted to cast rays
+    SINGULAR_EPSILON = 1e-12
 
     def __init__(self, **kwargs):
+        self.lod_geometries = {}
+
         self.uuid = kwargs.pop("uuid", str(uuid.uuid4()))
 
         self.name = kwargs.pop("name", "AbstractShape")
@@ -39,8 +68,9 @@ class AbstractShape:
         self.update_color(color)
 
         transformation_matrix = kwargs.pop("transformation_matrix", None)
-        if transformation_matrix is not None:
-            self.update_transformation_matrix(np.array(transformation_matrix))
+        if transformation_matrix is None:
+            transformation_matrix = np.identity(4)
+        self.update_transformation_matrix(np.array(transformation_matrix, dtype=float))
 
     @classmethod
     def deserialize(cls) -> AbstractShape:
@@ -59,11 +89,271 @@ class AbstractShape:
         """
         raise NotImplementedError("Cannot deserialize an AbstractShape.")
 
+    @classmethod
+    def prepare(cls, data: dict) -> dict:
+        """
+        Prepare a serialized shape for deserialization.
+
+        Does all of the pure-data work (e.g. building mesh data) ahead of time,
+        without touching any GUI objects, so it is safe to run on a worker thread.
+        The result can be passed to deserialize.
+
+        Parameters
+        ----------
+        data : dict
+            The serialized shape.
+
+        Returns
+        -------
+        dict
+            The serialized shape, with any precomputed constructor arguments added.
+        """
+        return dict(data)
+
     def clone(self) -> AbstractShape:
         shape_data = self.serialize()
         shape_data["uuid"] = str(uuid.uuid4())
         return self.deserialize(shape_data)
 
+    def set_geometry(self, geometry: Geometry) -> None:
+        """
+        Point the shape at another shared geometry.
+
+        The caller must have acquired the geometry from the registry.
+        The reference to the previous geometry is released.
+
+        Parameters
+        ----------
+        geometry : Geometry
+            The new geometry.
+        """
+        previous = self.geometry
+        self.geometry = geometry
+
+        if previous is geometry:
+            geometry_registry.release(previous)
+            return
+
+        # Levels of detail are derived from the base geometry, so they are stale now
+        self.release_lod_geometries()
+        self.lod_level = 0
+
+        self.mesh_item.setMeshData(meshdata=geometry.meshdata)
+        self.invalidate_bounds()
+        if previous is not None:
+            geometry_registry.release(previous)
+
+        if self.renderer is not None:
+            self.renderer.regroup(self)
+
+    def acquire_lod_geometry(self, level: int) -> Geometry:
+        """
+        Acquire the shared geometry for a coarser level of detail.
+
+        Only called for levels 1 to len(LOD_THRESHOLDS), and possibly on a worker thread,
+        so it must not touch any GUI objects.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail.
+
+        Returns
+        -------
+        Geometry
+            The geometry for the level, which must be released by the caller.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no levels of detail.")
+
+    def lod_geometry(self, level: int) -> Optional[Geometry]:
+        """
+        Get the geometry for a level of detail, if it has been built.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail.
+
+        Returns
+        -------
+        Optional[Geometry]
+            The geometry for the level, or None if it has not been built yet.
+        """
+        if level == 0:
+            return self.geometry
+
+        return self.lod_geometries.get(level)
+
+    def add_lod_geometry(self, level: int, geometry: Geometry) -> None:
+        """
+        Keep a built level of detail, so switching back to it is free.
+
+        The shape takes over the caller's reference to the geometry.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail.
+        geometry : Geometry
+            The geometry for the level.
+        """
+        previous = self.lod_geometries.get(level)
+        self.lod_geometries[level] = geometry
+        if previous is not None:
+            geometry_registry.release(previous)
+
+    def set_lod_level(self, level: int) -> None:
+        """
+        Draw the shape with a level of detail that has already been built.
+
+        Only swaps the mesh data of the item, without scheduling a repaint,
+        so it is safe to call while the view is painting.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail.
+        """
+        geometry = self.lod_geometry(level)
+        if geometry is None or self.mesh_item is None:
+            return
+
+        self.lod_level = level
+
+        item = self.mesh_item
+        item.opts["meshdata"] = geometry.meshdata
+        item.vertexes = item.faces = item.normals = item.colors = None
+        item.edges = item.edgeVerts = item.edgeColors = None
+
+        if self.renderer is not None:
+            self.renderer.regroup(self)
+
+    def release_lod_geometries(self) -> None:
+        """
+        Release every level of detail built for the shape.
+        """
+        for geometry in self.lod_geometries.values():
+            geometry_registry.release(geometry)
+
+        self.lod_geometries.clear()
+
+    def invalidate_bounds(self) -> None:
+        """
+        Drop the cached world-space bounds, after the model transform or the geometry changed.
+        """
+        self._bounds = None
+
+        if self.scene_index is not None:
+            self.scene_index.invalidate(self.uuid)
+
+    def world_bounds(self) -> Tuple[np.ndarray, float, np.ndarray, np.ndarray]:
+        """
+        Get the world-space bounds of the shape, computing them if they are not cached.
+
+        Returns
+        -------
+        Tuple[np.ndarray, float, np.ndarray, np.ndarray]
+            The center and radius of the bounding sphere, and the lower and upper corners of the bounding box.
+        """
+        if self._bounds is not None:
+            return self._bounds
+
+        model = self.mesh_item.transform().matrix() if self.mesh_item is not None else self.transformation_matrix
+        linear, offset = model[:3, :3], model[:3, 3]
+
+        if self.geometry is None:
+            center = offset.copy()
+            self._bounds = (center, 0.0, center, center)
+            return self._bounds
+
+        # A box transformed by the model matrix is bounded by its transformed center, plus the absolute matrix times its half size
+        geometry = self.geometry
+        center = linear @ ((geometry.lower + geometry.upper) / 2.0) + offset
+        half = np.abs(linear) @ ((geometry.upper - geometry.lower) / 2.0)
+
+        sphere_center = linear @ geometry.center + offset
+        radius = geometry.radius * float(np.max(np.linalg.norm(linear, axis=0)))
+
+        self._bounds = (sphere_center, radius, center - half, center + half)
+        return self._bounds
+
+    def bounding_sphere(self) -> Tuple[np.ndarray, float]:
+        """
+        Get the bounding sphere of the shape, in world coordinates.
+
+        Returns
+        -------
+        Tuple[np.ndarray, float]
+            The center and radius of the sphere.
+        """
+        center, radius, _, _ = self.world_bounds()
+        return center, radius
+
+    def bounding_box(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the axis-aligned bounding box of the shape, in world coordinates.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The lower and upper corners of the box.
+        """
+        _, _, lower, upper = self.world_bounds()
+        return lower, upper
+
+    def intersect_ray(self, origin: np.ndarray, direction: np.ndarray) -> Optional[RayHit]:
+        """
+        Find where a ray first hits the shape's base geometry.
+
+        The ray is brought into the geometry's own coordinates and cast through
+        the geometry's shared triangle BVH. Distances along the ray are unchanged
+        by the model transform, so only the hit's point and normal are transformed back.
+
+        Parameters
+        ----------
+        origin : np.ndarray
+            The origin of the ray, in world coordinates.
+        direction : np.ndarray
+            The normalized direction of the ray, in world coordinates.
+
+        Returns
+        -------
+        Optional[RayHit]
+            The nearest hit, in world coordinates, or None if the shape is missed.
+        """
+        if self.geometry is None or self.mesh_item is None:
+            return None
+
+        model = self.mesh_item.transform().matrix()
+        # A dimension set to 0 flattens the shape, which leaves nothing to hit
+        if abs(np.linalg.det(model[:3, :3])) < self.SINGULAR_EPSILON:
+            return None
+
+        inverse = np.linalg.inv(model)
+        local_origin = inverse[:3, :3] @ origin + inverse[:3, 3]
+        local_direction = inverse[:3, :3] @ direction
+
+        hit = self.geometry.triangle_bvh().intersect(local_origin, local_direction)
+        if hit is None:
+            return None
+
+        # Normals are transformed by the inverse transpose, which keeps them perpendicular under non-uniform scale
+        normal = inverse[:3, :3].T @ hit.normal
+        normal /= np.linalg.norm(normal)
+
+        return RayHit(hit.distance, origin + hit.distance * direction, normal, hit.triangle)
+
+    def dispose(self) -> None:
+        """
+        Release the resources held by the shape once it is removed from the scene.
+        """
+        self.release_lod_geometries()
+        self.mesh_item.releaseBuffers()
+
+        if self.geometry is not None:
+            geometry_registry.release(self.geometry)
+            self.geometry = None
+
     def set_name(self, name: str) -> None:
         """
         Set the name of the shape.
@@ -98,6 +388,9 @@ class AbstractShape:
         self.mesh_item.setColor(self.color.getRgbF())
         self.mesh_item.update()
 
+        if self.renderer is not None:
+            self.renderer.update_shape(self)
+
     def update_transformation_matrix(self, transformation_matrix: np.ndarray) -> None:
         """
         Update the transformation matrix of the shape.
@@ -111,19 +404,48 @@ class AbstractShape:
             return
 
         self.transformation_matrix = transformation_matrix
-        self.mesh_item.setTransform(transformation_matrix)
+        self.apply_model_transform()
 
-    def sync_transformation_matrix(self) -> None:
+    def model_scale(self) -> Tuple[float, float, float]:
         """
-        Sync the transformation matrix with the mesh item.
+        Get the scale applied to the shape's geometry by its model transform.
 
-        This is necessary because the local copy of the transformation matrix
-        is not updated when the mesh item is rotated/translated/etc.
+        Returns
+        -------
+        Tuple[float, float, float]
+            The scale along each local axis.
+        """
+        return (1.0, 1.0, 1.0)
+
+    def model_transform(self) -> Transform3D:
+        """
+        Get the model transform of the shape.
+
+        This is the transformation matrix, with the model scale applied locally.
+
+        Returns
+        -------
+        Transform3D
+            The model transform.
+        """
+        model = Transform3D(self.transformation_matrix)
+        model.scale(*self.model_scale())
+        return model
+
+    def apply_model_transform(self) -> None:
+        """
+        Apply the model transform to the mesh item.
+
+        Affine changes only update the item's transform, and never touch the geometry.
         """
         if self.mesh_item is None:
             return
 
-        self.transformation_matrix = self.mesh_item.transform().matrix()
+        self.mesh_item.setTransform(self.model_transform())
+        self.invalidate_bounds()
+
+        if self.renderer is not None:
+            self.renderer.update_shape(self)
 
     def update_property(self, property_: str, value: Any) -> None:
         """
@@ -161,14 +483,15 @@ class AbstractShape:
         difference = value - old_value
 
         self.translation[axis] = value
-        if axis == 0:
-            self.mesh_item.translate(difference, 0, 0)
-        elif axis == 1:
-            self.mesh_item.translate(0, difference, 0)
-        elif axis == 2:
-            self.mesh_item.translate(0, 0, difference)
+        offset = [0.0, 0.0, 0.0]
+        offset[axis] = difference
 
-        self.sync_transformation_matrix()
+        # Translations are applied in the parent's coordinate system
+        translation = Transform3D()
+        translation.translate(*offset)
+        pose = Transform3D(translation * Transform3D(self.transformation_matrix))
+
+        self.update_transformation_matrix(pose.matrix())
 
     def update_rotation(self, axis: int, value: float) -> None:
         """
@@ -188,14 +511,14 @@ class AbstractShape:
         difference = value - old_value
 
         self.rotation[axis] = value
-        if axis == 0:
-            self.mesh_item.rotate(difference, 1, 0, 0, local=True)
-        elif axis == 1:
-            self.mesh_item.rotate(difference, 0, 1, 0, local=True)
-        elif axis == 2:
-            self.mesh_item.rotate(difference, 0, 0, 1, local=True)
+        rotation_axis = [0, 0, 0]
+        rotation_axis[axis] = 1
+
+        # Rotations are applied in the shape's own coordinate system
+        pose = Transform3D(self.transformation_matrix)
+        pose.rotate(difference, *rotation_axis)
 
-        self.sync_transformation_matrix()
+        self.update_transformation_matrix(pose.matrix())
 
     def get_form_components(self) -> List[Tuple[str, QLabel, QWidget]]:
         """
@@ -214,6 +537,25 @@ class AbstractShape:
             ("rotation", QLabel("Rotation", alignment=QtCore.Qt.AlignBaseline), RotationDialGroup(self.rotation[0], self.rotation[1], self.rotation[2])),
         ]
 
+    def get_form_values(self) -> Dict[str, Any]:
+        """
+        Get the values shown by the form components of the shape.
+
+        Lets a form built once by get_form_components be bound to any shape of the same type.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The value of each property of the form components.
+        """
+        return {
+            "uuid": self.uuid,
+            "name": self.name,
+            "color": self.color,
+            "translation": tuple(self.translation),
+            "rotation": tuple(self.rotation),
+        }
+
     def serialize(self) -> dict:
         """
         Serialize the shape to a dictionary.
@@ -1,9 +1,9 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
-import numpy as np
-import pyqtgraph.opengl as gl
 from PySide2.QtWidgets import QDoubleSpinBox, QLabel, QLineEdit, QWidget
 
+from qtthree.geometry import acquire_unit_box
+from qtthree.rendering import ShapeMeshItem
 from qtthree.shapes import AbstractShape
 
 
@@ -18,15 +18,16 @@ class Box(AbstractShape):
         self.width = kwargs.pop("width", 1.0)
         self.height = kwargs.pop("height", 1.0)
 
-        mesh = self.generate_meshdata()
+        self.geometry = kwargs.pop("geometry", None)
+        if self.geometry is None:
+            self.geometry = acquire_unit_box()
 
-        self.mesh_item = gl.GLMeshItem(
-            meshdata=mesh,
+        self.mesh_item = ShapeMeshItem(
+            meshdata=self.geometry.meshdata,
             smooth=True,
             edgeColor=(0, 0, 0, 1),
             computeNormals=False
         )
-        self.sync_transformation_matrix()
 
         kwargs["name"] = kwargs.get("name", "Box")
         super().__init__(**kwargs)
@@ -48,39 +49,35 @@ class Box(AbstractShape):
         """
         return cls(**data)
 
-    def generate_meshdata(self) -> gl.MeshData:
+    @classmethod
+    def prepare(cls, data: dict) -> dict:
         """
-        Generate the mesh data for the shape.
+        Prepare a serialized shape for deserialization.
+
+        Parameters
+        ----------
+        data : dict
+            The serialized shape.
 
         Returns
         -------
-        gl.MeshData
-            The mesh data for the shape.
+        dict
+            The serialized shape, with its shared geometry added.
         """
-        vertices = np.array([
-            [self.length,   0,          0          ],
-            [0,             0,          0          ],
-            [0,             self.width, 0          ],
-            [0,             0,          self.height],
-            [self.length,   self.width, 0          ],
-            [self.length,   self.width, self.height],
-            [0,             self.width, self.height],
-            [self.length,   0,          self.height]
-        ], dtype=float)
-
-        faces = np.array([
-            [1, 0, 7], [1, 3, 7],
-            [1, 2, 4], [1, 0, 4],
-            [1, 2, 6], [1, 3, 6],
-            [0, 4, 5], [0, 7, 5],
-            [2, 4, 5], [2, 6, 5],
-            [3, 6, 5], [3, 7, 5]
-        ], dtype=int)
-
-        return gl.MeshData(
-            vertexes=vertices,
-            faces=faces
-        )
+        return {**data, "geometry": acquire_unit_box()}
+
+    def model_scale(self) -> Tuple[float, float, float]:
+        """
+        Get the scale applied to the shape's geometry by its model transform.
+
+        The box is a scaled unit box, so its dimensions are its scale.
+
+        Returns
+        -------
+        Tuple[float, float, float]
+            The scale along each local axis.
+        """
+        return (self.length, self.width, self.height)
 
     def update_property(self, property_: str, value: float) -> None:
         """
@@ -103,8 +100,8 @@ class Box(AbstractShape):
             super().update_property(property_, value)
             return
 
-        self.mesh_item.setMeshData(meshdata=self.generate_meshdata())
-        self.mesh_item.meshDataChanged()
+        # Dimensions are part of the model transform, so the shared geometry is left untouched
+        self.apply_model_transform()
 
     def get_form_components(self) -> List[Tuple[str, QLabel, QWidget]]:
         """
@@ -122,6 +119,22 @@ class Box(AbstractShape):
             ("height", QLabel("Height"), QDoubleSpinBox(value=self.height))
         ]
 
+    def get_form_values(self) -> Dict[str, Any]:
+        """
+        Get the values shown by the form components of the shape.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The value of each property of the form components.
+        """
+        return {
+            **super().get_form_values(),
+            "length": self.length,
+            "width": self.width,
+            "height": self.height
+        }
+
     def serialize(self) -> dict:
         """
         Serialize the shape to a dictionary.
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-import pyqtgraph.opengl as gl
 from PySide2 import QtCore
 from PySide2.QtWidgets import QLabel, QWidget
-from stl import mesh as stl_mesh
 
+from qtthree.geometry import Geometry, geometry_registry, load_stl, load_stl_decimated, load_stl_lod
+from qtthree.rendering import ShapeMeshItem
 from qtthree.shapes import AbstractShape
 from qtthree.widgets import SpinboxGroup
 
@@ -16,7 +17,17 @@ class CustomShape(AbstractShape):
     scale: np.ndarray
 
     file_path: str
-    custom_mesh_file: Optional[stl_mesh.Mesh] = None
+
+    # Import-time simplification settings (target_faces and/or max_error, see decimate_mesh).
+    # The file stays the source of truth, the decimated mesh only lives in the mesh cache.
+    decimation: Optional[Dict[str, float]]
+
+    # Clustering grid resolution of each coarser level of detail, see cluster_vertices
+    LOD_RESOLUTIONS: Tuple[int, ...] = (64, 20)
+    LOD_THRESHOLDS = (120.0, 30.0)
+
+    # Meshes with fewer faces than this are drawn at full detail at every level
+    LOD_MIN_FACES = 5000
 
     def __init__(self, file_path: str, **kwargs) -> None:
 
@@ -25,16 +36,17 @@ class CustomShape(AbstractShape):
             self.scale = np.array(self.scale, dtype=float)
 
         self.file_path = file_path
+        self.decimation = kwargs.pop("decimation", None)
+        self.geometry = kwargs.pop("geometry", None)
+        if self.geometry is None:
+            self.geometry = self.acquire_geometry(self.file_path, self.decimation)
 
-        mesh = self.generate_meshdata()
-
-        self.mesh_item = gl.GLMeshItem(
-            meshdata=mesh,
+        self.mesh_item = ShapeMeshItem(
+            meshdata=self.geometry.meshdata,
             smooth=True,
             edgeColor=(0, 0, 0, 1),
             computeNormals=False
         )
-        self.sync_transformation_matrix()
 
         kwargs["name"] = kwargs.get("name", "Custom Shape")
         super().__init__(**kwargs)
@@ -56,21 +68,91 @@ class CustomShape(AbstractShape):
         """
         return cls(**data)
 
-    def generate_meshdata(self) -> gl.MeshData:
+    @classmethod
+    def prepare(cls, data: dict) -> dict:
         """
-        Generate the mesh data for the shape.
+        Prepare a serialized shape for deserialization.
+
+        Parsing the STL file is by far the most expensive part
+        of restoring a custom shape, so it is done here.
+
+        Parameters
+        ----------
+        data : dict
+            The serialized shape.
 
         Returns
         -------
-        gl.MeshData
-            The mesh data for the shape.
+        dict
+            The serialized shape, with its shared geometry added.
         """
-        if self.custom_mesh_file is None:
-            self.custom_mesh_file = stl_mesh.Mesh.from_file(self.file_path)
+        return {**data, "geometry": cls.acquire_geometry(data["file_path"], data.get("decimation"))}
 
-        return gl.MeshData(
-            vertexes=self.custom_mesh_file.vectors * self.scale
-        )
+    @classmethod
+    def acquire_geometry(cls, file_path: str, decimation: Optional[Dict[str, float]] = None) -> Geometry:
+        """
+        Acquire the shared geometry for an STL file.
+
+        Shapes referencing the same file, with the same decimation, share one copy of the triangles.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the STL file.
+        decimation : Optional[Dict[str, float]]
+            The decimation settings, or None to use the full mesh.
+
+        Returns
+        -------
+        Geometry
+            The shared geometry, which must be released by the caller.
+        """
+        if not decimation:
+            key = ("stl", os.path.abspath(file_path))
+            return geometry_registry.acquire(key, lambda: Geometry(key, *load_stl(file_path)))
+
+        target_faces, max_error = decimation.get("target_faces"), decimation.get("max_error")
+        key = ("stl", os.path.abspath(file_path), "decimated", target_faces, max_error)
+        return geometry_registry.acquire(key, lambda: Geometry(key, *load_stl_decimated(file_path, target_faces, max_error)))
+
+    def acquire_lod_geometry(self, level: int) -> Geometry:
+        """
+        Acquire the shared, simplified geometry for a coarser level of detail.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail.
+
+        Returns
+        -------
+        Geometry
+            The geometry for the level, which must be released by the caller.
+        """
+        base = self.geometry
+        if base.faces is None or len(base.faces) < self.LOD_MIN_FACES:
+            # Simplifying a small mesh saves little and loses most of its shape, share the base instead
+            return geometry_registry.acquire(base.key, lambda: base)
+
+        # Levels are clustered from the base geometry, so a decimated shape's levels are built from the decimated mesh
+        file_path, decimation = self.file_path, self.decimation
+        resolution = self.LOD_RESOLUTIONS[level - 1]
+        key = ("stl", os.path.abspath(file_path), "clustered", resolution)
+        if decimation:
+            key += ("decimated", decimation.get("target_faces"), decimation.get("max_error"))
+
+        return geometry_registry.acquire(key, lambda: Geometry(key, *load_stl_lod(file_path, resolution, decimation)))
+
+    def model_scale(self) -> Tuple[float, float, float]:
+        """
+        Get the scale applied to the shape's geometry by its model transform.
+
+        Returns
+        -------
+        Tuple[float, float, float]
+            The scale along each local axis.
+        """
+        return tuple(self.scale)
 
     def update_translation(self, property_: str, axis: int, value: float) -> None:
         """
@@ -89,10 +171,9 @@ class CustomShape(AbstractShape):
         if self.mesh_item is None or property_ != "scale" or value <= 0.0:
             return
 
+        # Scale is part of the model transform, so the geometry is left untouched
         self.scale[axis] = value
-        self.mesh_item.setMeshData(meshdata=self.generate_meshdata())
-
-        self.sync_transformation_matrix()
+        self.apply_model_transform()
 
     def get_form_components(self) -> List[Tuple[str, QLabel, QWidget]]:
         """
@@ -108,6 +189,20 @@ class CustomShape(AbstractShape):
             ("scale", QLabel("Scale", alignment=QtCore.Qt.AlignBaseline), SpinboxGroup(self.scale[0], self.scale[1], self.scale[2])),
         ]
 
+    def get_form_values(self) -> Dict[str, Any]:
+        """
+        Get the values shown by the form components of the shape.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The value of each property of the form components.
+        """
+        return {
+            **super().get_form_values(),
+            "scale": tuple(self.scale)
+        }
+
     def serialize(self) -> dict:
         """
         Serialize the shape to a dictionary.
@@ -117,9 +212,14 @@ class CustomShape(AbstractShape):
         dict
             The serialized shape.
         """
-        return {
+        data = {
             **super().serialize(),
             "type": "custom",
             "file_path": self.file_path,
             "scale": self.scale.tolist()
         }
+
+        if self.decimation:
+            data["decimation"] = dict(self.decimation)
+
+        return data
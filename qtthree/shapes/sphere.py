@@ -1,25 +1,31 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
-import pyqtgraph.opengl as gl
 from PySide2.QtWidgets import QDoubleSpinBox, QLabel, QWidget
 
+from qtthree.geometry import Geometry, acquire_unit_sphere
+from qtthree.rendering import ShapeMeshItem
 from qtthree.shapes import AbstractShape
 
 
 class Sphere(AbstractShape):
     radius: float
 
+    # Tessellation (rows, columns) of each level of detail, the first one being the base geometry
+    LOD_TESSELLATIONS: Tuple[Tuple[int, int], ...] = ((20, 20), (12, 12), (6, 8))
+    LOD_THRESHOLDS = (40.0, 12.0)
+
     def __init__(self, **kwargs) -> None:
         self.radius = kwargs.pop("radius", 1.0)
 
-        mesh = self.generate_meshdata()
+        self.geometry = kwargs.pop("geometry", None)
+        if self.geometry is None:
+            self.geometry = acquire_unit_sphere(*self.LOD_TESSELLATIONS[0])
 
-        self.mesh_item = gl.GLMeshItem(
-            meshdata=mesh,
+        self.mesh_item = ShapeMeshItem(
+            meshdata=self.geometry.meshdata,
             smooth=True,
             edgeColor=(0, 0, 0, 1)
         )
-        self.sync_transformation_matrix()
 
         kwargs["name"] = kwargs.get("name", "Sphere")
         super().__init__(**kwargs)
@@ -41,16 +47,51 @@ class Sphere(AbstractShape):
         """
         return cls(**data)
 
-    def generate_meshdata(self) -> gl.MeshData:
+    @classmethod
+    def prepare(cls, data: dict) -> dict:
         """
-        Generate the mesh data for the shape.
+        Prepare a serialized shape for deserialization.
+
+        Parameters
+        ----------
+        data : dict
+            The serialized shape.
+
+        Returns
+        -------
+        dict
+            The serialized shape, with its shared geometry added.
+        """
+        return {**data, "geometry": acquire_unit_sphere(*cls.LOD_TESSELLATIONS[0])}
+
+    def acquire_lod_geometry(self, level: int) -> Geometry:
+        """
+        Acquire the shared unit sphere for a coarser level of detail.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail.
 
         Returns
         -------
-        gl.MeshData
-            The mesh data for the shape.
+        Geometry
+            The geometry for the level, which must be released by the caller.
         """
-        return gl.MeshData.sphere(rows=20, cols=20, radius=self.radius)
+        return acquire_unit_sphere(*self.LOD_TESSELLATIONS[level])
+
+    def model_scale(self) -> Tuple[float, float, float]:
+        """
+        Get the scale applied to the shape's geometry by its model transform.
+
+        The sphere is a scaled unit sphere, so its radius is its scale.
+
+        Returns
+        -------
+        Tuple[float, float, float]
+            The scale along each local axis.
+        """
+        return (self.radius, self.radius, self.radius)
 
     def update_property(self, property_: str, value: float) -> None:
         """
@@ -69,8 +110,8 @@ class Sphere(AbstractShape):
             super().update_property(property_, value)
             return
 
-        self.mesh_item.setMeshData(meshdata=self.generate_meshdata())
-        self.mesh_item.meshDataChanged()
+        # Dimensions are part of the model transform, so the shared geometry is left untouched
+        self.apply_model_transform()
 
     def get_form_components(self) -> List[Tuple[str, QLabel, QWidget]]:
         """
@@ -86,6 +127,20 @@ class Sphere(AbstractShape):
             ("radius", QLabel("Radius"), QDoubleSpinBox(value=self.radius))
         ]
 
+    def get_form_values(self) -> Dict[str, Any]:
+        """
+        Get the values shown by the form components of the shape.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The value of each property of the form components.
+        """
+        return {
+            **super().get_form_values(),
+            "radius": self.radius
+        }
+
     def serialize(self) -> dict:
         """
         Serialize the shape to a dictionary.
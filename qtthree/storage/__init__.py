@@ -0,0 +1,74 @@
+import os
+
+from qtthree.storage.base import StorageBackend
+from qtthree.storage.journal import Journal
+from qtthree.storage.journal_backend import JournalBackend
+from qtthree.storage.json_backend import JsonBackend
+from qtthree.storage.npz_backend import NpzBackend, pack_shapes, unpack_shapes
+from qtthree.storage.sqlite_backend import SqliteBackend
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+NPZ_EXTENSIONS = (".npz",)
+
+
+def backend_for_file(filename: str, journaled: bool = False) -> StorageBackend:
+    """
+    Picks the storage backend for a data file from its extension.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the data file.
+    journaled : bool
+        Whether JSON data files should use an append-only journal.
+
+    Returns
+    -------
+    StorageBackend
+        The backend for the data file.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in SQLITE_EXTENSIONS:
+        return SqliteBackend(filename)
+    elif extension in NPZ_EXTENSIONS:
+        return NpzBackend(filename)
+    elif journaled:
+        return JournalBackend(filename)
+
+    return JsonBackend(filename)
+
+
+def convert(source: str, destination: str) -> int:
+    """
+    Copies every shape from one data file to another,
+    converting between formats based on their extensions.
+
+    Parameters
+    ----------
+    source : str
+        The path to the data file to read.
+    destination : str
+        The path to the data file to write.
+
+    Returns
+    -------
+    int
+        The number of shapes converted.
+    """
+    source_backend = backend_for_file(source)
+    destination_backend = backend_for_file(destination)
+    try:
+        data = source_backend.load()
+        destination_backend.truncate()
+        destination_backend.commit(list(data.values()), [], data)
+    finally:
+        source_backend.close()
+        destination_backend.close()
+
+    return len(data)
+
+
+__all__ = [
+    "StorageBackend", "Journal", "JournalBackend", "JsonBackend", "NpzBackend", "SqliteBackend",
+    "backend_for_file", "convert", "pack_shapes", "unpack_shapes"
+]
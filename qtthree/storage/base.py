@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, List, Optional
+
+
+class StorageBackend:
+    """
+    Base class for the persistent storage used by the Serializer.
+
+    Shapes are stored as their serialized dictionaries, keyed by UUID.
+    """
+    filename: str
+
+    # Whether commit() needs a copy of the whole in-memory document
+    rewrites_document: bool = False
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+
+    def load(self) -> Dict[str, dict]:
+        """
+        Loads every stored shape.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The serialized shapes, keyed by UUID.
+        """
+        raise NotImplementedError
+
+    def upsert(self, shapes: Iterable[dict]) -> None:
+        """
+        Inserts the passed shapes, or replaces them if they are already stored.
+
+        Parameters
+        ----------
+        shapes : Iterable[dict]
+            The serialized shapes.
+        """
+        raise NotImplementedError
+
+    def delete(self, uuids: Iterable[str]) -> None:
+        """
+        Deletes the shapes with the passed UUIDs.
+
+        Parameters
+        ----------
+        uuids : Iterable[str]
+            The UUIDs of the shapes to delete.
+        """
+        raise NotImplementedError
+
+    def commit(self, saved: List[dict], removed: List[str], document: Optional[Dict[str, dict]] = None) -> None:
+        """
+        Persists a batch of changes.
+
+        Parameters
+        ----------
+        saved : List[dict]
+            The serialized shapes that were added or changed.
+        removed : List[str]
+            The UUIDs of the shapes that were removed.
+        document : Optional[Dict[str, dict]]
+            The whole scene after the changes, if the backend rewrites it.
+        """
+        if removed:
+            self.delete(removed)
+        if saved:
+            self.upsert(saved)
+
+    def truncate(self) -> None:
+        """
+        Deletes every stored shape.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Releases any resources held by the backend.
+        """
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, TextIO
+
+
+class Journal:
+    """
+    Append-only storage for shape data.
+
+    Every save or removal is appended to a log file as a single JSON line,
+    so the cost of persisting an edit does not depend on the size of the scene.
+    Once the log grows past ``compact_threshold`` records, it is folded into
+    the snapshot file on a background thread.
+
+    The snapshot uses the same format as the plain JSON data file.
+    """
+    snapshot_path: str
+    log_path: str
+    pending_path: str
+    compact_threshold: int
+
+    def __init__(self, snapshot_path: str, compact_threshold: int = 1000) -> None:
+        self.snapshot_path = snapshot_path
+        self.log_path = f"{snapshot_path}.journal"
+        self.pending_path = f"{snapshot_path}.journal.pending"
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()
+        self._log: Optional[TextIO] = None
+        self._entries = 0
+        self._compaction: Optional[threading.Thread] = None
+
+        # A pending log is only left behind if a previous compaction was interrupted.
+        if os.path.exists(self.pending_path):
+            self._fold_pending()
+
+    @staticmethod
+    def apply(data: Dict[str, dict], record: dict) -> None:
+        """
+        Applies a single journal record to the passed data.
+
+        Parameters
+        ----------
+        data : Dict[str, dict]
+            The shape data, keyed by UUID.
+        record : dict
+            The journal record.
+        """
+        op = record.get("op")
+        if op == "save":
+            shape_data = record["shape"]
+            data[shape_data["uuid"]] = shape_data
+        elif op == "remove":
+            data.pop(record["uuid"], None)
+        elif op == "clear":
+            data.clear()
+
+    @staticmethod
+    def read_records(path: str) -> Iterable[dict]:
+        """
+        Reads the records of a journal file.
+
+        A truncated trailing line (e.g. from a crash mid-write) is ignored.
+
+        Parameters
+        ----------
+        path : str
+            The path of the journal file.
+
+        Yields
+        ------
+        dict
+            The journal records, in the order they were written.
+        """
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+        except FileNotFoundError:
+            return
+
+    def read_snapshot(self) -> Dict[str, dict]:
+        """
+        Reads the snapshot file.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The shape data stored in the snapshot.
+        """
+        try:
+            with open(self.snapshot_path, "r") as f:
+                return json.loads(f.read())
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+
+    def replay(self) -> Dict[str, dict]:
+        """
+        Replays the log on top of the snapshot.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The current shape data, keyed by UUID.
+        """
+        while True:
+            with self._lock:
+                compaction = self._compaction
+                if compaction is None or not compaction.is_alive():
+                    data = self.read_snapshot()
+                    for path in (self.pending_path, self.log_path):
+                        entries = 0
+                        for record in self.read_records(path):
+                            self.apply(data, record)
+                            entries += 1
+
+                        if path == self.log_path:
+                            self._entries = entries
+
+                    return data
+
+            # The snapshot is being rewritten, so wait for it to settle
+            compaction.join()
+
+    def append(self, record: dict) -> None:
+        """
+        Appends a record to the log.
+
+        Triggers a background compaction once the log is long enough.
+
+        Parameters
+        ----------
+        record : dict
+            The record to append.
+        """
+        with self._lock:
+            if self._log is None:
+                self._log = open(self.log_path, "a")
+
+            self._log.write(json.dumps(record) + "\n")
+            self._log.flush()
+            self._entries += 1
+
+            if self._entries >= self.compact_threshold:
+                self._start_compaction()
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Folds the log into the snapshot.
+
+        Parameters
+        ----------
+        wait : bool
+            Whether to block until the compaction is finished.
+        """
+        with self._lock:
+            self._start_compaction()
+            compaction = self._compaction
+
+        if wait and compaction is not None:
+            compaction.join()
+
+    def close(self) -> None:
+        """
+        Closes the log file, waiting for any running compaction.
+        """
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            compaction = self._compaction
+
+        if compaction is not None:
+            compaction.join()
+
+    def _start_compaction(self) -> None:
+        """
+        Rotates the log out of the way and folds it into the snapshot
+        on a background thread. Must be called with the lock held.
+
+        New records keep going to a fresh log while the compaction runs.
+        """
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+        if not os.path.exists(self.log_path):
+            return
+
+        os.replace(self.log_path, self.pending_path)
+        self._entries = 0
+
+        self._compaction = threading.Thread(target=self._fold_pending, daemon=True)
+        self._compaction.start()
+
+    def _fold_pending(self) -> None:
+        """
+        Applies the pending log to the snapshot and atomically replaces it.
+
+        Records are idempotent, so a crash between replacing the snapshot
+        and removing the pending log only causes it to be applied twice.
+        """
+        data = self.read_snapshot()
+        for record in self.read_records(self.pending_path):
+            self.apply(data, record)
+
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(json.dumps(data))
+        os.replace(temp_path, self.snapshot_path)
+        os.remove(self.pending_path)
@@ -0,0 +1,35 @@
+from typing import Dict, Iterable
+
+from qtthree.storage.base import StorageBackend
+from qtthree.storage.journal import Journal
+
+
+class JournalBackend(StorageBackend):
+    """
+    Stores shapes in a JSON snapshot plus an append-only journal.
+
+    The data file is only the snapshot. Edits are appended to a log
+    next to it, and compacted into it periodically.
+    """
+    journal: Journal
+
+    def __init__(self, filename: str) -> None:
+        super().__init__(filename)
+        self.journal = Journal(filename)
+
+    def load(self) -> Dict[str, dict]:
+        return self.journal.replay()
+
+    def upsert(self, shapes: Iterable[dict]) -> None:
+        for shape_data in shapes:
+            self.journal.append({"op": "save", "shape": shape_data})
+
+    def delete(self, uuids: Iterable[str]) -> None:
+        for uuid in uuids:
+            self.journal.append({"op": "remove", "uuid": uuid})
+
+    def truncate(self) -> None:
+        self.journal.append({"op": "clear"})
+
+    def close(self) -> None:
+        self.journal.close()
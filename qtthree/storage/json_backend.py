@@ -0,0 +1,55 @@
+import json
+from typing import Dict, Iterable, List, Optional
+
+from qtthree.storage.base import StorageBackend
+
+
+class JsonBackend(StorageBackend):
+    """
+    Stores every shape in a single JSON file.
+
+    Batches are committed by dumping the serializer's in-memory document,
+    so the file is never re-read after startup.
+    """
+    rewrites_document = True
+
+    def save(self, data: Dict[str, dict]) -> None:
+        """
+        Saves the passed data to the backend's filename.
+
+        Parameters
+        ----------
+        data : Dict[str, dict]
+            The data to save.
+        """
+        with open(self.filename, 'w') as f:
+            f.write(json.dumps(data))
+
+    def load(self) -> Dict[str, dict]:
+        try:
+            with open(self.filename, 'r') as f:
+                return json.loads(f.read())
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+
+    def upsert(self, shapes: Iterable[dict]) -> None:
+        data = self.load()
+        for shape_data in shapes:
+            data[shape_data["uuid"]] = shape_data
+        self.save(data)
+
+    def delete(self, uuids: Iterable[str]) -> None:
+        data = self.load()
+        for uuid in uuids:
+            data.pop(uuid, None)
+        self.save(data)
+
+    def commit(self, saved: List[dict], removed: List[str], document: Optional[Dict[str, dict]] = None) -> None:
+        if document is None:
+            super().commit(saved, removed)
+            return
+
+        self.save(document)
+
+    def truncate(self) -> None:
+        self.save({})
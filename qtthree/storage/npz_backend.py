@@ -0,0 +1,182 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from qtthree.storage.base import StorageBackend
+
+FORMAT_VERSION = 1
+
+# Keys that are packed into typed arrays. Anything else a shape serializes
+# is kept as JSON in the "extra" array, so the format stays lossless.
+PACKED_KEYS = {
+    "uuid", "name", "type", "color", "transformation_matrix", "translation",
+    "length", "width", "height", "radius", "scale", "file_path",
+}
+
+
+def pack_shapes(data: Dict[str, dict]) -> Dict[str, np.ndarray]:
+    """
+    Packs serialized shapes into contiguous typed arrays.
+
+    Transformation matrices are stored as float32, which is lossless
+    since they come from Qt's single precision QMatrix4x4.
+    Per-type parameters share one (N, 3) array: length/width/height
+    for boxes, the radius for spheres and the scale for custom shapes.
+
+    Parameters
+    ----------
+    data : Dict[str, dict]
+        The serialized shapes, keyed by UUID.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The packed arrays.
+    """
+    shapes = list(data.values())
+    count = len(shapes)
+
+    transforms = np.empty((count, 4, 4), dtype=np.float32)
+    translations = np.zeros((count, 3), dtype=np.float64)
+    params = np.full((count, 3), np.nan, dtype=np.float64)
+    colors = np.empty(count, dtype=np.uint32)
+
+    for i, shape_data in enumerate(shapes):
+        transforms[i] = shape_data["transformation_matrix"]
+        translations[i] = shape_data.get("translation", (0, 0, 0))
+        colors[i] = int(shape_data["color"].lstrip("#"), 16)
+
+        if shape_data["type"] == "box":
+            params[i] = (shape_data["length"], shape_data["width"], shape_data["height"])
+        elif shape_data["type"] == "sphere":
+            params[i, 0] = shape_data["radius"]
+        elif shape_data["type"] == "custom":
+            params[i] = shape_data["scale"]
+
+    extras = [{key: value for key, value in shape_data.items() if key not in PACKED_KEYS} for shape_data in shapes]
+
+    return {
+        "format_version": np.array([FORMAT_VERSION], dtype=np.int32),
+        "uuid": np.array([shape_data["uuid"] for shape_data in shapes], dtype=str),
+        "name": np.array([shape_data["name"] for shape_data in shapes], dtype=str),
+        "type": np.array([shape_data["type"] for shape_data in shapes], dtype=str),
+        "color": colors,
+        "transformation_matrix": transforms,
+        "translation": translations,
+        "params": params,
+        "file_path": np.array([shape_data.get("file_path", "") for shape_data in shapes], dtype=str),
+        "extra": np.array([json.dumps(extra) if extra else "" for extra in extras], dtype=str),
+    }
+
+
+def unpack_shapes(arrays: Dict[str, np.ndarray]) -> Dict[str, dict]:
+    """
+    Unpacks arrays created by pack_shapes back into serialized shapes.
+
+    Every array is converted with a single bulk tolist() call rather than
+    per-element reads.
+
+    Parameters
+    ----------
+    arrays : Dict[str, np.ndarray]
+        The packed arrays.
+
+    Returns
+    -------
+    Dict[str, dict]
+        The serialized shapes, keyed by UUID.
+    """
+    uuids = arrays["uuid"].tolist()
+    names = arrays["name"].tolist()
+    types = arrays["type"].tolist()
+    colors = arrays["color"].tolist()
+    transforms = arrays["transformation_matrix"].tolist()
+    translations = arrays["translation"].tolist()
+    params = arrays["params"].tolist()
+    file_paths = arrays["file_path"].tolist()
+    extras = arrays["extra"].tolist()
+
+    data = {}
+    for i, uuid in enumerate(uuids):
+        shape_data = {
+            "uuid": uuid,
+            "name": names[i],
+            "color": f"#{colors[i]:06x}",
+            "transformation_matrix": transforms[i],
+            "translation": translations[i],
+            "type": types[i],
+        }
+
+        if types[i] == "box":
+            shape_data["length"], shape_data["width"], shape_data["height"] = params[i]
+        elif types[i] == "sphere":
+            shape_data["radius"] = params[i][0]
+        elif types[i] == "custom":
+            shape_data["file_path"] = file_paths[i]
+            shape_data["scale"] = params[i]
+
+        if extras[i]:
+            shape_data.update(json.loads(extras[i]))
+
+        data[uuid] = shape_data
+
+    return data
+
+
+class NpzBackend(StorageBackend):
+    """
+    Stores the scene as a compact NumPy .npz archive of typed arrays.
+
+    Like the JSON backend, every commit rewrites the whole file from the
+    serializer's in-memory document, but loading is done with bulk array
+    reads instead of parsing a JSON float per matrix entry.
+    """
+    rewrites_document = True
+
+    def save(self, data: Dict[str, dict]) -> None:
+        """
+        Saves the passed data to the backend's filename.
+
+        The archive is written to a temporary file first, so a crash
+        never leaves a partially written scene behind.
+
+        Parameters
+        ----------
+        data : Dict[str, dict]
+            The data to save.
+        """
+        temp_path = f"{self.filename}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **pack_shapes(data))
+        os.replace(temp_path, self.filename)
+
+    def load(self) -> Dict[str, dict]:
+        try:
+            with np.load(self.filename, allow_pickle=False) as archive:
+                return unpack_shapes({key: archive[key] for key in archive.files})
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def upsert(self, shapes: Iterable[dict]) -> None:
+        data = self.load()
+        for shape_data in shapes:
+            data[shape_data["uuid"]] = shape_data
+        self.save(data)
+
+    def delete(self, uuids: Iterable[str]) -> None:
+        data = self.load()
+        for uuid in uuids:
+            data.pop(uuid, None)
+        self.save(data)
+
+    def commit(self, saved: List[dict], removed: List[str], document: Optional[Dict[str, dict]] = None) -> None:
+        if document is None:
+            super().commit(saved, removed)
+            return
+
+        self.save(document)
+
+    def truncate(self) -> None:
+        self.save({})
@@ -0,0 +1,58 @@
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable
+
+from qtthree.storage.base import StorageBackend
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Stores shapes in a SQLite database, one row per shape.
+
+    Rows are keyed by UUID, so saving or removing a shape only touches its own row.
+    """
+    connection: sqlite3.Connection
+
+    def __init__(self, filename: str) -> None:
+        super().__init__(filename)
+
+        # Saves can arrive from timer threads, so the connection is shared behind a lock.
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        with self._lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS shapes ("
+                "uuid TEXT PRIMARY KEY, "
+                "type TEXT NOT NULL, "
+                "data TEXT NOT NULL)"
+            )
+
+    def load(self) -> Dict[str, dict]:
+        with self._lock:
+            rows = self.connection.execute("SELECT uuid, data FROM shapes ORDER BY rowid").fetchall()
+
+        return {uuid: json.loads(data) for uuid, data in rows}
+
+    def upsert(self, shapes: Iterable[dict]) -> None:
+        rows = [(shape_data["uuid"], shape_data["type"], json.dumps(shape_data)) for shape_data in shapes]
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO shapes (uuid, type, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(uuid) DO UPDATE SET type = excluded.type, data = excluded.data",
+                rows
+            )
+
+    def delete(self, uuids: Iterable[str]) -> None:
+        with self._lock, self.connection:
+            self.connection.executemany("DELETE FROM shapes WHERE uuid = ?", [(uuid,) for uuid in uuids])
+
+    def truncate(self) -> None:
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM shapes")
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
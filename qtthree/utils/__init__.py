@@ -1,3 +1,5 @@
-from .debounce import debounce
+from .name_index import NameIndex
+from .row_index import RowIndex
+from .write_behind import WriteBehindFlusher
 
-__all__ = ["debounce"]
+__all__ = ["NameIndex", "RowIndex", "WriteBehindFlusher"]
@@ -0,0 +1,116 @@
+from typing import Callable, Dict, Hashable, Tuple
+
+from PySide2 import QtCore
+
+from qtthree.rendering.frame_scheduler import FrameScheduler
+from qtthree.shapes.abstract_shape import AbstractShape
+from qtthree.utils.serializer import Serializer
+
+
+class EditPipeline(QtCore.QObject):
+    """
+    Collapses continuous property edits into one update per frame, and one save per interaction.
+
+    Form widgets such as dials and spinboxes emit many changes per frame while they
+    are dragged or held. Edits are keyed by shape and property, and a newer edit
+    replaces the pending one with the same key. Each edit requests a frame from the
+    view's frame scheduler, and pending edits are applied together as the frame starts,
+    so they are applied once per rendered frame. Once no edit has arrived for the
+    settle interval, the interaction is over, and every shape it touched is saved once.
+    """
+    serializer: Serializer
+    scheduler: FrameScheduler
+    settle_timer: QtCore.QTimer
+
+    # Number of edits submitted and actually applied, to see how many were collapsed
+    submitted: int = 0
+    applied: int = 0
+
+    # Emitted after a frame's worth of pending edits is applied
+    editsApplied = QtCore.Signal()
+
+    def __init__(self, serializer: Serializer, scheduler: FrameScheduler, settle_interval: float = 0.3, parent=None) -> None:
+        super().__init__(parent)
+        self.serializer = serializer
+        self.scheduler = scheduler
+
+        self._pending: Dict[Tuple[str, Hashable], Tuple[AbstractShape, Callable[[], None]]] = {}
+        self._touched: Dict[str, AbstractShape] = {}
+
+        self.scheduler.frameStarted.connect(self.apply)
+
+        self.settle_timer = QtCore.QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(int(settle_interval * 1000))
+        self.settle_timer.timeout.connect(self.commit)
+
+        # Connected before the serializer closes (see create_application), so the last interaction is saved
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.commit)
+
+    def submit(self, shape: AbstractShape, key: Hashable, apply: Callable[[], None]) -> None:
+        """
+        Schedules an edit of a shape, replacing any pending edit of the same property.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape being edited.
+        key : Hashable
+            The property being edited, e.g. ("rotation", axis).
+        apply : Callable[[], None]
+            Applies the edit to the shape.
+        """
+        self.submitted += 1
+        self._pending[(shape.uuid, key)] = (shape, apply)
+        self.scheduler.request()
+
+        # Restarted by every edit, so it only fires once the interaction is over
+        self.settle_timer.start()
+
+    def apply(self) -> None:
+        """
+        Applies every pending edit.
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        for shape, apply in pending.values():
+            apply()
+            self._touched[shape.uuid] = shape
+
+        self.applied += len(pending)
+        self.editsApplied.emit()
+
+    def commit(self) -> None:
+        """
+        Applies every pending edit, and saves each shape edited since the last commit once.
+        """
+        self.settle_timer.stop()
+        self.apply()
+
+        touched, self._touched = self._touched, {}
+        for shape in touched.values():
+            self.serializer.save_shape(shape)
+
+    def discard(self, shape: str) -> None:
+        """
+        Drops the pending edits of a shape, e.g. before it is deleted.
+
+        Parameters
+        ----------
+        shape : str
+            The UUID of the shape.
+        """
+        self._pending = {key: edit for key, edit in self._pending.items() if key[0] != shape}
+        self._touched.pop(shape, None)
+
+    def clear(self) -> None:
+        """
+        Drops every pending edit without applying or saving it, e.g. when the scene is cleared.
+        """
+        self.settle_timer.stop()
+        self._pending.clear()
+        self._touched.clear()
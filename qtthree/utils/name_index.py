@@ -0,0 +1,155 @@
+from typing import Dict, Hashable, Optional, Set
+
+
+class NameIndex:
+    """
+    Case-insensitive substring index over the names of keys.
+
+    Every n-gram of one to GRAM_SIZE characters of a name points to the keys whose
+    name contains it, so short queries (and prefixes of longer ones) are a single
+    lookup, and longer queries only check the names sharing every one of their grams.
+    Adding, renaming and removing a key only touch the grams of its name.
+    """
+    GRAM_SIZE = 3
+
+    names: Dict[Hashable, str]
+    grams: Dict[str, Set[Hashable]]
+
+    def __init__(self) -> None:
+        self.names = {}
+        self.grams = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def grams_of(cls, name: str, sizes: Optional[range] = None) -> Set[str]:
+        """
+        Get the n-grams of a folded name.
+
+        Parameters
+        ----------
+        name : str
+            The name, already case folded.
+        sizes : Optional[range]
+            The lengths of the grams, one to GRAM_SIZE by default.
+
+        Returns
+        -------
+        Set[str]
+            The grams.
+        """
+        if sizes is None:
+            sizes = range(1, cls.GRAM_SIZE + 1)
+
+        return {name[i:i + size] for size in sizes for i in range(len(name) - size + 1)}
+
+    def add(self, key: Hashable, name: str) -> None:
+        """
+        Index the name of a key, replacing any previous one.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+        name : str
+            The name.
+        """
+        folded = name.casefold()
+        previous = self.names.get(key)
+        if previous == folded:
+            return
+
+        self.names[key] = folded
+        new_grams = self.grams_of(folded)
+        old_grams = self.grams_of(previous) if previous is not None else set()
+
+        for gram in old_grams - new_grams:
+            self._discard(gram, key)
+
+        for gram in new_grams - old_grams:
+            self.grams.setdefault(gram, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Drop a key from the index.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+        """
+        name = self.names.pop(key, None)
+        if name is None:
+            return
+
+        for gram in self.grams_of(name):
+            self._discard(gram, key)
+
+    def clear(self) -> None:
+        """
+        Drop every key from the index.
+        """
+        self.names.clear()
+        self.grams.clear()
+
+    def matches(self, key: Hashable, query: str) -> bool:
+        """
+        Check whether the name of a key contains a query.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+        query : str
+            The query.
+
+        Returns
+        -------
+        bool
+            True if the key is indexed and its name contains the query, ignoring case.
+        """
+        name = self.names.get(key)
+        return name is not None and query.casefold() in name
+
+    def search(self, query: str) -> Set[Hashable]:
+        """
+        Find the keys whose name contains a query, ignoring case.
+
+        Parameters
+        ----------
+        query : str
+            The query.
+
+        Returns
+        -------
+        Set[Hashable]
+            The matching keys.
+        """
+        folded = query.casefold()
+        if not folded:
+            return set(self.names)
+
+        size = min(len(folded), self.GRAM_SIZE)
+        candidates = sorted((self.grams.get(gram, set()) for gram in self.grams_of(folded, range(size, size + 1))), key=len)
+
+        keys = set(candidates[0])
+        for other in candidates[1:]:
+            if not keys:
+                break
+            keys &= other
+
+        # Sharing every gram doesn't guarantee containing the whole query
+        if len(folded) > self.GRAM_SIZE:
+            keys = {key for key in keys if folded in self.names[key]}
+
+        return keys
+
+    def _discard(self, gram: str, key: Hashable) -> None:
+        keys = self.grams.get(gram)
+        if keys is None:
+            return
+
+        keys.discard(key)
+        if not keys:
+            del self.grams[gram]
@@ -0,0 +1,213 @@
+from typing import Dict, Hashable, Iterator, List, Optional
+
+
+class RowIndex:
+    """
+    Keys in insertion order, indexed both ways between keys and rows.
+
+    Removing a key leaves a tombstone in its slot instead of shifting the slots
+    after it. A Fenwick tree counts the live slots, so the row of a key and the key
+    of a row are both found in logarithmic time, and rows stay in insertion order.
+    Slots only grow, so sorted slots list keys in insertion order too. Once
+    tombstones outnumber the keys (see is_sparse), the owner compacts the slots,
+    which renumbers them.
+    """
+    slots: List[Optional[Hashable]]
+    positions: Dict[Hashable, int]
+    # Fenwick tree over the slots, 1-based, counting the live ones
+    tree: List[int]
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return (key for key in self.slots if key is not None)
+
+    def clear(self) -> None:
+        """
+        Remove every key.
+        """
+        self.slots = []
+        self.positions = {}
+        self.tree = [0]
+
+    def append(self, key: Hashable) -> int:
+        """
+        Add a key after every other one.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key, which must not be in the index.
+
+        Returns
+        -------
+        int
+            The row of the key.
+        """
+        self.positions[key] = len(self.slots)
+        self.slots.append(key)
+
+        # The new node counts its own slot and the ones below it that it covers
+        node = len(self.slots)
+        self.tree.append(1 + self._prefix(node - 1) - self._prefix(node - (node & -node)))
+        return len(self.positions) - 1
+
+    def remove(self, key: Hashable) -> Optional[int]:
+        """
+        Remove a key. The rows of the keys after it move up by one.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+
+        Returns
+        -------
+        Optional[int]
+            The row the key had, or None if it wasn't in the index.
+        """
+        slot = self.positions.pop(key, None)
+        if slot is None:
+            return None
+
+        row = self._prefix(slot)
+        self.slots[slot] = None
+
+        node = slot + 1
+        while node < len(self.tree):
+            self.tree[node] -= 1
+            node += node & -node
+
+        return row
+
+    @property
+    def is_sparse(self) -> bool:
+        """
+        Whether tombstones outnumber the keys, and the slots should be compacted.
+
+        Returns
+        -------
+        bool
+            True if the slots should be compacted.
+        """
+        return len(self.slots) > 2 * len(self.positions) + 16
+
+    def row_of(self, key: Hashable) -> Optional[int]:
+        """
+        Get the row of a key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+
+        Returns
+        -------
+        Optional[int]
+            The row, or None if the key isn't in the index.
+        """
+        slot = self.positions.get(key)
+        return None if slot is None else self._prefix(slot)
+
+    def slot_of(self, key: Hashable) -> Optional[int]:
+        """
+        Get the slot of a key, which only changes when the slots are compacted.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+
+        Returns
+        -------
+        Optional[int]
+            The slot, or None if the key isn't in the index.
+        """
+        return self.positions.get(key)
+
+    def key_at_slot(self, slot: int) -> Optional[Hashable]:
+        """
+        Get the key in a slot.
+
+        Parameters
+        ----------
+        slot : int
+            The slot.
+
+        Returns
+        -------
+        Optional[Hashable]
+            The key, or None if the slot holds a tombstone.
+        """
+        return self.slots[slot]
+
+    def key_at(self, row: int) -> Hashable:
+        """
+        Get the key of a row.
+
+        Parameters
+        ----------
+        row : int
+            The row.
+
+        Returns
+        -------
+        Hashable
+            The key.
+        """
+        if not 0 <= row < len(self.positions):
+            raise IndexError(row)
+
+        # Walk down the tree to the first slot with row + 1 live slots up to it
+        node, remaining = 0, row + 1
+        step = 1 << (len(self.slots).bit_length() - 1)
+        while step:
+            child = node + step
+            if child < len(self.tree) and self.tree[child] < remaining:
+                node = child
+                remaining -= self.tree[child]
+            step >>= 1
+
+        return self.slots[node]
+
+    def compact(self) -> List[int]:
+        """
+        Drop the tombstones, moving every key to the slot of its row.
+
+        Returns
+        -------
+        List[int]
+            The new slot of each old slot, or -1 for tombstones.
+        """
+        moved = [-1] * len(self.slots)
+        keys = list(self)
+        for row, key in enumerate(keys):
+            moved[self.positions[key]] = row
+
+        # Every slot is live, so each node counts exactly the slots it covers
+        self.slots = keys
+        self.positions = {key: row for row, key in enumerate(keys)}
+        self.tree = [0] + [node & -node for node in range(1, len(keys) + 1)]
+        return moved
+
+    def _prefix(self, count: int) -> int:
+        """
+        Count the live keys in the first slots.
+
+        Parameters
+        ----------
+        count : int
+            The number of slots.
+        """
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
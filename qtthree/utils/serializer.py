@@ -1,40 +1,89 @@
-import json
-from typing import Generator
+from typing import Dict, Generator, Optional
 
 from qtthree.shapes import AbstractShape, Box, CustomShape, Sphere
-from qtthree.utils.debounce import debounce
+from qtthree.storage import StorageBackend, backend_for_file
+from qtthree.utils.write_behind import WriteBehindFlusher
+
+SHAPE_TYPES = {
+    "box": Box,
+    "sphere": Sphere,
+    "custom": CustomShape,
+}
 
 
 class Serializer:
-    def __init__(self, filename):
+    backend: StorageBackend
+    flusher: WriteBehindFlusher
+
+    # Authoritative copy of the stored scene, keyed by UUID
+    document: Optional[Dict[str, dict]] = None
+
+    def __init__(self, filename, journaled: bool = False, flush_interval: float = 0.5):
         self.filename = filename
+        self.backend = backend_for_file(filename, journaled)
+        self.flusher = WriteBehindFlusher(self.backend, self.load, flush_interval)
 
-    def save(self, data: dict) -> None:
+    def load(self) -> Dict[str, dict]:
         """
-        Saves the passed data to the serializer's filename.
+        Loads the data from the serializer's filename.
+
+        The file is only read the first time. Afterwards, the in-memory
+        document is returned and kept up to date by saves and removals.
+
+        Returns
+        -------
+        Dict[str, dict]
+            The data loaded from the serializer's filename.
+        """
+        if self.document is None:
+            self.document = self.backend.load()
+
+        return self.document
+
+    @staticmethod
+    def prepare_shape(shape_data: dict) -> Optional[dict]:
+        """
+        Prepares a serialized shape for deserialization.
+
+        This is the pure-data stage of restoring a shape (e.g. building
+        its mesh data), and is safe to run on a worker thread.
 
         Parameters
         ----------
-        data : dict
-            The data to save.
+        shape_data : dict
+            The serialized shape.
+
+        Returns
+        -------
+        Optional[dict]
+            The prepared shape data, or None if the shape type is unknown.
         """
-        with open(self.filename, 'w') as f:
-            f.write(json.dumps(data))
+        shape_type = SHAPE_TYPES.get(shape_data.get("type"))
+        if shape_type is None:
+            return None
 
-    def load(self) -> dict:
+        return shape_type.prepare(shape_data)
+
+    @staticmethod
+    def deserialize_shape(shape_data: dict) -> Optional[AbstractShape]:
         """
-        Loads the data from the serializer's filename.
+        Deserializes a shape. Must be called on the GUI thread.
+
+        Parameters
+        ----------
+        shape_data : dict
+            The serialized or prepared shape.
 
         Returns
         -------
-        dict
-            The data loaded from the serializer's filename.
+        Optional[AbstractShape]
+            The deserialized shape, or None if the shape type is unknown.
         """
-        try:
-            with open(self.filename, 'r') as f:
-                return json.loads(f.read())
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+        shape_type = SHAPE_TYPES.get(shape_data.get("type"))
+        if shape_type is None:
+            return None
+
+        return shape_type.deserialize(shape_data)
 
     def restore_all_shapes(self) -> Generator[AbstractShape, None, None]:
         """
@@ -45,31 +94,26 @@ class Serializer:
         AbstractShape
             The shape that was restored.
         """
+        # Iterate over a copy, as shapes may be saved while restoring
         data = self.load()
-        for shape_data in data.values():
-            if shape_data["type"] == "box":
-                yield Box.deserialize(shape_data)
-            elif shape_data["type"] == "sphere":
-                yield Sphere.deserialize(shape_data)
-            elif shape_data["type"] == "custom":
-                yield CustomShape.deserialize(shape_data)
-
-    @debounce(0.5)
+        for shape_data in list(data.values()):
+            shape = self.deserialize_shape(shape_data)
+            if shape is not None:
+                yield shape
+
     def save_shape(self, shape: AbstractShape) -> None:
         """
         Saves the passed shape to the serializer's filename.
 
-        0.5 seconds debounce to prevent saving excessively.
+        The shape is only marked dirty here. Every dirty shape in the scene
+        is written in a single batch once the flush interval elapses.
 
         Parameters
         ----------
         shape : AbstractShape
             The shape to save.
         """
-        shape_data = shape.serialize()
-        data = self.load()
-        data[shape_data["uuid"]] = shape_data
-        self.save(data)
+        self.flusher.mark_dirty(shape)
 
     def remove_shape(self, shape: str) -> None:
         """
@@ -80,12 +124,17 @@ class Serializer:
         shape : str
             The UUID of the shape to remove.
         """
-        data = self.load()
-        data.pop(shape, None)
-        self.save(data)
+        self.flusher.mark_removed(shape)
 
     def clear_data(self) -> None:
         """
         Clears the data from the serializer's filename.
         """
-        self.save({})
+        self.flusher.clear()
+
+    def close(self) -> None:
+        """
+        Writes any pending changes and releases any files held open by the serializer.
+        """
+        self.flusher.close()
+        self.backend.close()
@@ -0,0 +1,135 @@
+import queue
+import threading
+import traceback
+from typing import Callable, Dict, Optional, Set
+
+from PySide2 import QtCore
+
+from qtthree.shapes.abstract_shape import AbstractShape
+from qtthree.storage import StorageBackend
+
+
+class WriteBehindFlusher(QtCore.QObject):
+    """
+    Coalesces shape saves across the whole scene into batched writes.
+
+    Shapes are marked dirty by UUID from the GUI thread. Once per interval,
+    the dirty shapes are serialized on the GUI thread (so they are never read
+    while being edited), applied to the in-memory document and handed to a
+    single worker thread, which writes them to the backend in one batch.
+    """
+    backend: StorageBackend
+    document: Callable[[], Dict[str, dict]]
+    timer: QtCore.QTimer
+
+    def __init__(self, backend: StorageBackend, document: Callable[[], Dict[str, dict]], interval: float = 0.5, parent=None) -> None:
+        super().__init__(parent)
+        self.backend = backend
+        self.document = document
+
+        self._dirty: Dict[str, AbstractShape] = {}
+        self._removed: Set[str] = set()
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(int(interval * 1000))
+        self.timer.timeout.connect(self.flush)
+
+        self._queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def mark_dirty(self, shape: AbstractShape) -> None:
+        """
+        Schedules the passed shape to be saved with the next batch.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape to save.
+        """
+        self._removed.discard(shape.uuid)
+        self._dirty[shape.uuid] = shape
+        self._schedule()
+
+    def mark_removed(self, shape: str) -> None:
+        """
+        Schedules the shape with the given UUID to be removed with the next batch.
+
+        Parameters
+        ----------
+        shape : str
+            The UUID of the shape to remove.
+        """
+        self._dirty.pop(shape, None)
+        self._removed.add(shape)
+        self._schedule()
+
+    def clear(self) -> None:
+        """
+        Drops every pending change and truncates the backend.
+        """
+        self.timer.stop()
+        self._dirty.clear()
+        self._removed.clear()
+        self.document().clear()
+        self._queue.put(self.backend.truncate)
+
+    def flush(self) -> None:
+        """
+        Serializes every dirty shape and hands them to the worker as one batch.
+
+        Must be called from the GUI thread.
+        """
+        self.timer.stop()
+        if not self._dirty and not self._removed:
+            return
+
+        saved = [shape.serialize() for shape in self._dirty.values()]
+        removed = list(self._removed)
+        self._dirty.clear()
+        self._removed.clear()
+
+        document = self.document()
+        for uuid in removed:
+            document.pop(uuid, None)
+        for shape_data in saved:
+            document[shape_data["uuid"]] = shape_data
+
+        # Records are replaced rather than mutated, so a shallow copy is
+        # enough to keep the worker isolated from later edits.
+        snapshot = dict(document) if self.backend.rewrites_document else None
+
+        def write() -> None:
+            self.backend.commit(saved, removed, snapshot)
+
+        self._queue.put(write)
+
+    def close(self) -> None:
+        """
+        Flushes any pending changes and waits for the worker to write them.
+        """
+        self.flush()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _schedule(self) -> None:
+        """
+        Starts the flush timer, unless a flush is already scheduled.
+        """
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def _run(self) -> None:
+        """
+        Worker loop. Runs queued writes in order until a None sentinel is received.
+        """
+        while True:
+            write = self._queue.get()
+            if write is None:
+                return
+
+            try:
+                write()
+            except Exception:
+                traceback.print_exc()
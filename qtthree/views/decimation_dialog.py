@@ -0,0 +1,58 @@
+from typing import Dict
+
+from PySide2.QtWidgets import (QDialog, QDialogButtonBox, QDoubleSpinBox,
+                               QFormLayout, QLabel, QRadioButton, QSpinBox,
+                               QWidget)
+
+
+class DecimationDialog(QDialog):
+    """
+    Offers to simplify a heavy mesh while it is imported.
+
+    The user picks either a target triangle count or an error bound.
+    Accepting the dialog means the mesh should be simplified,
+    rejecting it means it should be kept at full detail.
+    """
+    target_button: QRadioButton
+    target_faces: QSpinBox
+    error_button: QRadioButton
+    max_error: QDoubleSpinBox
+
+    def __init__(self, face_count: int, extent: float, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Simplify Mesh")
+
+        layout = QFormLayout(self)
+        layout.addRow(QLabel(f"This mesh has {face_count:,} triangles.\nSimplify it on import?"))
+
+        self.target_button = QRadioButton("Target triangles", checked=True)
+        self.target_faces = QSpinBox(minimum=1, maximum=max(face_count - 1, 1))
+        self.target_faces.setValue(max(face_count // 10, 1))
+        layout.addRow(self.target_button, self.target_faces)
+
+        # The error bound is a distance, in the mesh's own units
+        self.error_button = QRadioButton("Maximum error")
+        self.max_error = QDoubleSpinBox(decimals=4, minimum=0.0001, maximum=max(extent, 0.0001))
+        self.max_error.setValue(max(extent * 0.001, 0.0001))
+        layout.addRow(self.error_button, self.max_error)
+
+        buttons = QDialogButtonBox()
+        buttons.addButton("Simplify", QDialogButtonBox.AcceptRole)
+        buttons.addButton("Keep Full Detail", QDialogButtonBox.RejectRole)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def decimation(self) -> Dict[str, float]:
+        """
+        Get the decimation settings picked by the user.
+
+        Returns
+        -------
+        Dict[str, float]
+            The decimation settings, see CustomShape.decimation.
+        """
+        if self.target_button.isChecked():
+            return {"target_faces": self.target_faces.value()}
+
+        return {"max_error": self.max_error.value()}
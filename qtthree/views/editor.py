@@ -2,34 +2,32 @@ from typing import Any
 
 import pyqtgraph.opengl as gl
 from PySide2 import QtCore
-from PySide2.QtWidgets import (QDockWidget, QListWidget, QListWidgetItem,
-                               QVBoxLayout, QWidget)
+from PySide2.QtWidgets import (QAbstractItemView, QDockWidget, QLineEdit,
+                               QListView, QVBoxLayout, QWidget)
 
+from qtthree.rendering import FrameScheduler
 from qtthree.shapes.abstract_shape import AbstractShape
 from qtthree.utils.serializer import Serializer
+from qtthree.views.object_list_model import ObjectListModel
 from qtthree.views.properties_form import PropertiesForm
 
 
-class ObjectListItem(QListWidgetItem):
-    def __init__(self, shape: AbstractShape, parent: QWidget = None) -> None:
-        super().__init__(shape.name, parent)
-        self.shape = shape
-
-    def text(self) -> str:
-        return self.shape.name
-
-
 class Editor(QDockWidget):
     serializer: Serializer
-    list_view: QListWidget
+    # Frame scheduler of the view, which the properties form's edits are applied with
+    scheduler: FrameScheduler
+    list_model: ObjectListModel
+    list_view: QListView
+    filter_box: QLineEdit
     properties_form: PropertiesForm
 
     deleteShape = QtCore.Signal(str)
     cloneShape = QtCore.Signal(AbstractShape)
 
-    def __init__(self, parent, serializer: Serializer) -> None:
+    def __init__(self, parent, serializer: Serializer, scheduler: FrameScheduler) -> None:
         super().__init__("Scene Editor", parent)
         self.serializer = serializer
+        self.scheduler = scheduler
 
         self.setWindowTitle("Scene Editor")
         self.setAllowedAreas(QtCore.Qt.RightDockWidgetArea)
@@ -56,16 +54,27 @@ class Editor(QDockWidget):
         multi_widget = QWidget()
         layout = QVBoxLayout(multi_widget)
 
-        self.list_view = QListWidget()
+        self.filter_box = QLineEdit()
+        self.filter_box.setPlaceholderText("Filter objects by name")
+        self.filter_box.setClearButtonEnabled(True)
+        self.filter_box.textChanged.connect(self.filter_list)
+
+        # Rows all have the same height, so the view only lays out and draws the visible ones
+        self.list_model = ObjectListModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.list_model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
         self.list_view.setMinimumSize(0, int(self.height() * 0.25))
-        self.list_view.itemSelectionChanged.connect(self.update_properties_form)
+        self.list_view.selectionModel().selectionChanged.connect(self.update_properties_form)
 
-        self.properties_form = PropertiesForm(self, self.serializer)
+        self.properties_form = PropertiesForm(self, self.serializer, self.scheduler)
         self.properties_form.setMinimumSize(0, int(self.height() * 0.75))
         self.properties_form.shapeNameChanged.connect(self.update_shape_name)
         self.properties_form.deleteShape.connect(self.delete_shape)
         self.properties_form.cloneShape.connect(self.cloneShape.emit)
 
+        layout.addWidget(self.filter_box)
         layout.addWidget(self.list_view)
         layout.addWidget(self.properties_form)
 
@@ -80,17 +89,51 @@ class Editor(QDockWidget):
         mesh : gl.GLMeshItem
             The mesh to select.
         """
-        for i in range(self.list_view.count()):
-            item = self.list_view.item(i)
-            if item.shape.mesh_item == mesh:
-                self.list_view.setCurrentItem(item)
-                break
+        shape = self.list_model.shape_for_mesh(mesh)
+        if shape is None:
+            return
+
+        # A shape hidden by the filter is shown again by clearing the filter
+        if self.list_model.row_of(shape.uuid) is None:
+            self.filter_box.clear()
+
+        index = self.list_model.index(self.list_model.row_of(shape.uuid))
+        self.list_view.setCurrentIndex(index)
+        self.list_view.scrollTo(index)
+
+    def filter_list(self, text: str) -> None:
+        """
+        Lists only the shapes whose name contains the given text.
+
+        The shape being edited stays selected if it still matches.
+
+        Parameters
+        ----------
+        text : str
+            The text to look for, ignoring case.
+        """
+        target = self.properties_form.target
+
+        # Narrowing the filter removes rows, which must not clear the form of a shape that is only hidden.
+        # The form already shows the shape, so it doesn't need to be rebuilt if it is still listed either.
+        selection = self.list_view.selectionModel()
+        selection.blockSignals(True)
+        try:
+            self.list_model.set_filter(text)
+            row = self.list_model.row_of(target.uuid) if target is not None else None
+            if row is not None:
+                self.list_view.setCurrentIndex(self.list_model.index(row))
+        finally:
+            selection.blockSignals(False)
+
+        self.list_view.viewport().update()
 
     def reset(self) -> None:
         """
         Clears the object list and properties form.
         """
-        self.list_view.clear()
+        self.list_model.clear()
+        self.properties_form.pipeline.clear()
         self.properties_form.clear_target()
 
     def delete_shape(self, shape: str) -> None:
@@ -113,13 +156,12 @@ class Editor(QDockWidget):
 
         If no shape is selected, the properties form is cleared.
         """
-        selected = self.list_view.selectedItems()
+        selected = self.list_view.selectionModel().selectedIndexes()
         if not selected:
             self.properties_form.clear_target()
             return
 
-        selected_item = selected[0]
-        self.properties_form.set_target(selected_item.shape)
+        self.properties_form.set_target(self.list_model.shape(selected[0].row()))
 
     def update_shape_name(self, shape: AbstractShape, new_name: str) -> None:
         """
@@ -132,11 +174,7 @@ class Editor(QDockWidget):
         new_name : str
             The new name to give the shape.
         """
-        for i in range(self.list_view.count()):
-            item = self.list_view.item(i)
-            if item.shape == shape:
-                item.setText(new_name)
-                break
+        self.list_model.rename_shape(shape, new_name)
 
     def add_shape_to_list(self, shape: AbstractShape) -> None:
         """
@@ -147,7 +185,7 @@ class Editor(QDockWidget):
         shape : AbstractShape
             The shape to add to the list.
         """
-        self.list_view.addItem(ObjectListItem(shape, self.list_view))
+        self.list_model.add_shape(shape)
 
     def remove_shape_from_list(self, shape: str) -> None:
         """
@@ -158,8 +196,9 @@ class Editor(QDockWidget):
         shape : str
             The UUID of the shape to remove.
         """
-        for i in range(self.list_view.count()):
-            item = self.list_view.item(i)
-            if item.shape.uuid == shape:
-                self.list_view.takeItem(i)
-                break
+        # Cleared before the row goes, so the form lets go of the shape while it is still in the model
+        row = self.list_model.row_of(shape)
+        if row is not None and self.list_view.selectionModel().isRowSelected(row, QtCore.QModelIndex()):
+            self.list_view.selectionModel().clearSelection()
+
+        self.list_model.remove_shape(shape)
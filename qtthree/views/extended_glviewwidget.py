@@ -1,28 +1,128 @@
-from typing import Dict, Union
+import math
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Set, Tuple, Union
 
+import numpy as np
 import pyqtgraph.opengl as gl
+from OpenGL import GL
 from pyqtgraph.opengl.GLGraphicsItem import GLGraphicsItem
 from PySide2 import QtCore
 from PySide2.QtGui import QMouseEvent
 
+from qtthree.geometry import RayHit, SceneBVH, geometry_registry, select_lod_level
+from qtthree.rendering import FrameScheduler, IdBuffer, InstancedRenderer, ShapeMeshItem, mesh_buffers
 from qtthree.shapes import AbstractShape
 
 
+def release_built_geometry(future: Future) -> None:
+    """
+    Release the geometry built by a level of detail build nobody is waiting for anymore.
+
+    Parameters
+    ----------
+    future : Future
+        The build.
+    """
+    if not future.cancelled() and future.exception() is None:
+        geometry_registry.release(future.result())
+
+
 class ExtendedGLViewWidget(gl.GLViewWidget):
     wireframe_status: bool = False
     grid_status: bool = True
     shapes: Dict[str, AbstractShape] = {}
 
+    lod_enabled: bool = True
+    # Margin around each level's threshold, relative to it, before a shape switches levels
+    lod_hysteresis: float = 0.15
+    # Levels of detail being built, by shape UUID and level
+    lod_builds: Dict[str, Dict[int, Future]]
+    lod_executor: ThreadPoolExecutor
+
+    # Position of each item in items, by id, so items can be removed in constant time
+    item_index: Dict[int, int]
+
+    # Draws every shape sharing a geometry in a single draw call
+    instanced_renderer: InstancedRenderer
+
+    culling_enabled: bool = True
+    # Mesh items of the shapes outside of the camera frustum, as of the last frame
+    culled_items: Set[int]
+    visible_count: int = 0
+    culled_count: int = 0
+
+    # Bounding volume hierarchy over the shapes' bounds, by UUID, used to pick shapes with a ray
+    scene_bvh: SceneBVH
+
+    # Offscreen buffer of shape indices, used to find the shape under the cursor with a single pixel read
+    id_buffer: IdBuffer
+    id_picking_enabled: bool = True
+    hover_enabled: bool = True
+    hovered_shape: Optional[AbstractShape] = None
+    hover_color = (1.0, 0.85, 0.2, 1.0)
+
+    # Coalesces every update() of the view and its items into at most one repaint per frame
+    frame_scheduler: Optional[FrameScheduler] = None
+
     selectMesh = QtCore.Signal(gl.GLMeshItem)
+    # Emitted with the shape under the cursor, or None once there is none
+    hoverShape = QtCore.Signal(object)
+    lodReady = QtCore.Signal()
+    # Emitted after culling every frame, with the number of visible and culled shapes
+    frameCulled = QtCore.Signal(int, int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.frame_scheduler = FrameScheduler(self.presentFrame, parent=self)
+
+        # Levels are built lazily, off the GUI thread, and the view repaints once one is ready
+        self.lod_builds = {}
+        self.lod_executor = ThreadPoolExecutor(max_workers=1)
+        self.lodReady.connect(self.update)
+        self.culled_items = set()
+        self.item_index = {}
+        self.scene_bvh = SceneBVH(lambda shapeId: self.shapes[shapeId].bounding_box())
+        self.id_buffer = IdBuffer()
+        self.setMouseTracking(self.hover_enabled)
 
         self.setBackgroundColor('k')
 
         self.setCameraPosition(distance=30)
         self.addGrid()
 
+        self.instanced_renderer = InstancedRenderer()
+        self.addItem(self.instanced_renderer)
+
+    def update(self, *args) -> None:
+        """
+        Override update to request a repaint from the frame scheduler,
+        so every invalidation of a frame is folded into a single repaint.
+
+        Updates of a region are passed through, as they are not frame requests.
+        """
+        if args or self.frame_scheduler is None:
+            super().update(*args)
+        else:
+            self.frame_scheduler.request()
+
+    def presentFrame(self) -> None:
+        """
+        Schedule the repaint of the frame requested from the frame scheduler.
+        """
+        super().update()
+
+    def setMaxFps(self, max_fps: Optional[float]) -> None:
+        """
+        Set the highest frame rate of the view.
+
+        Parameters
+        ----------
+        max_fps : Optional[float]
+            The frame rate, or None for the display's refresh rate.
+        """
+        self.frame_scheduler.set_max_fps(max_fps)
+
     def mousePressEvent(self, ev: QMouseEvent) -> None:
         """
         Override mousePressEvent to emit a signal when a mesh is clicked.
@@ -33,14 +133,435 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
             The mouse event.
         """
         pos = ev.pos()
-        items = self.itemsAt(region=(pos.x(), pos.y(), 5, 5))
-        for item in items:
-            if isinstance(item, gl.GLMeshItem):
-                self.selectMesh.emit(item)
-                break
+        shape = self.shapeAt(pos.x(), pos.y())
+        if shape is not None:
+            self.selectMesh.emit(shape.mesh_item)
 
         return super().mousePressEvent(ev)
 
+    def mouseMoveEvent(self, ev: QMouseEvent) -> None:
+        """
+        Override mouseMoveEvent to highlight the shape under the cursor.
+
+        Moves without a button pressed are only delivered for hovering,
+        so they are not passed on to the camera controls.
+
+        Parameters
+        ----------
+        ev : QMouseEvent
+            The mouse event.
+        """
+        if ev.buttons() != QtCore.Qt.NoButton:
+            return super().mouseMoveEvent(ev)
+
+        if self.hover_enabled:
+            pos = ev.pos()
+            self.setHoveredShape(self.shapeAt(pos.x(), pos.y()))
+
+    def leaveEvent(self, ev: QtCore.QEvent) -> None:
+        """
+        Override leaveEvent to drop the highlight once the cursor leaves the view.
+
+        Parameters
+        ----------
+        ev : QtCore.QEvent
+            The event.
+        """
+        self.setHoveredShape(None)
+        return super().leaveEvent(ev)
+
+    def setHoveredShape(self, shape: Optional[AbstractShape]) -> None:
+        """
+        Highlight a shape as the one under the cursor.
+
+        Parameters
+        ----------
+        shape : Optional[AbstractShape]
+            The shape, or None to remove the highlight.
+        """
+        if shape is self.hovered_shape:
+            return
+
+        self.hovered_shape = shape
+        self.hoverShape.emit(shape)
+        self.update()
+
+    def idBufferKey(self) -> Hashable:
+        """
+        Get what the ID buffer depends on: the camera, the size of the view and the scene.
+
+        Returns
+        -------
+        Hashable
+            The key. The ID buffer is rendered again once it changes.
+        """
+        return (
+            tuple(self.viewMatrix().copyDataTo()),
+            tuple(self.projectionMatrix().copyDataTo()),
+            self.width(),
+            self.height(),
+            self.scene_bvh.version
+        )
+
+    def shapeAt(self, x: float, y: float) -> Optional[AbstractShape]:
+        """
+        Find the shape drawn under a point of the widget.
+
+        Reads a single pixel of the ID buffer, which is only rendered again once the
+        camera or the scene changed. Falls back to casting a ray (see pickShape)
+        if the context can't render the ID buffer.
+
+        Parameters
+        ----------
+        x : float
+            The x coordinate of the point, in widget pixels.
+        y : float
+            The y coordinate of the point, in widget pixels.
+
+        Returns
+        -------
+        Optional[AbstractShape]
+            The shape, or None if there is none.
+        """
+        if not self.id_picking_enabled or not self.isValid():
+            return self.pickShape(x, y)
+
+        ratio = self.devicePixelRatioF()
+        self.makeCurrent()
+        try:
+            key = self.idBufferKey()
+            if not self.id_buffer.is_current(key):
+                # Culled against the current camera, which may have moved since the last frame was painted
+                shapes = list(self.shapes.values())
+                if self.culling_enabled and shapes:
+                    shapes = [shape for shape, hidden in zip(shapes, self.outsideFrustum(shapes)) if not hidden]
+                width, height = int(self.width() * ratio), int(self.height() * ratio)
+                self.id_buffer.render(key, width, height, shapes, self.loadCameraMatrices)
+
+            return self.id_buffer.shape_at(int(x * ratio), int(y * ratio))
+        except Exception:
+            traceback.print_exc()
+            self.id_picking_enabled = False
+            return self.pickShape(x, y)
+        finally:
+            self.doneCurrent()
+
+    def loadCameraMatrices(self) -> None:
+        """
+        Load the projection and view matrices of the camera into the GL matrix stacks.
+        """
+        self.setProjection()
+        self.setModelview()
+
+    def rayAt(self, x: float, y: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the ray from the camera through a point of the widget.
+
+        Parameters
+        ----------
+        x : float
+            The x coordinate of the point, in widget pixels.
+        y : float
+            The y coordinate of the point, in widget pixels.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The origin of the ray on the near plane and its normalized direction, in world coordinates.
+        """
+        mvp = np.array((self.projectionMatrix() * self.viewMatrix()).copyDataTo(), dtype=float).reshape(4, 4)
+        inverse = np.linalg.inv(mvp)
+
+        ndc_x = 2.0 * x / max(self.width(), 1) - 1.0
+        ndc_y = 1.0 - 2.0 * y / max(self.height(), 1)
+
+        near = inverse @ np.array([ndc_x, ndc_y, -1.0, 1.0])
+        far = inverse @ np.array([ndc_x, ndc_y, 1.0, 1.0])
+        near, far = near[:3] / near[3], far[:3] / far[3]
+
+        direction = far - near
+        return near, direction / np.linalg.norm(direction)
+
+    def pickAt(self, x: float, y: float) -> Optional[Tuple[AbstractShape, RayHit]]:
+        """
+        Find the nearest shape under a point of the widget, and where it is hit.
+
+        The ray through the point is cast through the scene BVH, so only the shapes
+        whose bounds it crosses are tested against their triangles, nearest first.
+
+        Parameters
+        ----------
+        x : float
+            The x coordinate of the point, in widget pixels.
+        y : float
+            The y coordinate of the point, in widget pixels.
+
+        Returns
+        -------
+        Optional[Tuple[AbstractShape, RayHit]]
+            The nearest shape hit and the hit, in world coordinates, or None if there is none.
+        """
+        origin, direction = self.rayAt(x, y)
+        hits: Dict[str, RayHit] = {}
+
+        def hit_test(shapeId: str) -> Optional[float]:
+            hit = self.shapes[shapeId].intersect_ray(origin, direction)
+            if hit is None:
+                return None
+
+            hits[shapeId] = hit
+            return hit.distance
+
+        nearest = self.scene_bvh.cast(origin, direction, hit_test)
+        if nearest is None:
+            return None
+
+        return self.shapes[nearest[0]], hits[nearest[0]]
+
+    def pickShape(self, x: float, y: float) -> Optional[AbstractShape]:
+        """
+        Find the nearest shape under a point of the widget.
+
+        Parameters
+        ----------
+        x : float
+            The x coordinate of the point, in widget pixels.
+        y : float
+            The y coordinate of the point, in widget pixels.
+
+        Returns
+        -------
+        Optional[AbstractShape]
+            The nearest shape hit, or None if there is none.
+        """
+        picked = self.pickAt(x, y)
+        return picked[0] if picked is not None else None
+
+    def paintGL(self, *args, **kwargs) -> None:
+        """
+        Override paintGL to cull the shapes outside of the camera frustum,
+        and pick the level of detail of the others, before drawing.
+        Every pass is counted as a frame by the frame scheduler.
+
+        Mesh buffers released since the last frame are deleted first, while the context is current,
+        whether or not any shape mesh item is drawn.
+        """
+        mesh_buffers.collect()
+
+        self.frame_scheduler.frame_started()
+        visible = self.cullShapes()
+        if self.lod_enabled:
+            self.updateLevelsOfDetail(visible)
+
+        super().paintGL(*args, **kwargs)
+        self.paintHover()
+
+    def paintHover(self) -> None:
+        """
+        Outline the hovered shape, on top of the scene drawn with the camera matrices still loaded.
+        """
+        shape = self.hovered_shape
+        if shape is None or id(shape.mesh_item) in self.culled_items:
+            return
+
+        model = np.array(shape.mesh_item.transform().copyDataTo(), dtype=np.float32).reshape(4, 4)
+        GL.glPushAttrib(GL.GL_ENABLE_BIT | GL.GL_LINE_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glPushMatrix()
+        try:
+            GL.glDisable(GL.GL_LIGHTING)
+            GL.glEnable(GL.GL_DEPTH_TEST)
+            # The outline lies exactly on the faces drawn already
+            GL.glDepthFunc(GL.GL_LEQUAL)
+            GL.glLineWidth(2.0)
+
+            GL.glMultMatrixf(model.transpose())
+            shape.mesh_item.paintEdges(self.hover_color)
+        finally:
+            GL.glPopMatrix()
+            GL.glPopAttrib()
+
+    def frustumPlanes(self) -> np.ndarray:
+        """
+        Get the planes of the camera frustum, in world coordinates.
+
+        Returns
+        -------
+        np.ndarray
+            The (6, 4) planes, as a unit normal pointing inside of the frustum and an offset.
+        """
+        mvp = np.array((self.projectionMatrix() * self.viewMatrix()).copyDataTo(), dtype=float).reshape(4, 4)
+        planes = np.array([mvp[3] + mvp[0], mvp[3] - mvp[0], mvp[3] + mvp[1], mvp[3] - mvp[1], mvp[3] + mvp[2], mvp[3] - mvp[2]])
+        return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+    def outsideFrustum(self, shapes: List[AbstractShape]) -> np.ndarray:
+        """
+        Test shapes against the current camera frustum.
+
+        Shapes are tested with their cached bounding sphere first, and the
+        ones it can't rule out with their bounding box.
+
+        Parameters
+        ----------
+        shapes : List[AbstractShape]
+            The shapes, at least one.
+
+        Returns
+        -------
+        np.ndarray
+            Whether each shape is entirely outside of the frustum.
+        """
+        planes = self.frustumPlanes()
+        normals, offsets = planes[:, :3], planes[:, 3]
+
+        bounds = [shape.world_bounds() for shape in shapes]
+        centers = np.array([bound[0] for bound in bounds])
+        radii = np.array([bound[1] for bound in bounds])
+        outside = np.any(centers @ normals.T + offsets < -radii[:, None], axis=1)
+
+        # A box is outside once its corner furthest along a plane's normal is behind the plane
+        candidates = np.flatnonzero(~outside)
+        lowers = np.array([bounds[i][2] for i in candidates]).reshape(-1, 1, 3)
+        uppers = np.array([bounds[i][3] for i in candidates]).reshape(-1, 1, 3)
+        corners = np.where(normals[None] > 0.0, uppers, lowers)
+        outside[candidates] = np.any(np.sum(corners * normals[None], axis=2) + offsets < 0.0, axis=1)
+
+        return outside
+
+    def cullShapes(self) -> List[AbstractShape]:
+        """
+        Find the shapes outside of the camera frustum, which are skipped while drawing.
+
+        Returns
+        -------
+        List[AbstractShape]
+            The visible shapes.
+        """
+        shapes = list(self.shapes.values())
+        if not self.culling_enabled or not shapes:
+            self.culled_items = set()
+            self.instanced_renderer.culled = set()
+            self.visible_count, self.culled_count = len(shapes), 0
+            self.frameCulled.emit(self.visible_count, self.culled_count)
+            return shapes
+
+        outside = self.outsideFrustum(shapes)
+        culled = [shape for shape, hidden in zip(shapes, outside) if hidden]
+        self.culled_items = {id(shape.mesh_item) for shape in culled}
+        self.instanced_renderer.culled = {shape.uuid for shape in culled}
+
+        self.culled_count = len(culled)
+        self.visible_count = len(shapes) - self.culled_count
+        self.frameCulled.emit(self.visible_count, self.culled_count)
+
+        return [shape for shape, hidden in zip(shapes, outside) if not hidden]
+
+    def updateLevelsOfDetail(self, shapes: List[AbstractShape]) -> None:
+        """
+        Pick the level of detail of shapes from their projected size on screen.
+
+        Parameters
+        ----------
+        shapes : List[AbstractShape]
+            The shapes to update, usually the visible ones.
+        """
+        eye = self.cameraPosition()
+        eye = np.array([eye.x(), eye.y(), eye.z()])
+
+        # Pixels covered by one unit, one unit away from the camera
+        focal_length = self.height() / (2.0 * math.tan(math.radians(self.opts["fov"]) / 2.0))
+
+        for shape in shapes:
+            if not shape.LOD_THRESHOLDS:
+                continue
+
+            center, radius = shape.bounding_sphere()
+            distance = max(float(np.linalg.norm(center - eye)), 1e-6)
+            level = select_lod_level(shape.LOD_THRESHOLDS, radius * focal_length / distance, shape.lod_level, self.lod_hysteresis)
+
+            if level != shape.lod_level:
+                self.showLevelOfDetail(shape, level)
+
+    def showLevelOfDetail(self, shape: AbstractShape, level: int) -> None:
+        """
+        Draw a shape with a level of detail, building it first if needed.
+
+        The shape keeps its current level until the build is done.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        level : int
+            The level of detail.
+        """
+        if shape.lod_geometry(level) is None:
+            builds = self.lod_builds.setdefault(shape.uuid, {})
+            future = builds.get(level)
+            if future is None:
+                future = self.lod_executor.submit(shape.acquire_lod_geometry, level)
+                future.add_done_callback(self.onLodBuilt)
+                builds[level] = future
+                return
+
+            # A failed build is kept, so the shape stays at its current level rather than retrying every frame
+            if not future.done() or future.exception() is not None:
+                return
+
+            del builds[level]
+            shape.add_lod_geometry(level, future.result())
+
+        shape.set_lod_level(level)
+
+    def onLodBuilt(self, future: Future) -> None:
+        """
+        Called on the worker thread once a level of detail has been built.
+
+        Parameters
+        ----------
+        future : Future
+            The build.
+        """
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is not None:
+            traceback.print_exception(type(error), error, error.__traceback__)
+            return
+
+        self.lodReady.emit()
+
+    def discardLevelsOfDetail(self, shape: AbstractShape) -> None:
+        """
+        Drop the level of detail builds of a shape that is removed from the scene.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        """
+        for future in self.lod_builds.pop(shape.uuid, {}).values():
+            future.cancel()
+            future.add_done_callback(release_built_geometry)
+
+    def drawItemTree(self, item=None, useItemNames=False) -> None:
+        """
+        Override drawItemTree to skip culled shapes, and leave instanced shapes to the instanced renderer.
+        """
+        if item is not None:
+            return super().drawItemTree(item, useItemNames=useItemNames)
+
+        renderer = self.instanced_renderer
+        items = self.items
+        culled = self.culled_items
+        self.items = [i for i in items if id(i) not in culled and not renderer.draws(i)]
+
+        try:
+            super().drawItemTree(useItemNames=useItemNames)
+        finally:
+            self.items = items
+
     def addGrid(self) -> None:
         """
         Add a grid to the scene.
@@ -55,9 +576,26 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
             if not isinstance(item, gl.GLGridItem):
                 continue
 
-            self.items.remove(item)
+            self.detachItem(item)
             break
 
+    def detachItem(self, item: GLGraphicsItem) -> None:
+        """
+        Remove an item from the draw list in constant time, by moving the last item into its place.
+
+        Items are drawn with depth testing, so their order doesn't matter.
+
+        Parameters
+        ----------
+        item : GLGraphicsItem
+            The item to remove.
+        """
+        index = self.item_index.pop(id(item))
+        last = self.items.pop()
+        if last is not item:
+            self.items[index] = last
+            self.item_index[id(last)] = index
+
     def addItem(self, item: Union[AbstractShape, GLGraphicsItem]) -> None:
         """
         Add an item to the scene, whether it is a shape or a GLGraphicsItem.
@@ -75,11 +613,15 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
             mesh = item.mesh_item
             mesh.opts["drawEdges"] = self.wireframe_status
             self.shapes[item.uuid] = item
+            self.instanced_renderer.add_shape(item)
+            self.scene_bvh.insert(item.uuid)
+            item.scene_index = self.scene_bvh
         elif isinstance(item, GLGraphicsItem):
             mesh = item
         else:
             raise TypeError("Item must be of type AbstractShape or GLGraphicsItem.")
 
+        self.item_index[id(mesh)] = len(self.items)
         self.items.append(mesh)
 
         if self.isValid():
@@ -98,7 +640,14 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
             The UUID of the shape to remove.
         """
         item = self.shapes.pop(shapeId)
-        self.items.remove(item.mesh_item)
+        if item is self.hovered_shape:
+            self.setHoveredShape(None)
+        self.detachItem(item.mesh_item)
+        self.instanced_renderer.remove_shape(item)
+        self.scene_bvh.remove(shapeId)
+        item.scene_index = None
+        self.discardLevelsOfDetail(item)
+        item.dispose()
         self.update()
 
     def toggleGrid(self, status: bool) -> None:
@@ -131,6 +680,12 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
             if not isinstance(item, gl.GLMeshItem):
                 continue
 
+            item.opts["drawEdges"] = status
+
+            # Shape items upload their edges to the GPU the first time they draw them
+            if isinstance(item, ShapeMeshItem):
+                continue
+
             md = item.opts["meshdata"]
             if not md.hasFaceIndexedData():
                 item.edges = md.edges()
@@ -139,8 +694,7 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
                 item.edges = md.edges()
                 item.edgeVerts = md.vertexes(indexed='faces')
 
-            item.opts["drawEdges"] = status
-
+        self.instanced_renderer.draw_edges = status
         self.wireframe_status = status
         self.update()
 
@@ -150,7 +704,18 @@ class ExtendedGLViewWidget(gl.GLViewWidget):
 
         This does not remove the grid.
         """
+        for shape in self.shapes.values():
+            shape.scene_index = None
+            self.discardLevelsOfDetail(shape)
+            shape.dispose()
+
+        self.setHoveredShape(None)
+        self.scene_bvh.clear()
+        self.id_buffer.clear()
+        self.instanced_renderer.clear()
         self.items.clear()
+        self.items.append(self.instanced_renderer)
+        self.item_index = {id(self.instanced_renderer): 0}
         self.shapes.clear()
         self.update()
 
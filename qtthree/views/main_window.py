@@ -1,24 +1,44 @@
-from typing import Optional
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
 
 import pyqtgraph.opengl as gl
 from PySide2 import QtCore
-from PySide2.QtWidgets import (QAction, QDialog, QFileDialog, QMainWindow,
-                               QToolBar)
+from PySide2.QtGui import QCloseEvent
+from PySide2.QtWidgets import (QAction, QDialog, QFileDialog, QLabel,
+                               QMainWindow, QProgressBar, QToolBar)
 
+from qtthree.geometry import stl_summary
 from qtthree.shapes import Box, CustomShape, Sphere
 from qtthree.shapes.abstract_shape import AbstractShape
 from qtthree.utils.serializer import Serializer
+from qtthree.views.decimation_dialog import DecimationDialog
 from qtthree.views.editor import Editor
 from qtthree.views.extended_glviewwidget import ExtendedGLViewWidget
+from qtthree.views.scene_loader import SceneLoader
 
 
 class MainWindow(QMainWindow):
     graphics: ExtendedGLViewWidget
     toolbar: QToolBar
     editor: Optional[Editor] = None
+    loader: SceneLoader
+    load_progress: QProgressBar
+    render_stats: QLabel
 
     serializer: Serializer
 
+    # Reads and simplifies imported STL files, apart from the view's level of detail builds
+    import_executor: ThreadPoolExecutor
+
+    # Imported meshes with more triangles than this are offered a simplification
+    DECIMATION_OFFER_FACES = 100_000
+
+    # Emitted from the import thread once the size of an imported STL file is known
+    customFileRead = QtCore.Signal(str, object)
+    # Emitted from the import thread once the geometry of an imported STL file is ready
+    customGeometryReady = QtCore.Signal(str, object, object)
+
     def __init__(self, serializer: Serializer) -> None:
         super().__init__()
         self.serializer = serializer
@@ -31,16 +51,97 @@ class MainWindow(QMainWindow):
 
         self.setWindowTitle('qtthree')
 
-        loaded = 0
-        for shape in self.serializer.restore_all_shapes():
-            loaded += 1
-            self.graphics.addItem(shape)
-            if self.editor is not None:
-                self.editor.add_shape_to_list(shape)
+        self.setup_loader()
+
+        self.import_executor = ThreadPoolExecutor(max_workers=1)
+        self.customFileRead.connect(self.offer_decimation)
+        self.customGeometryReady.connect(self.add_custom_shape)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """
+        Override closeEvent to shut the import thread down, without waiting for an import in progress.
+
+        Parameters
+        ----------
+        event : QCloseEvent
+            The close event.
+        """
+        self.import_executor.shutdown(wait=False)
+        super().closeEvent(event)
+
+    def setup_loader(self) -> None:
+        """
+        Sets up the scene loader, which streams the stored shapes
+        into the scene after the window is shown.
+        """
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.hide()
+        self.statusBar().addPermanentWidget(self.load_progress)
+
+        self.loader = SceneLoader(self.serializer, parent=self)
+        self.loader.shapeRestored.connect(self.add_restored_shape)
+        self.loader.progress.connect(self.onLoadProgress)
+        self.loader.finished.connect(self.onLoadFinished)
+        self.loader.start()
+
+    def add_restored_shape(self, shape: AbstractShape) -> None:
+        """
+        Adds a shape restored by the scene loader to the scene.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The restored shape.
+        """
+        self.graphics.addItem(shape)
+        if self.editor is not None:
+            self.editor.add_shape_to_list(shape)
+
+    def onLoadProgress(self, loaded: int, total: int) -> None:
+        """
+        Called after each chunk of shapes is restored.
 
+        Parameters
+        ----------
+        loaded : int
+            The number of shapes restored so far.
+        total : int
+            The number of stored shapes.
+        """
+        self.load_progress.setMaximum(total)
+        self.load_progress.setValue(loaded)
+        self.load_progress.show()
+        self.statusBar().showMessage(f"Loading shapes ({loaded}/{total})")
+
+    def onLoadFinished(self, loaded: int) -> None:
+        """
+        Called once every stored shape is restored.
+
+        Parameters
+        ----------
+        loaded : int
+            The number of shapes restored.
+        """
+        self.load_progress.hide()
         if loaded:
             self.statusBar().showMessage(f"{loaded} shapes loaded")
 
+    def onFrameCulled(self, visible: int, culled: int) -> None:
+        """
+        Called after the view culled the shapes outside of the camera for a frame,
+        showing the culling and frame counters.
+
+        Parameters
+        ----------
+        visible : int
+            The number of shapes drawn.
+        culled : int
+            The number of shapes skipped.
+        """
+        frames = self.graphics.frame_scheduler
+        self.render_stats.setText(f"{visible} visible, {culled} culled, {frames.painted} frames, {frames.coalesced} updates coalesced")
+
     def clone_shape(self, shape: AbstractShape) -> None:
         """
         Clones the given shape and adds it to the scene.
@@ -81,7 +182,7 @@ class MainWindow(QMainWindow):
             self.editor.show()
             return
 
-        self.editor = Editor(self, self.serializer)
+        self.editor = Editor(self, self.serializer, self.graphics.frame_scheduler)
         self.editor.deleteShape.connect(self.delete_shape)
         self.editor.cloneShape.connect(self.clone_shape)
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.editor, QtCore.Qt.Orientation.Horizontal)
@@ -95,6 +196,10 @@ class MainWindow(QMainWindow):
         self.graphics.selectMesh.connect(self.onSelectMesh)
         self.setup_scene_editor()
 
+        self.render_stats = QLabel()
+        self.statusBar().addPermanentWidget(self.render_stats)
+        self.graphics.frameCulled.connect(self.onFrameCulled)
+
         self.setCentralWidget(self.graphics)
 
     def setup_toolbar(self) -> None:
@@ -162,6 +267,10 @@ class MainWindow(QMainWindow):
 
         Resets the scene and empties the stored data.
         """
+        if self.loader.is_running():
+            self.loader.cancel()
+            self.load_progress.hide()
+
         self.graphics.clearScene()
 
         if self.editor is not None:
@@ -201,8 +310,9 @@ class MainWindow(QMainWindow):
         """
         Called when the new Custom Shape button is clicked.
 
-        Queries the user for a file path, and then loads,
-        a new Custom Shape and adds it to the scene.
+        Queries the user for a file path, and reads the size of the mesh on the import thread.
+        The rest of the import carries on once it is read (see offer_decimation),
+        so importing a heavy mesh never freezes the window.
         """
         file_dialog = QFileDialog(self, "Custom STL file")
         file_dialog.setNameFilter("STL files (*.stl)")
@@ -214,7 +324,64 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Invalid file type")
             return
 
-        new_shape = CustomShape(file_path)
+        future = self.import_executor.submit(stl_summary, file_path)
+        future.add_done_callback(lambda done: self.customFileRead.emit(file_path, done))
+        self.statusBar().showMessage("Reading custom shape...")
+
+    def offer_decimation(self, file_path: str, future: Future) -> None:
+        """
+        Called once the size of an imported STL file is read.
+
+        Offers to simplify the mesh if it is heavy, and then loads the mesh on the import thread.
+        The new Custom Shape is added to the scene once it is loaded (see add_custom_shape).
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the STL file.
+        future : Future
+            The read of the number of triangles and the extent of the mesh.
+        """
+        error = future.exception()
+        if error is not None:
+            traceback.print_exception(type(error), error, error.__traceback__)
+            self.statusBar().showMessage("Failed to read custom shape")
+            return
+
+        face_count, extent = future.result()
+
+        decimation = None
+        if face_count > self.DECIMATION_OFFER_FACES:
+            dialog = DecimationDialog(face_count, extent, self)
+            if dialog.exec_() == QDialog.Accepted:
+                decimation = dialog.decimation()
+
+        future = self.import_executor.submit(CustomShape.acquire_geometry, file_path, decimation)
+        future.add_done_callback(lambda done: self.customGeometryReady.emit(file_path, decimation, done))
+        self.statusBar().showMessage("Simplifying custom shape..." if decimation else "Loading custom shape...")
+
+    def add_custom_shape(self, file_path: str, decimation: Optional[Dict[str, float]], future: Future) -> None:
+        """
+        Called once the geometry of an imported STL file is loaded,
+        adding a new Custom Shape drawn with it to the scene.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the STL file.
+        decimation : Optional[Dict[str, float]]
+            The decimation settings picked by the user, or None.
+        future : Future
+            The load of the shared geometry, which the new shape takes ownership of.
+        """
+        error = future.exception()
+        if error is not None:
+            traceback.print_exception(type(error), error, error.__traceback__)
+            self.statusBar().showMessage("Failed to load custom shape")
+            return
+
+        new_shape = CustomShape(file_path, decimation=decimation, geometry=future.result())
+
         self.graphics.addItem(new_shape)
         if self.editor is not None:
             self.editor.add_shape_to_list(new_shape)
@@ -0,0 +1,319 @@
+import operator
+from itertools import repeat
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pyqtgraph.opengl as gl
+from PySide2 import QtCore
+from PySide2.QtCore import QAbstractListModel, QModelIndex
+
+from qtthree.shapes.abstract_shape import AbstractShape
+from qtthree.utils.name_index import NameIndex
+from qtthree.utils.row_index import RowIndex
+
+
+class ObjectListModel(QAbstractListModel):
+    """
+    List model of the shapes in the scene, for the scene editor's object list.
+
+    Shapes are indexed by UUID and by mesh item, and listed in the order they were
+    added. Rows are kept in a RowIndex, so finding, renaming and removing a shape's
+    row take logarithmic time, without shifting the rows after it.
+
+    The list can be filtered by name. Names are kept in a NameIndex, updated as
+    shapes are added, renamed and removed, so filtering only visits the matching shapes.
+    Matches are kept as the sorted slots of their rows, so they are listed in the order
+    of the unfiltered list. Typing more of the filter only narrows the previous matches,
+    and removes the rows that no longer match instead of resetting the list.
+    """
+    shapes: Dict[str, AbstractShape]
+    rows: RowIndex
+    mesh_shapes: Dict[int, AbstractShape]
+    name_index: NameIndex
+
+    # Sorted slots, in rows, of the shapes listed while a filter is set
+    filter_text: str = ""
+    match_slots: Optional[np.ndarray] = None
+
+    # Narrowing the filter drops runs of rows one by one up to this many runs, and resets the list beyond
+    MAX_REMOVED_RUNS = 64
+
+    # Role returning the shape of a row
+    ShapeRole = QtCore.Qt.UserRole + 1
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self.shapes = {}
+        self.rows = RowIndex()
+        self.mesh_shapes = {}
+        self.name_index = NameIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+
+        return len(self.rows) if self.match_slots is None else len(self.match_slots)
+
+    def data(self, index: QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < self.rowCount():
+            return None
+
+        shape = self.shape(index.row())
+        if role == QtCore.Qt.DisplayRole:
+            return shape.name
+        if role == self.ShapeRole:
+            return shape
+
+        return None
+
+    def shape(self, row: int) -> AbstractShape:
+        """
+        Get the shape of a row.
+
+        Parameters
+        ----------
+        row : int
+            The row.
+
+        Returns
+        -------
+        AbstractShape
+            The shape.
+        """
+        if self.match_slots is None:
+            return self.shapes[self.rows.key_at(row)]
+
+        return self.shapes[self.rows.key_at_slot(int(self.match_slots[row]))]
+
+    def row_of(self, shape: str) -> Optional[int]:
+        """
+        Get the row of a shape.
+
+        Parameters
+        ----------
+        shape : str
+            The UUID of the shape.
+
+        Returns
+        -------
+        Optional[int]
+            The row, or None if the shape is not listed.
+        """
+        if self.match_slots is None:
+            return self.rows.row_of(shape)
+
+        slot = self.rows.slot_of(shape)
+        if slot is None:
+            return None
+
+        row = int(np.searchsorted(self.match_slots, slot))
+        return row if row < len(self.match_slots) and self.match_slots[row] == slot else None
+
+    def shape_for_mesh(self, mesh: gl.GLMeshItem) -> Optional[AbstractShape]:
+        """
+        Get the shape drawn by a mesh item.
+
+        Parameters
+        ----------
+        mesh : gl.GLMeshItem
+            The mesh item.
+
+        Returns
+        -------
+        Optional[AbstractShape]
+            The shape, or None if the mesh item isn't one of a shape in the model, listed or not.
+        """
+        return self.mesh_shapes.get(id(mesh))
+
+    def add_shape(self, shape: AbstractShape) -> None:
+        """
+        Append a shape to the list.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape to add.
+        """
+        if shape.uuid in self.shapes:
+            return
+
+        self.shapes[shape.uuid] = shape
+        self.mesh_shapes[id(shape.mesh_item)] = shape
+        self.name_index.add(shape.uuid, shape.name)
+
+        if self.match_slots is None:
+            row = len(self.rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.append(shape.uuid)
+            self.endInsertRows()
+            return
+
+        self.rows.append(shape.uuid)
+        if self.name_index.matches(shape.uuid, self.filter_text):
+            # The new slot is the last one, so the match goes last too
+            self._insert_match(shape.uuid)
+
+    def remove_shape(self, shape: str) -> Optional[AbstractShape]:
+        """
+        Remove a shape from the list. The rows after it move up by one.
+
+        Parameters
+        ----------
+        shape : str
+            The UUID of the shape to remove.
+
+        Returns
+        -------
+        Optional[AbstractShape]
+            The removed shape, or None if it was not in the model.
+        """
+        removed = self.shapes.get(shape)
+        if removed is None:
+            return None
+
+        if self.match_slots is None:
+            row = self.rows.row_of(shape)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.rows.remove(shape)
+            self.endRemoveRows()
+        else:
+            row = self.row_of(shape)
+            if row is not None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self.match_slots = np.delete(self.match_slots, row)
+                self.endRemoveRows()
+            self.rows.remove(shape)
+
+        if self.rows.is_sparse:
+            moved = np.array(self.rows.compact(), dtype=np.int64)
+            if self.match_slots is not None:
+                self.match_slots = moved[self.match_slots]
+
+        del self.shapes[shape]
+        self.mesh_shapes.pop(id(removed.mesh_item), None)
+        self.name_index.remove(shape)
+
+        return removed
+
+    def rename_shape(self, shape: AbstractShape, name: str) -> None:
+        """
+        Update the name of a shape in the index, and redraw its row.
+
+        While filtering, a shape renamed to match the filter is appended to the list,
+        but a listed shape renamed not to match it stays listed, so it doesn't
+        disappear from under the user while it is being edited.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape.
+        name : str
+            The new name of the shape, which may not be set on the shape yet.
+        """
+        if shape.uuid not in self.shapes:
+            return
+
+        self.name_index.add(shape.uuid, name)
+
+        row = self.row_of(shape.uuid)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+        elif self.name_index.matches(shape.uuid, self.filter_text):
+            self._insert_match(shape.uuid)
+
+    def set_filter(self, text: str) -> None:
+        """
+        List only the shapes whose name contains some text, ignoring case.
+
+        Matches are listed in the order of the unfiltered list. When the text contains
+        the previous one, e.g. as it is typed, only the previous matches can still match,
+        so only they are checked, and the rows that no longer match are removed.
+
+        Parameters
+        ----------
+        text : str
+            The text to look for, or an empty string to list every shape.
+        """
+        if text == self.filter_text:
+            return
+
+        previous_text, previous = self.filter_text, self.match_slots
+        self.filter_text = text
+
+        if text and previous is not None and previous_text.casefold() in text.casefold():
+            self._narrow_matches(text)
+            return
+
+        self.beginResetModel()
+        if not text:
+            self.match_slots = None
+        else:
+            keys = self.name_index.search(text)
+            slots = np.fromiter(map(self.rows.positions.__getitem__, keys), dtype=np.int64, count=len(keys))
+            slots.sort()
+            self.match_slots = slots
+        self.endResetModel()
+
+    def clear(self) -> None:
+        """
+        Remove every shape from the list. The filter is kept.
+        """
+        self.beginResetModel()
+        self.shapes = {}
+        self.rows.clear()
+        self.mesh_shapes = {}
+        self.name_index.clear()
+        if self.match_slots is not None:
+            self.match_slots = np.empty(0, dtype=np.int64)
+        self.endResetModel()
+
+    def _narrow_matches(self, text: str) -> None:
+        """
+        Drop the matches whose name doesn't contain some text.
+
+        Parameters
+        ----------
+        text : str
+            The text, which contains the previous filter.
+        """
+        # Mapped rather than looped over, which keeps the checks out of the interpreter loop
+        names = map(self.name_index.names.__getitem__, map(self.rows.slots.__getitem__, self.match_slots.tolist()))
+        keep = np.fromiter(map(operator.contains, names, repeat(text.casefold())), dtype=bool, count=len(self.match_slots))
+
+        dropped = np.flatnonzero(~keep)
+        if not len(dropped):
+            return
+
+        # Runs of consecutive dropped rows, each removed at once
+        breaks = np.flatnonzero(np.diff(dropped) != 1) + 1
+        firsts = dropped[np.concatenate(([0], breaks))]
+        lasts = dropped[np.concatenate((breaks - 1, [len(dropped) - 1]))]
+
+        if len(firsts) > self.MAX_REMOVED_RUNS:
+            self.beginResetModel()
+            self.match_slots = self.match_slots[keep]
+            self.endResetModel()
+            return
+
+        # From the last run up, so the rows of the runs left to remove don't move
+        for first, last in zip(firsts[::-1].tolist(), lasts[::-1].tolist()):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self.match_slots = np.concatenate((self.match_slots[:first], self.match_slots[last + 1:]))
+            self.endRemoveRows()
+
+    def _insert_match(self, shape: str) -> None:
+        """
+        List a shape that matches the filter, at the row of its slot.
+
+        Parameters
+        ----------
+        shape : str
+            The UUID of the shape.
+        """
+        slot = self.rows.slot_of(shape)
+        row = int(np.searchsorted(self.match_slots, slot))
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.match_slots = np.insert(self.match_slots, row, slot)
+        self.endInsertRows()
@@ -1,12 +1,14 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from PySide2 import QtCore
 from PySide2.QtGui import QColor
-from PySide2.QtWidgets import (QButtonGroup, QDial, QDoubleSpinBox,
-                               QFormLayout, QHBoxLayout, QLineEdit,
-                               QPushButton, QWidget)
+from PySide2.QtWidgets import (QDial, QDoubleSpinBox, QFormLayout,
+                               QHBoxLayout, QLineEdit, QPushButton,
+                               QStackedLayout, QWidget)
 
+from qtthree.rendering import FrameScheduler
 from qtthree.shapes import AbstractShape
+from qtthree.utils.edit_pipeline import EditPipeline
 from qtthree.utils.serializer import Serializer
 from qtthree.widgets.color_picker import ColorPicker
 from qtthree.widgets.rotation_dial import RotationDialGroup
@@ -14,25 +16,45 @@ from qtthree.widgets.translation_spinbox import SpinboxGroup
 
 
 class PropertiesForm(QWidget):
+    """
+    Form editing the properties of the selected shape.
+
+    A form is built once per type of shape, the first time a shape of that type is
+    selected, and kept in a stacked layout. Selecting another shape of the same type
+    only writes the shape's values into the existing widgets, with their signals
+    blocked, instead of building and connecting new widgets.
+
+    Edits go through an EditPipeline, so continuous changes are applied
+    once per rendered frame and saved once the interaction is over.
+    """
     serializer: Serializer
-    layout: QFormLayout
+    pipeline: EditPipeline
+    layout: QStackedLayout
     target: Optional[AbstractShape] = None
 
+    # Cached forms, and their components by property, by type of shape
+    forms: Dict[type, Tuple[QWidget, List[Tuple[str, QWidget]]]]
+    empty_form: QWidget
+
     shapeNameChanged = QtCore.Signal(AbstractShape, str)
     deleteShape = QtCore.Signal(str)
     cloneShape = QtCore.Signal(AbstractShape)
 
-    def __init__(self, parent, serializer: Serializer):
+    def __init__(self, parent, serializer: Serializer, scheduler: FrameScheduler):
         super().__init__(parent)
         self.serializer = serializer
+        self.pipeline = EditPipeline(serializer, scheduler, parent=self)
 
-        self.layout = QFormLayout(self)
+        self.forms = {}
+        self.layout = QStackedLayout(self)
+        self.empty_form = QWidget()
+        self.layout.addWidget(self.empty_form)
 
     def handle_property_update(self, property_: str, value: Any):
         """
         This function handles generic property updates.
 
-        It updates the shape in memory, and then saves the shape.
+        It schedules the update of the shape in memory, which is saved once the edit is over.
 
         Parameters
         ----------
@@ -44,17 +66,21 @@ class PropertiesForm(QWidget):
         if self.target is None:
             return
 
-        if property_ == "name":
-            self.shapeNameChanged.emit(self.target, value)
+        shape = self.target
 
-        self.target.update_property(property_, value)
-        self.serializer.save_shape(self.target)
+        def apply() -> None:
+            if property_ == "name":
+                self.shapeNameChanged.emit(shape, value)
+
+            shape.update_property(property_, value)
+
+        self.pipeline.submit(shape, property_, apply)
 
     def handle_color_update(self, color: QColor) -> None:
         """
         This function handles events from the color picker.
 
-        It updates the shape in memory, and then saves the shape.
+        It schedules the update of the shape in memory, which is saved once the edit is over.
 
         Parameters
         ----------
@@ -64,14 +90,14 @@ class PropertiesForm(QWidget):
         if self.target is None:
             return
 
-        self.target.update_color(color)
-        self.serializer.save_shape(self.target)
+        shape = self.target
+        self.pipeline.submit(shape, "color", lambda: shape.update_color(color))
 
     def handle_translation_update(self, property_: str, axis: int, value: float) -> None:
         """
         This function handles events from the translation spinboxes.
 
-        It updates the shape in memory, and then saves the shape.
+        It schedules the update of the shape in memory, which is saved once the edit is over.
 
         Parameters
         ----------
@@ -85,14 +111,14 @@ class PropertiesForm(QWidget):
         if self.target is None:
             return
 
-        self.target.update_translation(property_, axis, value)
-        self.serializer.save_shape(self.target)
+        shape = self.target
+        self.pipeline.submit(shape, (property_, axis), lambda: shape.update_translation(property_, axis, value))
 
     def handle_rotation_update(self, axis: int, value: float) -> None:
         """
         This function handles events from the rotation dials.
 
-        It updates the shape in memory, and then saves the shape.
+        It schedules the update of the shape in memory, which is saved once the edit is over.
 
         Parameters
         ----------
@@ -104,8 +130,25 @@ class PropertiesForm(QWidget):
         if self.target is None:
             return
 
-        self.target.update_rotation(axis, value)
-        self.serializer.save_shape(self.target)
+        shape = self.target
+        self.pipeline.submit(shape, ("rotation", axis), lambda: shape.update_rotation(axis, value))
+
+    def handle_clone(self) -> None:
+        """
+        This function handles the clone button, cloning the target shape.
+        """
+        if self.target is not None:
+            # The clone is serialized from the shape, so it must have every edit applied
+            self.pipeline.commit()
+            self.cloneShape.emit(self.target)
+
+    def handle_delete(self) -> None:
+        """
+        This function handles the delete button, deleting the target shape.
+        """
+        if self.target is not None:
+            self.pipeline.discard(self.target.uuid)
+            self.deleteShape.emit(self.target.uuid)
 
     def hook_component_input(self, property_: Optional[str], component: QWidget) -> None:
         """
@@ -119,7 +162,7 @@ class PropertiesForm(QWidget):
         component : QWidget
             The widget that is being edited.
         """
-        if self.target is None or property_ is None:
+        if property_ is None:
             return
 
         if isinstance(component, QLineEdit):
@@ -133,51 +176,102 @@ class PropertiesForm(QWidget):
         elif isinstance(component, RotationDialGroup):
             component.rotationDialGroupMemberChanged.connect(self.handle_rotation_update)
 
-    def set_target(self, shape: AbstractShape) -> None:
+    @staticmethod
+    def set_component_value(component: QWidget, value: Any) -> None:
         """
-        When the selected shape is changed, this function
-        populates the properties form with all of the fields
-        necessary for editing the new target shape.
+        Show a value in a form component, without emitting its change signals.
 
         Parameters
         ----------
-        shape : AbstractShape
-            The shape to be edited.
+        component : QWidget
+            The form component.
+        value : Any
+            The value, as given by AbstractShape.get_form_values.
         """
-        self.target = shape
+        if isinstance(component, ColorPicker):
+            component.set_color(value)
+        elif isinstance(component, (SpinboxGroup, RotationDialGroup)):
+            component.set_values(*value)
+        elif isinstance(component, (QLineEdit, QDoubleSpinBox, QDial)):
+            blocked = component.blockSignals(True)
+            if isinstance(component, QLineEdit):
+                component.setText(value)
+            else:
+                component.setValue(value)
+            component.blockSignals(blocked)
+
+    def build_form(self, shape: AbstractShape) -> Tuple[QWidget, List[Tuple[str, QWidget]]]:
+        """
+        Build the form for a type of shape, and add it to the stacked layout.
 
-        while self.layout.rowCount():
-            self.layout.removeRow(0)
+        Every handler acts on the current target, so the form can be bound to any shape of the type.
 
-        for property, label, component in shape.get_form_components():
-            self.layout.addRow(label, component)
-            self.hook_component_input(property, component)
+        Parameters
+        ----------
+        shape : AbstractShape
+            A shape of the type.
+
+        Returns
+        -------
+        Tuple[QWidget, List[Tuple[str, QWidget]]]
+            The form, and its components by property.
+        """
+        form = QWidget()
+        form_layout = QFormLayout(form)
+
+        components = []
+        for property_, label, component in shape.get_form_components():
+            form_layout.addRow(label, component)
+            self.hook_component_input(property_, component)
+            if property_ is not None:
+                components.append((property_, component))
 
         button_group = QWidget()
         button_group_layout = QHBoxLayout(button_group)
 
         clone_button = QPushButton("Clone Object")
-        clone_button.clicked.connect(lambda: self.cloneShape.emit(shape))
+        clone_button.clicked.connect(self.handle_clone)
 
         delete_button = QPushButton("Delete Object")
-        delete_button.clicked.connect(lambda: self.deleteShape.emit(shape.uuid))
+        delete_button.clicked.connect(self.handle_delete)
 
         button_group_layout.addWidget(clone_button)
         button_group_layout.addWidget(delete_button)
 
-        self.layout.addRow(button_group)
+        form_layout.addRow(button_group)
+
+        self.layout.addWidget(form)
+        self.forms[type(shape)] = (form, components)
+        return form, components
+
+    def set_target(self, shape: AbstractShape) -> None:
+        """
+        When the selected shape is changed, this function
+        shows the form for the shape's type, filled with
+        the values of the new target shape.
+
+        Parameters
+        ----------
+        shape : AbstractShape
+            The shape to be edited.
+        """
+        self.pipeline.commit()
+        self.target = shape
+
+        form, components = self.forms.get(type(shape)) or self.build_form(shape)
+
+        values = shape.get_form_values()
+        for property_, component in components:
+            if property_ in values:
+                self.set_component_value(component, values[property_])
 
-        self.update()
+        self.layout.setCurrentWidget(form)
 
     def clear_target(self) -> None:
         """
         When the selected shape is changed or removed,
-        this function handles the removal of the fields
-        in the properties form.
+        this function hides the form of the previous target.
         """
+        self.pipeline.commit()
         self.target = None
-
-        while self.layout.rowCount():
-            self.layout.removeRow(0)
-
-        self.update()
\ No newline at end of file
+        self.layout.setCurrentWidget(self.empty_form)
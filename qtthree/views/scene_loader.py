@@ -0,0 +1,176 @@
+import os
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from PySide2 import QtCore
+
+from qtthree.geometry import geometry_registry
+from qtthree.shapes.abstract_shape import AbstractShape
+from qtthree.utils.serializer import Serializer
+
+
+def release_prepared_geometry(future: Future) -> None:
+    """
+    Release the geometry acquired by a prepared shape that will never be deserialized.
+
+    Parameters
+    ----------
+    future : Future
+        The preparation of the shape.
+    """
+    if future.cancelled() or future.exception() is not None:
+        return
+
+    prepared = future.result()
+    if prepared is not None and prepared.get("geometry") is not None:
+        geometry_registry.release(prepared["geometry"])
+
+
+class SceneLoader(QtCore.QObject):
+    """
+    Restores the stored scene progressively on the event loop.
+
+    Restoring a shape is split into two stages. The pure-data stage
+    (building mesh data, parsing STL files) runs on a pool of worker threads.
+    The GUI stage (creating the mesh items) runs in time-sliced chunks on
+    the event loop, so the window stays responsive (and is shown right away)
+    regardless of the scene size.
+    """
+    serializer: Serializer
+    time_slice: float
+    timer: QtCore.QTimer
+
+    shapeRestored = QtCore.Signal(AbstractShape)
+    progress = QtCore.Signal(int, int)
+    finished = QtCore.Signal(int)
+
+    # How long to wait before checking the pool again when it is behind
+    POLL_INTERVAL = 5
+
+    def __init__(self, serializer: Serializer, time_slice: float = 0.012, workers: Optional[int] = None, parent=None) -> None:
+        super().__init__(parent)
+        self.serializer = serializer
+        self.time_slice = time_slice
+        self.workers = workers or os.cpu_count() or 1
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Optional["Future[Optional[dict]]"]] = []
+        self._index = 0
+        self._loaded = 0
+
+        # A zero interval timer fires once per event loop iteration,
+        # after pending paint and input events have been processed.
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.restore_chunk)
+
+    def start(self) -> None:
+        """
+        Starts restoring the scene once control returns to the event loop.
+        """
+        QtCore.QTimer.singleShot(0, self.begin)
+
+    def begin(self) -> None:
+        """
+        Loads the stored data, queues every shape on the worker pool
+        and starts the chunked restore.
+        """
+        records = list(self.serializer.load().values())
+        self._index = 0
+        self._loaded = 0
+
+        if not records:
+            self.finish()
+            return
+
+        # numpy and numpy-stl release the GIL for the heavy lifting,
+        # so threads are enough to spread the work across cores.
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = [self._executor.submit(self.serializer.prepare_shape, shape_data) for shape_data in records]
+
+        self.progress.emit(0, len(self._pending))
+        self.timer.setInterval(0)
+        self.timer.start()
+
+    def restore_chunk(self) -> None:
+        """
+        Creates prepared shapes, in their stored order, until the
+        time slice for this iteration is used up.
+        """
+        if self._executor is None:
+            self.timer.stop()
+            return
+
+        deadline = time.perf_counter() + self.time_slice
+        while time.perf_counter() < deadline:
+            if self._index >= len(self._pending):
+                self.finish()
+                return
+
+            future = self._pending[self._index]
+            if not future.done():
+                # The workers are behind, don't spin the GUI thread waiting on them
+                self.timer.setInterval(self.POLL_INTERVAL)
+                break
+
+            self._pending[self._index] = None
+            self._index += 1
+
+            try:
+                prepared = future.result()
+                shape = self.serializer.deserialize_shape(prepared) if prepared is not None else None
+            except Exception:
+                traceback.print_exc()
+                continue
+
+            if shape is not None:
+                self._loaded += 1
+                self.shapeRestored.emit(shape)
+        else:
+            self.timer.setInterval(0)
+
+        self.progress.emit(self._index, len(self._pending))
+
+    def finish(self) -> None:
+        """
+        Stops the restore and reports how many shapes were loaded.
+        """
+        self.shutdown()
+        self.finished.emit(self._loaded)
+
+    def cancel(self) -> None:
+        """
+        Stops the restore without reporting it as finished.
+        """
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Stops the timer and releases the worker pool.
+
+        Shapes still queued are cancelled. The ones already prepared, or being
+        prepared, release the geometry they acquired once they are done.
+        """
+        self.timer.stop()
+        for future in self._pending:
+            if future is not None and not future.cancel():
+                # Runs right away if the future is already done
+                future.add_done_callback(release_prepared_geometry)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        self._pending = []
+
+    def is_running(self) -> bool:
+        """
+        Whether the scene is still being restored.
+
+        Returns
+        -------
+        bool
+            True if there are shapes left to restore.
+        """
+        return self._executor is not None
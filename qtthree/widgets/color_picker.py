@@ -33,6 +33,18 @@ class ColorPicker(QWidget):
 
         self.layout.addWidget(choose_button)
 
+    def set_color(self, color: QColor) -> None:
+        """
+        Show another color, without emitting colorChanged.
+
+        Parameters
+        ----------
+        color : QColor
+            The color to show.
+        """
+        self.color = color
+        self.update_preview()
+
     def update_preview(self):
         self.color_preview.setStyleSheet(f"background-color: rgba{self.color.getRgb()}")
 
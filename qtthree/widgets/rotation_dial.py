@@ -1,3 +1,5 @@
+from typing import List
+
 from PySide2 import QtCore
 from PySide2.QtWidgets import QDial, QHBoxLayout, QLabel, QVBoxLayout, QWidget
 
@@ -22,12 +24,15 @@ class RotationDial(QDial):
 class RotationDialGroup(QWidget):
     layout: QHBoxLayout
 
+    dials: List[RotationDial]
+
     rotationDialGroupMemberChanged = QtCore.Signal(int, float)
 
     def __init__(self, x: int, y: int, z: int, parent=None):
         super(RotationDialGroup, self).__init__(parent)
 
         self.layout = QHBoxLayout(self)
+        self.dials = []
 
         for i, value in enumerate((x, y, z)):
             dial_group = QWidget()
@@ -39,5 +44,24 @@ class RotationDialGroup(QWidget):
             dial = RotationDial(value, i)
             dial_group_layout.addWidget(dial)
             dial.rotationDialGroupMemberChanged.connect(self.rotationDialGroupMemberChanged.emit)
+            self.dials.append(dial)
 
             self.layout.addWidget(dial_group)
+
+    def set_values(self, x: int, y: int, z: int) -> None:
+        """
+        Show other rotations, without emitting rotationDialGroupMemberChanged.
+
+        Parameters
+        ----------
+        x : int
+            The rotation around the X axis, in degrees.
+        y : int
+            The rotation around the Y axis, in degrees.
+        z : int
+            The rotation around the Z axis, in degrees.
+        """
+        for dial, value in zip(self.dials, (x, y, z)):
+            blocked = dial.blockSignals(True)
+            dial.setValue(int(value))
+            dial.blockSignals(blocked)
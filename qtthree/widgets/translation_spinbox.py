@@ -32,6 +32,7 @@ class SpinboxGroup(QWidget):
         super(SpinboxGroup, self).__init__(parent)
 
         self.layout = QHBoxLayout(self)
+        self.spinBoxes = []
 
         for i, value in enumerate((x, y, z)):
             spinbox_group = QWidget()
@@ -43,6 +44,25 @@ class SpinboxGroup(QWidget):
             spinbox = TranslationSpinbox(value, i)
             spinbox_group_layout.addWidget(spinbox)
             spinbox.spinboxGroupMemberChanged.connect(lambda index, value: self.spinboxGroupMemberChanged.emit(index, value))
+            self.spinBoxes.append(spinbox)
 
             self.layout.addWidget(spinbox_group)
 
+    def set_values(self, x: float, y: float, z: float) -> None:
+        """
+        Show other values, without emitting spinboxGroupMemberChanged.
+
+        Parameters
+        ----------
+        x : float
+            The X value.
+        y : float
+            The Y value.
+        z : float
+            The Z value.
+        """
+        for spinbox, value in zip(self.spinBoxes, (x, y, z)):
+            blocked = spinbox.blockSignals(True)
+            spinbox.setValue(float(value))
+            spinbox.blockSignals(blocked)
+